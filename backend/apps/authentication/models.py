@@ -1,5 +1,6 @@
 from django.contrib.auth.models import AbstractUser
 from django.db import models
+from apps.core.autocomplete import prefix_indexes
 
 
 class Role(models.Model):
@@ -76,6 +77,8 @@ class User(AbstractUser):
         indexes = [
             models.Index(fields=['email']),
             models.Index(fields=['username']),
+            *prefix_indexes('user', 'username'),
+            *prefix_indexes('user', 'last_name'),
         ]
     
     def __str__(self):
@@ -1,16 +1,17 @@
 from rest_framework import serializers
 from django.contrib.auth.password_validation import validate_password
+from apps.core.serializers import SparseFieldsetMixin
 from .models import User, Role
 
 
-class RoleSerializer(serializers.ModelSerializer):
+class RoleSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     class Meta:
         model = Role
         fields = ['id', 'name', 'description', 'permissions', 'created_at', 'updated_at']
         read_only_fields = ['created_at', 'updated_at']
 
 
-class UserSerializer(serializers.ModelSerializer):
+class UserSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     role_details = RoleSerializer(source='role', read_only=True)
     full_name = serializers.CharField(read_only=True)
     
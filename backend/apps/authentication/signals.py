@@ -1,9 +1,12 @@
 """
 Sygnały dla synchronizacji użytkowników z LDAP/AD
 """
+from django.db.models.signals import post_delete, post_save
 from django.dispatch import receiver
 from django_auth_ldap.backend import populate_user
 from django.utils import timezone
+from apps.core.cache import invalidate_responses
+from .models import Role
 import logging
 
 logger = logging.getLogger('ldap_auth')
@@ -35,3 +38,10 @@ def ldap_user_populated(sender, user, ldap_user, **kwargs):
     
     if not user.role:
         logger.warning(f"⚠️  User {user.username} has no role assigned!")
+
+
+@receiver(post_save, sender=Role)
+@receiver(post_delete, sender=Role)
+def role_changed(sender, **kwargs):
+    """Unieważnia zbuforowane odpowiedzi API z rolami."""
+    invalidate_responses(sender)
@@ -4,6 +4,7 @@ from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated, AllowAny
 from django.contrib.auth import update_session_auth_hash, authenticate
 from rest_framework_simplejwt.tokens import RefreshToken
+from apps.core.mixins import AutocompleteMixin, CachedResponseMixin, ConditionalGetMixin, FetchPlanMixin
 from .models import User, Role
 from .serializers import (
     UserSerializer, UserCreateSerializer, UserUpdateSerializer,
@@ -14,7 +15,7 @@ import logging
 logger = logging.getLogger('authentication')
 
 
-class RoleViewSet(viewsets.ReadOnlyModelViewSet):
+class RoleViewSet(ConditionalGetMixin, CachedResponseMixin, FetchPlanMixin, viewsets.ReadOnlyModelViewSet):
     """
     ViewSet for viewing roles.
     """
@@ -23,9 +24,10 @@ class RoleViewSet(viewsets.ReadOnlyModelViewSet):
     permission_classes = [IsAuthenticated]
     filter_backends = [filters.SearchFilter]
     search_fields = ['name', 'description']
+    cache_models = [Role]
 
 
-class UserViewSet(viewsets.ModelViewSet):
+class UserViewSet(ConditionalGetMixin, AutocompleteMixin, FetchPlanMixin, viewsets.ModelViewSet):
     """
     ViewSet for user management.
     """
@@ -34,6 +36,11 @@ class UserViewSet(viewsets.ModelViewSet):
     filter_backends = [filters.SearchFilter, filters.OrderingFilter]
     search_fields = ['username', 'email', 'first_name', 'last_name']
     ordering_fields = ['username', 'email', 'created_at']
+    fetch_plans = {
+        'default': {'fields': {'role_details': {'select_related': ['role']}}},
+    }
+    autocomplete_fields = ['username', 'last_name']
+    autocomplete_columns = ['username', 'first_name', 'last_name']
     
     def get_serializer_class(self):
         if self.action == 'create':
@@ -42,6 +49,13 @@ class UserViewSet(viewsets.ModelViewSet):
             return UserUpdateSerializer
         return UserSerializer
     
+    def get_autocomplete_queryset(self):
+        return User.objects.filter(is_active=True)
+    
+    def get_autocomplete_label(self, row):
+        full_name = f"{row['first_name']} {row['last_name']}".strip()
+        return f"{full_name} ({row['username']})" if full_name else row['username']
+    
     def get_permissions(self):
         if self.action == 'create':
             return [AllowAny()]
@@ -1,5 +1,7 @@
 from django.contrib import admin
-from .models import Component, BOMTemplate, BOMTemplateItem, BOMInstance, BOMInstanceItem
+from .models import (
+    Component, BOMTemplate, BOMTemplateItem, BOMInstance, BOMInstanceItem, ProjectBOMCost
+)
 
 
 @admin.register(Component)
@@ -79,11 +81,21 @@ class BOMInstanceAdmin(admin.ModelAdmin):
             'fields': ('project', 'template', 'name', 'description', 'status')
         }),
         ('Cost', {
-            'fields': ('total_cost',)
+            'fields': ('total_cost', 'ordered_cost', 'received_cost', 'installed_cost')
         }),
         ('Metadata', {
             'fields': ('created_by', 'created_at', 'updated_at')
         }),
     )
     
-    readonly_fields = ['created_at', 'updated_at']
+    readonly_fields = [
+        'total_cost', 'ordered_cost', 'received_cost', 'installed_cost',
+        'created_at', 'updated_at'
+    ]
+
+
+@admin.register(ProjectBOMCost)
+class ProjectBOMCostAdmin(admin.ModelAdmin):
+    list_display = ['project', 'planned_cost', 'ordered_cost', 'received_cost', 'installed_cost', 'updated_at']
+    search_fields = ['project__code', 'project__name']
+    readonly_fields = ['planned_cost', 'ordered_cost', 'received_cost', 'installed_cost', 'updated_at']
@@ -5,3 +5,6 @@ class BomConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.bom'
     verbose_name = 'Bill of Materials'
+    
+    def ready(self):
+        import apps.bom.signals  # noqa
@@ -0,0 +1,159 @@
+"""
+BOM costing engine.
+
+Keeps the planned/ordered/received/installed cost rollups on ``BOMInstance``
+and ``ProjectBOMCost`` in sync with item writes. Item saves and deletes apply
+the cost *delta* with ``F()`` updates in the same transaction, so rollups
+never require re-reading the whole BOM. ``recompute_*`` rebuilds rollups from
+scratch to repair drift (e.g. after raw SQL or ``QuerySet.update`` writes).
+"""
+from decimal import Decimal
+
+from django.db.models import DecimalField, ExpressionWrapper, F, Sum, Value
+from django.db.models.functions import Coalesce, Round
+from django.utils import timezone
+
+from .models import COST_STAGES, BOMInstance, BOMInstanceItem, ProjectBOMCost
+
+ZERO = Decimal('0.00')
+
+
+def _nonzero(delta):
+    return {stage: value for stage, value in delta.items() if value}
+
+
+def add_to_instance(instance_id, delta):
+    """Add a stage -> amount ``delta`` to a BOM instance rollup."""
+    delta = _nonzero(delta)
+    if not delta:
+        return
+    BOMInstance.objects.filter(pk=instance_id).update(updated_at=timezone.now(), **{
+        BOMInstance.COST_FIELDS[stage]: F(BOMInstance.COST_FIELDS[stage]) + amount
+        for stage, amount in delta.items()
+    })
+
+
+def add_to_project(project_id, delta, create=True):
+    """
+    Add a stage -> amount ``delta`` to a project rollup.
+    
+    The rollup row is created on first use unless ``create`` is false, which
+    is required while the project itself may be in the middle of a cascade
+    delete.
+    """
+    delta = _nonzero(delta)
+    if not delta:
+        return
+    updated = ProjectBOMCost.objects.filter(project_id=project_id).update(updated_at=timezone.now(), **{
+        f'{stage}_cost': F(f'{stage}_cost') + amount for stage, amount in delta.items()
+    })
+    if not updated and create:
+        recompute_project(project_id)
+
+
+def _project_of(instance_id):
+    return (
+        BOMInstance.objects.filter(pk=instance_id)
+        .values_list('project_id', flat=True)
+        .first()
+    )
+
+
+def ensure_snapshot(item):
+    """Load the persisted costs of an existing item that has no snapshot."""
+    if item._state.adding or hasattr(item, '_saved_costs'):
+        return
+    saved = BOMInstanceItem.objects.filter(pk=item.pk).first()
+    if saved is not None:
+        item._saved_costs = saved._saved_costs
+
+
+def item_saved(item):
+    """Apply the cost change of a saved item to its instance and project."""
+    new_costs = item.stage_costs()
+    old_instance_id, old_costs = getattr(item, '_saved_costs', (None, None))
+    
+    if old_instance_id == item.bom_instance_id:
+        delta = {stage: new_costs[stage] - old_costs[stage] for stage in COST_STAGES}
+        add_to_instance(item.bom_instance_id, delta)
+        add_to_project(_project_of(item.bom_instance_id), delta)
+    else:
+        if old_instance_id is not None:
+            removed = {stage: -amount for stage, amount in old_costs.items()}
+            add_to_instance(old_instance_id, removed)
+            add_to_project(_project_of(old_instance_id), removed)
+        add_to_instance(item.bom_instance_id, new_costs)
+        add_to_project(_project_of(item.bom_instance_id), new_costs)
+    
+    item._saved_costs = (item.bom_instance_id, new_costs)
+
+
+def item_deleted(item):
+    """Remove the cost of a deleted item from its instance and project."""
+    instance_id, costs = getattr(item, '_saved_costs', (item.bom_instance_id, item.stage_costs()))
+    removed = {stage: -amount for stage, amount in costs.items()}
+    add_to_instance(instance_id, removed)
+    project_id = _project_of(instance_id)
+    if project_id is not None:
+        add_to_project(project_id, removed, create=False)
+
+
+def add_instance_items(instance, items):
+    """Roll up items that were written with ``bulk_create``."""
+    totals = {stage: ZERO for stage in COST_STAGES}
+    for item in items:
+        for stage, amount in item.stage_costs().items():
+            totals[stage] += amount
+    add_to_instance(instance.pk, totals)
+    add_to_project(instance.project_id, totals)
+
+
+def _stage_cost_sum(stage):
+    cost = ExpressionWrapper(
+        F(f'quantity_{stage}') * F('unit_cost'),
+        output_field=DecimalField(max_digits=20, decimal_places=4),
+    )
+    return Coalesce(
+        Sum(Round(cost, 2)), Value(ZERO),
+        output_field=DecimalField(max_digits=14, decimal_places=2),
+    )
+
+
+def recompute_instances(queryset=None):
+    """Rebuild instance rollups from their items with one grouped query."""
+    if queryset is None:
+        queryset = BOMInstance.objects.all()
+    sums = {
+        row.pop('bom_instance'): row
+        for row in BOMInstanceItem.objects.filter(bom_instance__in=queryset)
+        .values('bom_instance')
+        .annotate(**{stage: _stage_cost_sum(stage) for stage in COST_STAGES})
+    }
+    changed = []
+    now = timezone.now()
+    for instance in queryset.only('pk', *BOMInstance.COST_FIELDS.values()):
+        totals = sums.get(instance.pk, {})
+        values = {
+            field: totals.get(stage, ZERO) for stage, field in BOMInstance.COST_FIELDS.items()
+        }
+        if any(getattr(instance, field) != value for field, value in values.items()):
+            for field, value in values.items():
+                setattr(instance, field, value)
+            instance.updated_at = now
+            changed.append(instance)
+    BOMInstance.objects.bulk_update(
+        changed, [*BOMInstance.COST_FIELDS.values(), 'updated_at'], batch_size=500
+    )
+    return len(changed)
+
+
+def recompute_project(project_id):
+    """Rebuild the rollup of one project from its BOM instances."""
+    totals = BOMInstance.objects.filter(project_id=project_id).aggregate(**{
+        stage: Coalesce(Sum(field), Value(ZERO), output_field=DecimalField(max_digits=14, decimal_places=2))
+        for stage, field in BOMInstance.COST_FIELDS.items()
+    })
+    ProjectBOMCost.objects.update_or_create(
+        project_id=project_id,
+        defaults={f'{stage}_cost': amount for stage, amount in totals.items()},
+    )
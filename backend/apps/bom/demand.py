@@ -0,0 +1,86 @@
+"""
+Component requirements explosion across BOM instances.
+
+Outstanding demand per component (``quantity_planned - quantity_received``
+summed over every matching BOM item) is computed with one grouped query and
+cached under a versioned namespace that is bumped on every BOM item,
+instance or component write.
+"""
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import DecimalField, F, Sum, Value
+from django.db.models.functions import Greatest
+
+from apps.core.cache import bump_namespace, versioned_key
+from .models import BOMInstanceItem
+
+CACHE_NAMESPACE = 'bom-demand'
+CACHE_TIMEOUT = 15 * 60
+
+QUANTITY = DecimalField(max_digits=14, decimal_places=2)
+
+
+def invalidate():
+    # Bump only once the write is visible, so a concurrent reader cannot
+    # cache pre-commit data under the new version.
+    transaction.on_commit(lambda: bump_namespace(CACHE_NAMESPACE))
+
+
+def component_demand(project_ids=None, statuses=None, shortages_only=False):
+    """
+    Outstanding demand per component, optionally limited to some projects
+    and BOM instance statuses.
+
+    Each row carries the summed ``planned``, ``received`` and ``outstanding``
+    quantities, the current stock, the resulting ``shortage`` and the
+    ``reorder_quantity`` needed to also restore ``min_stock_level``. Items
+    that were over-received do not offset demand elsewhere. With
+    ``shortages_only`` just the components that need reordering are
+    returned, largest shortage first.
+    """
+    project_ids = sorted(set(project_ids or []))
+    statuses = sorted(set(statuses or []))
+    key = versioned_key(
+        CACHE_NAMESPACE,
+        ','.join(map(str, project_ids)) or 'all',
+        ','.join(statuses) or 'any',
+        int(shortages_only),
+    )
+    rows = cache.get(key)
+    if rows is not None:
+        return rows
+
+    items = BOMInstanceItem.objects.all()
+    if project_ids:
+        items = items.filter(bom_instance__project_id__in=project_ids)
+    if statuses:
+        items = items.filter(bom_instance__status__in=statuses)
+
+    outstanding = Greatest(
+        F('quantity_planned') - F('quantity_received'), Value(0), output_field=QUANTITY
+    )
+    rows = (
+        items.values('component')
+        .annotate(
+            sku=F('component__sku'),
+            name=F('component__name'),
+            unit_of_measure=F('component__unit_of_measure'),
+            unit_price=F('component__unit_price'),
+            stock_quantity=F('component__stock_quantity'),
+            min_stock_level=F('component__min_stock_level'),
+            planned=Sum('quantity_planned', output_field=QUANTITY),
+            received=Sum('quantity_received', output_field=QUANTITY),
+            outstanding=Sum(outstanding, output_field=QUANTITY),
+        )
+        .annotate(
+            shortage=F('outstanding') - F('stock_quantity'),
+            reorder_quantity=F('outstanding') + F('min_stock_level') - F('stock_quantity'),
+        )
+        .order_by('sku')
+    )
+    if shortages_only:
+        rows = rows.filter(reorder_quantity__gt=0).order_by('-shortage', 'sku')
+
+    rows = list(rows)
+    cache.set(key, rows, CACHE_TIMEOUT)
+    return rows
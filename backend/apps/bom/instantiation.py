@@ -0,0 +1,51 @@
+"""
+Creation of BOM instances from BOM templates.
+"""
+from django.db import transaction
+
+from . import costing, demand
+from .models import CENT, BOMInstance, BOMInstanceItem
+
+BATCH_SIZE = 500
+
+
+def instantiate_template(template, project, user=None, multiplier=1, include_optional=True,
+                         name='', description=''):
+    """
+    Create a ``BOMInstance`` of ``template`` for ``project`` in one transaction.
+    
+    Template quantities are multiplied by ``multiplier`` (e.g. 40 cameras per
+    station) and the current component ``unit_price`` is snapshotted into
+    ``unit_cost``. Items are written with ``bulk_create`` and the cost rollups
+    are updated once for the whole instance.
+    """
+    template_items = template.items.values_list(
+        'component_id', 'component__unit_price', 'quantity', 'notes', 'is_optional'
+    )
+    with transaction.atomic():
+        instance = BOMInstance.objects.create(
+            project=project,
+            template=template,
+            name=name or f"{template.name} v{template.version}",
+            description=description,
+            created_by=user,
+        )
+        items = []
+        for component_id, unit_price, quantity, notes, is_optional in template_items:
+            if is_optional and not include_optional:
+                continue
+            quantity_planned = (quantity * multiplier).quantize(CENT)
+            items.append(BOMInstanceItem(
+                bom_instance=instance,
+                component_id=component_id,
+                quantity_planned=quantity_planned,
+                unit_cost=unit_price,
+                total_cost=(quantity_planned * unit_price).quantize(CENT),
+                notes=notes,
+            ))
+        BOMInstanceItem.objects.bulk_create(items, batch_size=BATCH_SIZE)
+        costing.add_instance_items(instance, items)
+        demand.invalidate()
+    
+    instance.refresh_from_db(fields=list(BOMInstance.COST_FIELDS.values()))
+    return instance, len(items)
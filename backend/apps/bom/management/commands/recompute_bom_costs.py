@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from apps.bom import costing
+from apps.bom.models import BOMInstance
+
+
+class Command(BaseCommand):
+    help = 'Rebuild BOM instance and project cost rollups from the BOM items'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--project', type=int, help='Only recompute this project')
+
+    def handle(self, *args, **options):
+        instances = BOMInstance.objects.all()
+        if options['project']:
+            instances = instances.filter(project_id=options['project'])
+
+        with transaction.atomic():
+            changed = costing.recompute_instances(instances)
+            project_ids = set(instances.values_list('project_id', flat=True))
+            for project_id in project_ids:
+                costing.recompute_project(project_id)
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f'Recomputed {changed} BOM instance(s) and {len(project_ids)} project rollup(s).'
+            )
+        )
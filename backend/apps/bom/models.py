@@ -1,7 +1,17 @@
-from django.db import models
+from decimal import Decimal
+
+from django.db import models, transaction
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
 from django.conf import settings
+from apps.core.autocomplete import prefix_indexes
 from apps.projects.models import Project
 
+# Procurement stages tracked by the BOM cost rollups. Each stage maps to an
+# item quantity field ``quantity_<stage>``.
+COST_STAGES = ['planned', 'ordered', 'received', 'installed']
+CENT = Decimal('0.01')
+
 
 class Component(models.Model):
     """Component model for materials and parts."""
@@ -36,6 +46,9 @@ class Component(models.Model):
     
     is_active = models.BooleanField(default=True)
     
+    # Weighted full-text vector, maintained by apps.search.
+    search_vector = SearchVectorField(null=True, editable=False)
+    
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
@@ -46,6 +59,9 @@ class Component(models.Model):
         indexes = [
             models.Index(fields=['sku']),
             models.Index(fields=['category']),
+            GinIndex(fields=['search_vector'], name='bom_component_search_idx'),
+            *prefix_indexes('component', 'sku'),
+            *prefix_indexes('component', 'name'),
         ]
     
     def __str__(self):
@@ -124,6 +140,14 @@ class BOMInstance(models.Model):
         ('installed', 'Installed'),
     ]
     
+    # Rollup field for each cost stage.
+    COST_FIELDS = {
+        'planned': 'total_cost',
+        'ordered': 'ordered_cost',
+        'received': 'received_cost',
+        'installed': 'installed_cost',
+    }
+    
     project = models.ForeignKey(
         Project,
         on_delete=models.CASCADE,
@@ -148,7 +172,11 @@ class BOMInstance(models.Model):
         related_name='created_bom_instances'
     )
     
-    total_cost = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    # Cost rollups, maintained incrementally by apps.bom.costing.
+    total_cost = models.DecimalField(max_digits=12, decimal_places=2, default=0)  # planned
+    ordered_cost = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    received_cost = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    installed_cost = models.DecimalField(max_digits=12, decimal_places=2, default=0)
     
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
@@ -160,11 +188,33 @@ class BOMInstance(models.Model):
     
     def __str__(self):
         return f"{self.project.code} - {self.name}"
+    
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_project_id = instance.__dict__.get('project_id')
+        return instance
+    
+    def save(self, *args, **kwargs):
+        # The rollups are written with F() updates by apps.bom.costing; an
+        # update must not write the copies loaded with the row back over them.
+        if not self._state.adding and kwargs.get('update_fields') is None and not kwargs.get('force_insert'):
+            deferred = self.get_deferred_fields()
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key
+                and field.attname not in deferred
+                and field.name not in self.COST_FIELDS.values()
+            ]
+        super().save(*args, **kwargs)
 
 
 class BOMInstanceItem(models.Model):
     """Items in BOM instance."""
     
+    # Fields the stage costs are derived from.
+    COST_DEPENDENCIES = {'bom_instance_id', 'unit_cost'} | {f'quantity_{s}' for s in COST_STAGES}
+    
     bom_instance = models.ForeignKey(
         BOMInstance,
         on_delete=models.CASCADE,
@@ -198,6 +248,48 @@ class BOMInstanceItem(models.Model):
     def __str__(self):
         return f"{self.bom_instance.name} - {self.component.name} x{self.quantity_planned}"
     
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        item = super().from_db(db, field_names, values)
+        # Snapshot the persisted costs so rollups can be updated by delta.
+        if not item.get_deferred_fields() & item.COST_DEPENDENCIES:
+            item._saved_costs = (item.bom_instance_id, item.stage_costs())
+        return item
+    
+    def stage_costs(self):
+        """Cost of the item at each procurement stage."""
+        return {
+            stage: (getattr(self, f'quantity_{stage}') * self.unit_cost).quantize(CENT)
+            for stage in COST_STAGES
+        }
+    
     def save(self, *args, **kwargs):
         self.total_cost = self.quantity_planned * self.unit_cost
-        super().save(*args, **kwargs)
+        # Rollups are updated by signal handlers inside the same transaction.
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+
+
+class ProjectBOMCost(models.Model):
+    """Project-level rollup of BOM instance costs."""
+    
+    project = models.OneToOneField(
+        Project,
+        on_delete=models.CASCADE,
+        related_name='bom_cost'
+    )
+    
+    planned_cost = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    ordered_cost = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    received_cost = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    installed_cost = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        ordering = ['project']
+        verbose_name = 'Project BOM Cost'
+        verbose_name_plural = 'Project BOM Costs'
+    
+    def __str__(self):
+        return f"{self.project.code} - {self.planned_cost}"
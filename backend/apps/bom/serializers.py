@@ -1,8 +1,20 @@
+from decimal import Decimal
+
 from rest_framework import serializers
-from .models import Component, BOMTemplate, BOMTemplateItem, BOMInstance, BOMInstanceItem
+from apps.core.serializers import SparseFieldsetMixin
+from apps.projects.models import Project
+from .models import (
+    CENT, Component, BOMTemplate, BOMTemplateItem, BOMInstance, BOMInstanceItem, ProjectBOMCost
+)
+
+
+def column_limit(model, name):
+    """Smallest value too large for the decimal column ``name`` of ``model``."""
+    field = model._meta.get_field(name)
+    return Decimal(10) ** (field.max_digits - field.decimal_places)
 
 
-class ComponentSerializer(serializers.ModelSerializer):
+class ComponentSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     class Meta:
         model = Component
         fields = [
@@ -14,8 +26,17 @@ class ComponentSerializer(serializers.ModelSerializer):
         read_only_fields = ['created_at', 'updated_at']
 
 
-class BOMTemplateItemSerializer(serializers.ModelSerializer):
-    component_details = ComponentSerializer(source='component', read_only=True)
+class ComponentSummarySerializer(serializers.ModelSerializer):
+    """Slim component representation embedded in BOM items."""
+    
+    class Meta:
+        model = Component
+        fields = ['id', 'name', 'sku', 'category', 'unit_price', 'unit_of_measure']
+        read_only_fields = fields
+
+
+class BOMTemplateItemSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
+    component_details = ComponentSummarySerializer(source='component', read_only=True)
     
     class Meta:
         model = BOMTemplateItem
@@ -26,9 +47,10 @@ class BOMTemplateItemSerializer(serializers.ModelSerializer):
         read_only_fields = ['created_at', 'updated_at']
 
 
-class BOMTemplateSerializer(serializers.ModelSerializer):
+class BOMTemplateSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     items = BOMTemplateItemSerializer(many=True, read_only=True)
-    items_count = serializers.SerializerMethodField()
+    # Annotated by the viewset; a template without that annotation is new.
+    items_count = serializers.IntegerField(read_only=True, default=0)
     
     class Meta:
         model = BOMTemplate
@@ -38,13 +60,11 @@ class BOMTemplateSerializer(serializers.ModelSerializer):
             'created_at', 'updated_at'
         ]
         read_only_fields = ['created_at', 'updated_at']
-    
-    def get_items_count(self, obj):
-        return obj.items.count()
+        expandable_fields = ['items']
 
 
-class BOMInstanceItemSerializer(serializers.ModelSerializer):
-    component_details = ComponentSerializer(source='component', read_only=True)
+class BOMInstanceItemSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
+    component_details = ComponentSummarySerializer(source='component', read_only=True)
     
     class Meta:
         model = BOMInstanceItem
@@ -56,8 +76,9 @@ class BOMInstanceItemSerializer(serializers.ModelSerializer):
         read_only_fields = ['total_cost', 'created_at', 'updated_at']
 
 
-class BOMInstanceSerializer(serializers.ModelSerializer):
+class BOMInstanceSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     items = BOMInstanceItemSerializer(many=True, read_only=True)
+    items_count = serializers.IntegerField(read_only=True, default=0)
     project_name = serializers.CharField(source='project.name', read_only=True)
     template_name = serializers.CharField(source='template.name', read_only=True)
     
@@ -66,6 +87,66 @@ class BOMInstanceSerializer(serializers.ModelSerializer):
         fields = [
             'id', 'project', 'project_name', 'template', 'template_name',
             'name', 'description', 'status', 'created_by', 'total_cost',
-            'items', 'created_at', 'updated_at'
+            'ordered_cost', 'received_cost', 'installed_cost',
+            'items', 'items_count', 'created_at', 'updated_at'
         ]
-        read_only_fields = ['total_cost', 'created_at', 'updated_at']
+        read_only_fields = [
+            'total_cost', 'ordered_cost', 'received_cost', 'installed_cost',
+            'created_at', 'updated_at'
+        ]
+        expandable_fields = ['items']
+
+
+class ProjectBOMCostSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
+    project_name = serializers.CharField(source='project.name', read_only=True)
+    
+    class Meta:
+        model = ProjectBOMCost
+        fields = [
+            'id', 'project', 'project_name', 'planned_cost', 'ordered_cost',
+            'received_cost', 'installed_cost', 'updated_at'
+        ]
+
+
+class BOMInstantiateSerializer(serializers.Serializer):
+    project = serializers.PrimaryKeyRelatedField(queryset=Project.objects.all())
+    name = serializers.CharField(max_length=255, required=False, allow_blank=True)
+    description = serializers.CharField(required=False, allow_blank=True)
+    multiplier = serializers.DecimalField(
+        max_digits=10, decimal_places=2, min_value=Decimal('0.01'), default=Decimal('1')
+    )
+    include_optional = serializers.BooleanField(default=True)
+    
+    def validate(self, attrs):
+        # The multiplied quantities and their costs must fit the item columns
+        # and the instance rollup; expects the template in the context.
+        items = self.context['template'].items.all()
+        if not attrs['include_optional']:
+            items = items.filter(is_optional=False)
+        max_quantity = column_limit(BOMInstanceItem, 'quantity_planned')
+        max_cost = column_limit(BOMInstanceItem, 'total_cost')
+        total = Decimal('0')
+        for quantity, unit_price in items.values_list('quantity', 'component__unit_price'):
+            quantity_planned = (quantity * attrs['multiplier']).quantize(CENT)
+            cost = (quantity_planned * unit_price).quantize(CENT)
+            if quantity_planned >= max_quantity or cost >= max_cost:
+                raise serializers.ValidationError({'multiplier': 'Multiplied quantities are too large.'})
+            total += cost
+        if total >= column_limit(BOMInstance, 'total_cost'):
+            raise serializers.ValidationError({'multiplier': 'The total cost of the instance is too large.'})
+        return attrs
+
+
+class ComponentDemandSerializer(serializers.Serializer):
+    component = serializers.IntegerField()
+    sku = serializers.CharField()
+    name = serializers.CharField()
+    unit_of_measure = serializers.CharField()
+    unit_price = serializers.DecimalField(max_digits=10, decimal_places=2)
+    stock_quantity = serializers.IntegerField()
+    min_stock_level = serializers.IntegerField()
+    planned = serializers.DecimalField(max_digits=14, decimal_places=2)
+    received = serializers.DecimalField(max_digits=14, decimal_places=2)
+    outstanding = serializers.DecimalField(max_digits=14, decimal_places=2)
+    shortage = serializers.DecimalField(max_digits=14, decimal_places=2)
+    reorder_quantity = serializers.DecimalField(max_digits=14, decimal_places=2)
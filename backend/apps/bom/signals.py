@@ -0,0 +1,67 @@
+"""
+Signal handlers keeping BOM cost rollups, the cached component demand and
+the cached component and template responses in sync with BOM writes.
+"""
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from apps.core.cache import invalidate_responses
+from . import costing, demand
+from .models import BOMInstance, BOMInstanceItem, BOMTemplate, BOMTemplateItem, Component
+
+
+@receiver(pre_save, sender=BOMInstanceItem)
+def bom_item_saving(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    costing.ensure_snapshot(instance)
+
+
+@receiver(post_save, sender=BOMInstanceItem)
+def bom_item_saved(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    costing.item_saved(instance)
+    demand.invalidate()
+
+
+@receiver(post_delete, sender=BOMInstanceItem)
+def bom_item_deleted(sender, instance, **kwargs):
+    costing.item_deleted(instance)
+    demand.invalidate()
+
+
+@receiver(post_save, sender=BOMInstance)
+def bom_instance_saved(sender, instance, created=False, raw=False, **kwargs):
+    if raw:
+        return
+    # Status and project changes both move demand between scopes.
+    demand.invalidate()
+    if created:
+        instance._loaded_project_id = instance.project_id
+        return
+    old_project_id = getattr(instance, '_loaded_project_id', None)
+    if old_project_id is None or old_project_id == instance.project_id:
+        return
+    # The instance moved to another project: rebuild both project rollups.
+    costing.recompute_project(old_project_id)
+    costing.recompute_project(instance.project_id)
+    instance._loaded_project_id = instance.project_id
+
+
+@receiver(post_delete, sender=BOMInstance)
+@receiver(post_save, sender=Component)
+@receiver(post_delete, sender=Component)
+def bom_demand_changed(sender, raw=False, **kwargs):
+    if not raw:
+        demand.invalidate()
+
+
+@receiver(post_save, sender=Component)
+@receiver(post_delete, sender=Component)
+@receiver(post_save, sender=BOMTemplate)
+@receiver(post_delete, sender=BOMTemplate)
+@receiver(post_save, sender=BOMTemplateItem)
+@receiver(post_delete, sender=BOMTemplateItem)
+def bom_catalog_changed(sender, **kwargs):
+    invalidate_responses(sender)
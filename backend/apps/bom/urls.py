@@ -2,7 +2,8 @@ from django.urls import path, include
 from rest_framework.routers import DefaultRouter
 from .views import (
     ComponentViewSet, BOMTemplateViewSet, BOMTemplateItemViewSet,
-    BOMInstanceViewSet, BOMInstanceItemViewSet
+    BOMInstanceViewSet, BOMInstanceItemViewSet, ProjectBOMCostViewSet,
+    ComponentDemandViewSet
 )
 
 router = DefaultRouter()
@@ -11,6 +12,8 @@ router.register(r'templates', BOMTemplateViewSet, basename='bom-template')
 router.register(r'template-items', BOMTemplateItemViewSet, basename='bom-template-item')
 router.register(r'instances', BOMInstanceViewSet, basename='bom-instance')
 router.register(r'instance-items', BOMInstanceItemViewSet, basename='bom-instance-item')
+router.register(r'project-costs', ProjectBOMCostViewSet, basename='bom-project-cost')
+router.register(r'demand', ComponentDemandViewSet, basename='bom-demand')
 
 urlpatterns = [
     path('', include(router.urls)),
@@ -1,21 +1,42 @@
 from django.db import models
-from rest_framework import viewsets, filters
+from django.db.models import Count, Prefetch
+from rest_framework import viewsets, filters, status
+from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
 from rest_framework.permissions import IsAuthenticated
-from .models import Component, BOMTemplate, BOMTemplateItem, BOMInstance, BOMInstanceItem
+from rest_framework.response import Response
+from apps.core.mixins import AutocompleteMixin, CachedResponseMixin, ConditionalGetMixin, ExportMixin, FetchPlanMixin
+from apps.search.filters import SearchVectorFilter
+from .demand import component_demand
+from .instantiation import instantiate_template
+from .models import (
+    Component, BOMTemplate, BOMTemplateItem, BOMInstance, BOMInstanceItem, ProjectBOMCost
+)
 from .serializers import (
     ComponentSerializer, BOMTemplateSerializer, BOMTemplateItemSerializer,
-    BOMInstanceSerializer, BOMInstanceItemSerializer
+    BOMInstanceSerializer, BOMInstanceItemSerializer, ProjectBOMCostSerializer,
+    BOMInstantiateSerializer, ComponentDemandSerializer
 )
 
 
-class ComponentViewSet(viewsets.ModelViewSet):
+ITEMS_COUNT = {'items_count': Count('items')}
+
+
+class ComponentViewSet(ConditionalGetMixin, AutocompleteMixin, CachedResponseMixin, FetchPlanMixin, viewsets.ModelViewSet):
     """ViewSet for component management."""
     queryset = Component.objects.all()
     serializer_class = ComponentSerializer
     permission_classes = [IsAuthenticated]
-    filter_backends = [filters.SearchFilter, filters.OrderingFilter]
+    filter_backends = [SearchVectorFilter, filters.OrderingFilter]
     search_fields = ['name', 'sku', 'manufacturer', 'model_number']
     ordering_fields = ['name', 'sku', 'category', 'unit_price', 'stock_quantity']
+    autocomplete_fields = ['sku', 'name']
+    autocomplete_columns = ['sku', 'name']
+    autocomplete_label = '{sku} - {name}'
+    cache_models = [Component]
+    
+    def get_autocomplete_queryset(self):
+        return Component.objects.filter(is_active=True)
     
     def get_queryset(self):
         queryset = super().get_queryset()
@@ -33,14 +54,26 @@ class ComponentViewSet(viewsets.ModelViewSet):
         return queryset
 
 
-class BOMTemplateViewSet(viewsets.ModelViewSet):
+class BOMTemplateViewSet(ConditionalGetMixin, CachedResponseMixin, FetchPlanMixin, viewsets.ModelViewSet):
     """ViewSet for BOM template management."""
     queryset = BOMTemplate.objects.all()
     serializer_class = BOMTemplateSerializer
     permission_classes = [IsAuthenticated]
+    validator_related = ['items']
     filter_backends = [filters.SearchFilter, filters.OrderingFilter]
     search_fields = ['name', 'description']
-    ordering_fields = ['name', 'task_type', 'version', 'created_at']
+    ordering_fields = ['name', 'task_type', 'version', 'items_count', 'created_at']
+    cache_models = [BOMTemplate, BOMTemplateItem, Component]
+    fetch_plans = {
+        'default': {
+            'annotate': ITEMS_COUNT,
+            'fields': {
+                'items': {'prefetch_related': [Prefetch(
+                    'items', queryset=BOMTemplateItem.objects.select_related('component')
+                )]},
+            },
+        },
+    }
     
     def get_queryset(self):
         queryset = super().get_queryset()
@@ -56,13 +89,35 @@ class BOMTemplateViewSet(viewsets.ModelViewSet):
     
     def perform_create(self, serializer):
         serializer.save(created_by=self.request.user)
+    
+    @action(detail=True, methods=['post'])
+    def instantiate(self, request, pk=None):
+        """Create a BOM instance with all template items for a project."""
+        template = self.get_object()
+        serializer = BOMInstantiateSerializer(data=request.data, context={'template': template})
+        serializer.is_valid(raise_exception=True)
+        
+        instance, items_count = instantiate_template(
+            template, user=request.user, **serializer.validated_data
+        )
+        return Response({
+            'id': instance.id,
+            'name': instance.name,
+            'project': instance.project_id,
+            'template': template.id,
+            'items_count': items_count,
+            'total_cost': str(instance.total_cost),
+        }, status=status.HTTP_201_CREATED)
 
 
-class BOMTemplateItemViewSet(viewsets.ModelViewSet):
+class BOMTemplateItemViewSet(ConditionalGetMixin, FetchPlanMixin, viewsets.ModelViewSet):
     """ViewSet for BOM template item management."""
     queryset = BOMTemplateItem.objects.all()
     serializer_class = BOMTemplateItemSerializer
     permission_classes = [IsAuthenticated]
+    fetch_plans = {
+        'default': {'fields': {'component_details': {'select_related': ['component']}}},
+    }
     
     def get_queryset(self):
         queryset = super().get_queryset()
@@ -74,14 +129,30 @@ class BOMTemplateItemViewSet(viewsets.ModelViewSet):
         return queryset
 
 
-class BOMInstanceViewSet(viewsets.ModelViewSet):
+class BOMInstanceViewSet(ConditionalGetMixin, FetchPlanMixin, viewsets.ModelViewSet):
     """ViewSet for BOM instance management."""
     queryset = BOMInstance.objects.all()
     serializer_class = BOMInstanceSerializer
     permission_classes = [IsAuthenticated]
+    validator_related = ['items']
     filter_backends = [filters.SearchFilter, filters.OrderingFilter]
     search_fields = ['name', 'description']
-    ordering_fields = ['name', 'status', 'total_cost', 'created_at']
+    ordering_fields = [
+        'name', 'status', 'total_cost', 'ordered_cost', 'received_cost',
+        'installed_cost', 'items_count', 'created_at'
+    ]
+    fetch_plans = {
+        'default': {
+            'annotate': ITEMS_COUNT,
+            'fields': {
+                'project_name': {'select_related': ['project']},
+                'template_name': {'select_related': ['template']},
+                'items': {'prefetch_related': [Prefetch(
+                    'items', queryset=BOMInstanceItem.objects.select_related('component')
+                )]},
+            },
+        },
+    }
     
     def get_queryset(self):
         queryset = super().get_queryset()
@@ -99,17 +170,83 @@ class BOMInstanceViewSet(viewsets.ModelViewSet):
         serializer.save(created_by=self.request.user)
 
 
-class BOMInstanceItemViewSet(viewsets.ModelViewSet):
+class BOMInstanceItemViewSet(ConditionalGetMixin, ExportMixin, FetchPlanMixin, viewsets.ModelViewSet):
     """ViewSet for BOM instance item management."""
     queryset = BOMInstanceItem.objects.all()
     serializer_class = BOMInstanceItemSerializer
     permission_classes = [IsAuthenticated]
+    fetch_plans = {
+        'default': {'fields': {'component_details': {'select_related': ['component']}}},
+    }
+    export_fields = [
+        'id', 'bom_instance__project__code', 'bom_instance__name', 'component__sku',
+        'component__name', 'component__unit_of_measure', 'quantity_planned',
+        'quantity_ordered', 'quantity_received', 'quantity_installed',
+        'unit_cost', 'total_cost', 'notes', 'created_at', 'updated_at',
+    ]
     
     def get_queryset(self):
         queryset = super().get_queryset()
         bom_instance = self.request.query_params.get('bom_instance', None)
+        project = self.request.query_params.get('project', None)
         
+        if project:
+            queryset = queryset.filter(bom_instance__project_id=project)
         if bom_instance:
             queryset = queryset.filter(bom_instance_id=bom_instance)
         
         return queryset
+
+
+class ProjectBOMCostViewSet(ConditionalGetMixin, FetchPlanMixin, viewsets.ReadOnlyModelViewSet):
+    """ViewSet for project-level BOM cost rollups."""
+    queryset = ProjectBOMCost.objects.all()
+    serializer_class = ProjectBOMCostSerializer
+    permission_classes = [IsAuthenticated]
+    filter_backends = [filters.OrderingFilter]
+    ordering_fields = ['planned_cost', 'ordered_cost', 'received_cost', 'installed_cost']
+    fetch_plans = {
+        'default': {'fields': {'project_name': {'select_related': ['project']}}},
+    }
+    
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        project = self.request.query_params.get('project', None)
+        
+        if project:
+            queryset = queryset.filter(project_id=project)
+        
+        return queryset
+
+
+class ComponentDemandViewSet(viewsets.ViewSet):
+    """
+    Component requirements across BOM instances.
+    
+    Scope with ``?project=<id>`` or a portfolio ``?projects=<id>,<id>`` and
+    optionally ``?status=<status>,<status>`` of the BOM instances.
+    """
+    permission_classes = [IsAuthenticated]
+    
+    def get_demand(self, shortages_only=False):
+        params = self.request.query_params
+        projects = params.get('projects') or params.get('project') or ''
+        statuses = params.get('status') or ''
+        try:
+            project_ids = [int(value) for value in projects.split(',') if value.strip()]
+        except ValueError:
+            raise ValidationError({'projects': 'Expected comma separated project ids.'})
+        rows = component_demand(
+            project_ids=project_ids,
+            statuses=[value.strip() for value in statuses.split(',') if value.strip()],
+            shortages_only=shortages_only,
+        )
+        return ComponentDemandSerializer(rows, many=True).data
+    
+    def list(self, request):
+        return Response(self.get_demand())
+    
+    @action(detail=False, methods=['get'])
+    def shortages(self, request):
+        """Components whose outstanding demand exceeds stock."""
+        return Response(self.get_demand(shortages_only=True))
@@ -0,0 +1,3 @@
+"""
+Shared building blocks (viewset mixins, helpers) used across the apps.
+"""
@@ -0,0 +1,65 @@
+"""
+Typeahead suggestions.
+
+``suggest`` reads only the id and label columns of at most ``limit`` rows:
+first those where one of the ``fields`` starts with the typed text, then,
+for three or more characters, those containing it. Prefix lookups compile
+to ``UPPER(column) LIKE 'TEXT%'`` and are served by btree
+``text_pattern_ops`` indexes on ``UPPER(column)``; substring lookups by
+``gin_trgm_ops`` trigram indexes on the same expression (see
+``prefix_indexes``). Results are cached for ``CACHE_TIMEOUT`` seconds per
+query, so the hot prefixes of a burst of keystrokes cost no query at all;
+edits show up once the entry expires.
+"""
+import hashlib
+from functools import reduce
+from operator import or_
+
+from django.contrib.postgres.indexes import GinIndex, OpClass
+from django.core.cache import cache
+from django.db.models import Index, Q
+from django.db.models.functions import Upper
+
+CACHE_TIMEOUT = 30
+DEFAULT_LIMIT = 10
+MAX_LIMIT = 25
+# Shorter substrings have no trigram to look up and would scan every row.
+MIN_SUBSTRING = 3
+
+
+def prefix_indexes(prefix, field):
+    """Prefix and substring indexes on ``UPPER(field)`` named ``<prefix>_<field>_...``."""
+    return [
+        Index(OpClass(Upper(field), name='text_pattern_ops'), name=f'{prefix}_{field}_prefix'),
+        GinIndex(OpClass(Upper(field), name='gin_trgm_ops'), name=f'{prefix}_{field}_trgm'),
+    ]
+
+
+def _lookup(fields, lookup, text):
+    return reduce(or_, (Q(**{f'{field}__{lookup}': text}) for field in fields))
+
+
+def suggest(queryset, fields, text, columns, limit=DEFAULT_LIMIT):
+    """
+    ``id`` plus ``columns`` of up to ``limit`` rows of ``queryset`` whose
+    ``fields`` match ``text``, prefix matches first, each group ordered by
+    ``fields``.
+    """
+    text = text.strip()
+    if not text:
+        return []
+    key = 'autocomplete:' + hashlib.sha256(
+        f'{queryset.query}|{",".join(fields)}|{",".join(columns)}|{text.upper()}|{limit}'.encode()
+    ).hexdigest()
+    rows = cache.get(key)
+    if rows is not None:
+        return rows
+
+    prefix = _lookup(fields, 'istartswith', text)
+    rows = list(queryset.filter(prefix).order_by(*fields).values('id', *columns)[:limit])
+    if len(rows) < limit and len(text) >= MIN_SUBSTRING:
+        rows += queryset.filter(_lookup(fields, 'icontains', text)).exclude(prefix).order_by(
+            *fields
+        ).values('id', *columns)[:limit - len(rows)]
+    cache.set(key, rows, CACHE_TIMEOUT)
+    return rows
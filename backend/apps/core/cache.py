@@ -0,0 +1,72 @@
+"""
+Versioned cache keys.
+
+Every cache namespace has a version counter stored in the cache itself.
+Keys built with ``versioned_key`` embed the current version, so bumping the
+counter invalidates all keys of the namespace at once without tracking or
+deleting them individually; stale entries simply expire.
+"""
+import time
+
+from django.core.cache import cache
+from django.db import transaction
+
+
+def _version_key(namespace):
+    return f'ns:{namespace}:version'
+
+
+def namespace_version(namespace):
+    """Current version of ``namespace``."""
+    key = _version_key(namespace)
+    version = cache.get(key)
+    if version is None:
+        # Seed with a clock value so an evicted counter never reuses a
+        # version that may still have live entries.
+        cache.add(key, int(time.time() * 1000), timeout=None)
+        version = cache.get(key)
+    return version
+
+
+def namespace_versions(namespaces):
+    """Current versions of several namespaces in one cache round trip."""
+    keys = {_version_key(namespace): namespace for namespace in namespaces}
+    found = cache.get_many(keys)
+    missing = [key for key in keys if key not in found]
+    if missing:
+        seed = int(time.time() * 1000)
+        for key in missing:
+            cache.add(key, seed, timeout=None)
+        found.update(cache.get_many(missing))
+    return {keys[key]: version for key, version in found.items()}
+
+
+def bump_namespace(namespace):
+    """Invalidate every key of ``namespace``."""
+    key = _version_key(namespace)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.add(key, int(time.time() * 1000), timeout=None)
+
+
+def versioned_key(namespace, *parts, version=None):
+    """
+    Cache key for ``parts`` within the current version of ``namespace``
+    (or the given ``version``, e.g. from ``namespace_versions``).
+    """
+    if version is None:
+        version = namespace_version(namespace)
+    return ':'.join([namespace, str(version), *map(str, parts)])
+
+
+def response_namespace(model):
+    """Namespace of the cached API responses built from rows of ``model``."""
+    return f'responses:{model._meta.label_lower}'
+
+
+def invalidate_responses(model):
+    # Bump only once the write is visible, so a concurrent reader cannot
+    # cache pre-commit data under the new version.
+    namespace = response_namespace(model)
+    transaction.on_commit(lambda: bump_namespace(namespace))
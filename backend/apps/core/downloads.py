@@ -0,0 +1,161 @@
+"""
+Serving stored files from authenticated views.
+
+``serve`` answers conditional requests (``If-None-Match``,
+``If-Modified-Since``) with ``304`` before touching the file, then either
+hands the transfer to the front proxy (``DOWNLOAD_OFFLOAD``) or streams the
+file itself with a ``FileResponse``, honouring a single ``Range``. Without
+a range the open file goes to the WSGI server's file wrapper, which uses
+``sendfile`` where available.
+
+Proxy configuration for ``DOWNLOAD_OFFLOAD = 'x-accel-redirect'`` (nginx)::
+
+    location /protected-media/ {
+        internal;
+        alias /app/media/;
+    }
+
+With ``'x-sendfile'`` (Apache ``mod_xsendfile``, lighttpd) the header
+carries the absolute path, so the storage must be a local file system.
+"""
+import hashlib
+import mimetypes
+import re
+from urllib.parse import quote
+
+from django.conf import settings
+from django.http import FileResponse, Http404, HttpResponse
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import content_disposition_header, http_date, parse_etags, parse_http_date_safe
+
+RANGE = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+
+class RangeFile:
+    """Reads ``length`` bytes of ``file`` starting at ``start``."""
+
+    def __init__(self, file, start, length):
+        file.seek(start)
+        self.file = file
+        self.remaining = length
+
+    def read(self, size=-1):
+        if size < 0 or size > self.remaining:
+            size = self.remaining
+        data = self.file.read(size) if size else b''
+        self.remaining -= len(data)
+        return data
+
+    def close(self):
+        self.file.close()
+
+
+def file_etag(file, digest=None):
+    """
+    Strong ETag of a stored file: its content hash when known, otherwise
+    derived from the name, size and modification time. Stored files are
+    never rewritten in place, so either changes with the content.
+    """
+    if digest:
+        return f'"{digest}"'
+    key = f'{file.name}:{file.size}:{last_modified(file)}'
+    return f'"{hashlib.sha256(key.encode()).hexdigest()[:32]}"'
+
+
+def last_modified(file):
+    """Modification time of a stored file as a timestamp, if the storage knows it."""
+    try:
+        return int(file.storage.get_modified_time(file.name).timestamp())
+    except (NotImplementedError, OSError):
+        return None
+
+
+def parse_range(header, size):
+    """
+    ``(start, length)`` of a single byte range, ``None`` to send the whole
+    file (absent, malformed or multiple ranges), or ``False`` when the
+    range cannot be satisfied.
+    """
+    match = RANGE.match((header or '').strip())
+    if not match or match.groups() == ('', ''):
+        return None
+    first, last = match.groups()
+    if not first:
+        length = min(int(last), size)
+        return (size - length, length) if length else False
+    start = int(first)
+    end = min(int(last), size - 1) if last else size - 1
+    if start >= size or end < start:
+        return False
+    return start, end - start + 1
+
+
+def if_range_matches(request, etag, modified):
+    value = request.META.get('HTTP_IF_RANGE')
+    if not value:
+        return True
+    if value.startswith(('"', 'W/')):
+        # Only strong comparison is allowed for If-Range.
+        return parse_etags(value) == [etag]
+    return modified is not None and parse_http_date_safe(value) == modified
+
+
+def offload(response, file):
+    """Let the front proxy send ``file``; returns ``False`` if it cannot."""
+    mode = settings.DOWNLOAD_OFFLOAD
+    if mode == 'x-accel-redirect':
+        response['X-Accel-Redirect'] = settings.DOWNLOAD_ACCEL_PREFIX + quote(file.name)
+        return True
+    if mode == 'x-sendfile':
+        try:
+            response['X-Sendfile'] = file.path
+        except NotImplementedError:
+            return False
+        return True
+    return False
+
+
+def serve(request, file, filename, digest=None, as_attachment=True):
+    """Response sending the stored ``file`` as ``filename``."""
+    if not file or not file.storage.exists(file.name):
+        raise Http404('File not found.')
+    etag = file_etag(file, digest)
+    modified = last_modified(file)
+    response = get_conditional_response(request, etag=etag, last_modified=modified)
+    if response is None:
+        response = HttpResponse()
+        if not offload(response, file):
+            response = stream(request, file, filename, etag, modified, as_attachment)
+        else:
+            # The proxy sets the length and handles ranges itself.
+            response['Content-Type'] = mimetypes.guess_type(filename)[0] or 'application/octet-stream'
+            response['Content-Disposition'] = content_disposition_header(as_attachment, filename)
+    response['ETag'] = etag
+    if modified is not None:
+        response['Last-Modified'] = http_date(modified)
+    patch_cache_control(response, private=True, no_cache=True)
+    return response
+
+
+def stream(request, file, filename, etag, modified, as_attachment):
+    size = file.size
+    byte_range = None
+    if if_range_matches(request, etag, modified):
+        byte_range = parse_range(request.META.get('HTTP_RANGE'), size)
+    if byte_range is False:
+        response = HttpResponse(status=416)
+        response['Content-Range'] = f'bytes */{size}'
+        return response
+
+    source = file.open('rb')
+    if byte_range is None:
+        response = FileResponse(source, as_attachment=as_attachment, filename=filename)
+    else:
+        start, length = byte_range
+        response = FileResponse(
+            RangeFile(source, start, length), status=206, as_attachment=as_attachment, filename=filename
+        )
+        response['Content-Length'] = str(length)
+        response['Content-Range'] = f'bytes {start}-{start + length - 1}/{size}'
+    response['Accept-Ranges'] = 'bytes'
+    return response
@@ -0,0 +1,159 @@
+"""
+Streaming CSV and XLSX writers.
+
+Both take a header and an iterable of row tuples and yield the file in
+chunks as rows arrive, so an export never holds more than a chunk of rows
+in memory. The XLSX writer emits a minimal single-sheet workbook through a
+non-seekable zip stream, without third-party dependencies.
+"""
+import csv
+import datetime
+import decimal
+import re
+import zipfile
+from xml.sax.saxutils import escape
+
+from django.utils import timezone
+
+# Leading characters spreadsheet programs evaluate as formulas.
+FORMULA_PREFIXES = ('=', '+', '-', '@')
+# Control characters XML 1.0 does not allow.
+INVALID_XML_CHARS = re.compile('[\x00-\x08\x0b\x0c\x0e-\x1f]')
+
+
+def format_value(value):
+    if value is None:
+        return ''
+    if isinstance(value, datetime.datetime):
+        if timezone.is_aware(value):
+            value = timezone.localtime(value)
+        return value.isoformat(sep=' ', timespec='seconds')
+    if isinstance(value, (datetime.date, datetime.time)):
+        return value.isoformat()
+    return str(value)
+
+
+class Echo:
+    """File-like object returning what is written, for ``csv.writer``."""
+
+    def write(self, value):
+        return value
+
+
+def csv_stream(header, rows):
+    writer = csv.writer(Echo())
+    # BOM so spreadsheet programs detect UTF-8.
+    yield '\ufeff' + writer.writerow(header)
+    for row in rows:
+        values = []
+        for value in row:
+            text = format_value(value)
+            if isinstance(value, str) and text.startswith(FORMULA_PREFIXES):
+                text = "'" + text
+            values.append(text)
+        yield writer.writerow(values)
+
+
+class StreamBuffer:
+    """Write-only, non-seekable buffer the zip writer streams into."""
+
+    def __init__(self):
+        self.chunks = []
+
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def take(self):
+        data = b''.join(self.chunks)
+        self.chunks.clear()
+        return data
+
+
+def column_letter(index):
+    letters = ''
+    index += 1
+    while index:
+        index, remainder = divmod(index - 1, 26)
+        letters = chr(65 + remainder) + letters
+    return letters
+
+
+def xlsx_cell(ref, value):
+    if value is None:
+        return ''
+    if isinstance(value, bool):
+        return f'<c r="{ref}" t="b"><v>{int(value)}</v></c>'
+    if isinstance(value, (int, float, decimal.Decimal)):
+        return f'<c r="{ref}"><v>{value}</v></c>'
+    text = escape(INVALID_XML_CHARS.sub('', format_value(value)))
+    return f'<c r="{ref}" t="inlineStr"><is><t xml:space="preserve">{text}</t></is></c>'
+
+
+def xlsx_row(number, values):
+    cells = ''.join(
+        xlsx_cell(f'{column_letter(index)}{number}', value) for index, value in enumerate(values)
+    )
+    return f'<row r="{number}">{cells}</row>'.encode()
+
+
+XLSX_PARTS = {
+    '[Content_Types].xml': (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+        '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+        '<Default Extension="xml" ContentType="application/xml"/>'
+        '<Override PartName="/xl/workbook.xml" '
+        'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+        '<Override PartName="/xl/worksheets/sheet1.xml" '
+        'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+        '</Types>'
+    ),
+    '_rels/.rels': (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" '
+        'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+        'Target="xl/workbook.xml"/>'
+        '</Relationships>'
+    ),
+    'xl/workbook.xml': (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+        'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+        '<sheets><sheet name="{sheet}" sheetId="1" r:id="rId1"/></sheets>'
+        '</workbook>'
+    ),
+    'xl/_rels/workbook.xml.rels': (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" '
+        'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" '
+        'Target="worksheets/sheet1.xml"/>'
+        '</Relationships>'
+    ),
+}
+
+
+def xlsx_stream(header, rows, sheet='Export', flush_every=500):
+    buffer = StreamBuffer()
+    with zipfile.ZipFile(buffer, 'w', compression=zipfile.ZIP_DEFLATED) as workbook:
+        for name, content in XLSX_PARTS.items():
+            workbook.writestr(name, content.replace('{sheet}', escape(sheet[:31], {'"': '&quot;'})))
+        # The size is unknown up front; without ZIP64 the entry fails at 2 GiB.
+        with workbook.open('xl/worksheets/sheet1.xml', 'w', force_zip64=True) as worksheet:
+            worksheet.write(
+                b'<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+                b'<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">'
+                b'<sheetData>'
+            )
+            worksheet.write(xlsx_row(1, header))
+            for number, row in enumerate(rows, start=2):
+                worksheet.write(xlsx_row(number, row))
+                if number % flush_every == 0:
+                    yield buffer.take()
+            worksheet.write(b'</sheetData></worksheet>')
+    yield buffer.take()
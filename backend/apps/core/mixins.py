@@ -0,0 +1,364 @@
+"""
+Reusable mixins for DRF viewsets.
+"""
+import hashlib
+
+from django.core.cache import cache
+from django.core.exceptions import FieldDoesNotExist
+from django.db import transaction
+from django.db.models import Count, Max
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date
+from django.utils.text import slugify
+from rest_framework import filters
+from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework.response import Response
+
+from . import autocomplete
+from .cache import namespace_versions, response_namespace
+from .export import csv_stream, xlsx_stream
+from .serializers import parse_field_list
+
+
+def unused_columns(queryset, fields):
+    """
+    Names of the local, non-relational columns of ``queryset`` that none of
+    the serializer ``fields`` reads.
+
+    Returns an empty list when a field reads the whole object (``source='*'``,
+    e.g. method fields) or an attribute that is neither a model field nor an
+    annotation, since its column needs are unknown.
+    """
+    opts = queryset.model._meta
+    used = set()
+    for field in fields:
+        if field.source == '*':
+            return []
+        name = field.source_attrs[0]
+        if name not in queryset.query.annotations:
+            try:
+                opts.get_field(name)
+            except FieldDoesNotExist:
+                return []
+        used.add(name)
+    return [
+        f.name for f in opts.concrete_fields
+        if not f.is_relation and not f.primary_key and f.name not in used
+    ]
+
+
+class FetchPlanMixin:
+    """
+    Apply a per-action fetch plan to the viewset queryset.
+
+    ``fetch_plans`` maps an action name to a plan dict with optional
+    ``select_related``, ``prefetch_related`` and ``annotate`` keys. Actions
+    without an entry fall back to the ``default`` plan, so every serializer
+    gets the joins and annotations it needs in a constant number of queries.
+
+    A plan may also map serializer field names to sub-plans under ``fields``;
+    those are only applied when the field is serialized. On safe requests
+    the columns no serialized field reads are deferred, so sparse fieldsets
+    (see ``apps.core.serializers.SparseFieldsetMixin``) shrink the SQL too;
+    columns the view itself reads are listed under ``load``.
+    
+    ``skip_fetch_plan`` returns the bare queryset, for callers that only
+    aggregate the filtered rows (see ``ConditionalGetMixin``).
+    """
+    fetch_plans = {}
+    defer_unused_columns = True
+    skip_fetch_plan = False
+
+    def get_fetch_plan(self):
+        action = getattr(self, 'action', None)
+        return self.fetch_plans.get(action, self.fetch_plans.get('default', {}))
+
+    def get_serialized_fields(self):
+        """Fields the viewset serializer will emit for this request."""
+        if not hasattr(self, '_serialized_fields'):
+            self._serialized_fields = self.get_serializer().fields
+        return self._serialized_fields
+
+    def apply_fetch_plan(self, queryset, plan=None):
+        if plan is None:
+            plan = self.get_fetch_plan()
+        if plan.get('select_related'):
+            queryset = queryset.select_related(*plan['select_related'])
+        if plan.get('prefetch_related'):
+            queryset = queryset.prefetch_related(*plan['prefetch_related'])
+        if plan.get('annotate'):
+            queryset = queryset.annotate(**plan['annotate'])
+        if plan.get('fields'):
+            serialized = self.get_serialized_fields()
+            for name, field_plan in plan['fields'].items():
+                if name in serialized:
+                    queryset = self.apply_fetch_plan(queryset, field_plan)
+        return queryset
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.skip_fetch_plan:
+            return queryset
+        return self.apply_fetch_plan(queryset)
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        ordering = queryset.model._meta.ordering
+        if ordering and not queryset.ordered:
+            # Aggregate annotations make Django drop Meta.ordering.
+            queryset = queryset.order_by(*ordering)
+        if self.defer_unused_columns and self.request.method in SAFE_METHODS:
+            columns = unused_columns(queryset, self.get_serialized_fields().values())
+            columns = [name for name in columns if name not in self.get_fetch_plan().get('load', ())]
+            if columns:
+                queryset = queryset.defer(*columns)
+        return queryset
+
+
+class ExportMixin:
+    """
+    Add a streaming ``export`` list action.
+    
+    ``GET <list url>/export/?file_format=csv|xlsx`` writes the
+    ``export_fields`` (field paths such as ``project__code``) of every row
+    the list filters select, optionally narrowed with ``?fields=``. Rows are
+    read through a server-side cursor and written as they arrive, so memory
+    stays flat however many rows are exported.
+    """
+    export_fields = []
+    export_chunk_size = 2000
+    export_formats = {
+        'csv': ('text/csv; charset=utf-8', csv_stream),
+        'xlsx': ('application/vnd.openxmlformats-officedocument.spreadsheetml.sheet', xlsx_stream),
+    }
+    
+    def get_export_fields(self):
+        requested = parse_field_list(self.request.query_params.get('fields'))
+        if not requested:
+            return list(self.export_fields)
+        unknown = requested - set(self.export_fields)
+        if unknown:
+            raise ValidationError({'fields': f'Cannot export: {", ".join(sorted(unknown))}.'})
+        return [name for name in self.export_fields if name in requested]
+    
+    @action(detail=False, methods=['get'])
+    def export(self, request):
+        file_format = request.query_params.get('file_format', 'csv')
+        if file_format not in self.export_formats:
+            raise ValidationError({'file_format': f'Expected one of: {", ".join(self.export_formats)}.'})
+        content_type, stream = self.export_formats[file_format]
+        fields = self.get_export_fields()
+        
+        queryset = self.filter_queryset(self.get_queryset())
+        rows = queryset.values_list(*fields).iterator(chunk_size=self.export_chunk_size)
+        
+        name = slugify(queryset.model._meta.verbose_name_plural)
+        response = StreamingHttpResponse(stream(fields, rows), content_type=content_type)
+        response['Content-Disposition'] = (
+            f'attachment; filename="{name}-{timezone.localdate():%Y%m%d}.{file_format}"'
+        )
+        return response
+
+
+class AutocompleteMixin:
+    """
+    Add a typeahead ``autocomplete`` list action.
+    
+    ``GET <list url>/autocomplete/?q=<text>`` returns up to ``?limit=``
+    rows as ``{"id", "label"}`` pairs, matching ``autocomplete_fields`` by
+    prefix first and then by substring (see ``apps.core.autocomplete``).
+    Only the id and ``autocomplete_columns`` are read, the list filters and
+    fetch plans are skipped, and results are cached for a few seconds.
+    ``autocomplete_label`` formats the label from those columns.
+    """
+    autocomplete_fields = []
+    autocomplete_columns = []
+    autocomplete_label = ''
+    
+    def get_autocomplete_queryset(self):
+        return self.queryset.model._default_manager.all()
+    
+    def get_autocomplete_label(self, row):
+        return self.autocomplete_label.format(**row)
+    
+    @action(detail=False, methods=['get'])
+    def autocomplete(self, request):
+        try:
+            limit = int(request.query_params.get('limit', autocomplete.DEFAULT_LIMIT))
+        except ValueError:
+            raise ValidationError({'limit': 'A valid integer is required.'})
+        if not 1 <= limit <= autocomplete.MAX_LIMIT:
+            raise ValidationError({'limit': f'Must be between 1 and {autocomplete.MAX_LIMIT}.'})
+        
+        rows = autocomplete.suggest(
+            self.get_autocomplete_queryset(),
+            self.autocomplete_fields,
+            request.query_params.get('q', ''),
+            self.autocomplete_columns,
+            limit,
+        )
+        return Response([{'id': row['id'], 'label': self.get_autocomplete_label(row)} for row in rows])
+
+
+class CachedResponseMixin:
+    """
+    Serve read-heavy, rarely changing actions from the shared cache.
+    
+    ``cache_actions`` lists the cached actions and ``cache_models`` every
+    model their responses read. Keys embed the current versions of those
+    models' response namespaces, which their ``post_save``/``post_delete``
+    handlers bump (``apps.core.cache.invalidate_responses``), so a write
+    invalidates the cached responses of every worker at once. Keys also
+    vary by user, staff flags and role, and by the full path with query
+    string. Custom actions opt in by returning ``self.cached_response``.
+    """
+    cache_actions = ['list', 'retrieve']
+    cache_models = []
+    cache_timeout = 15 * 60
+    
+    def get_response_cache_key(self, request):
+        versions = namespace_versions([response_namespace(model) for model in self.cache_models])
+        user = request.user
+        parts = [
+            type(self).__module__, type(self).__name__, self.action,
+            *(f'{namespace}={version}' for namespace, version in sorted(versions.items())),
+            user.pk, user.is_staff, user.is_superuser, getattr(user, 'role_id', None),
+            request.get_full_path(),
+        ]
+        return 'response:' + hashlib.sha256('|'.join(map(str, parts)).encode()).hexdigest()
+    
+    def cached_response(self, handler, request, *args, **kwargs):
+        if self.action not in self.cache_actions or request.method not in SAFE_METHODS:
+            return handler(request, *args, **kwargs)
+        key = self.get_response_cache_key(request)
+        data = cache.get(key)
+        if data is not None:
+            return Response(data)
+        response = handler(request, *args, **kwargs)
+        if response.status_code == 200:
+            cache.set(key, response.data, self.cache_timeout)
+        return response
+    
+    def list(self, request, *args, **kwargs):
+        return self.cached_response(super().list, request, *args, **kwargs)
+    
+    def retrieve(self, request, *args, **kwargs):
+        return self.cached_response(super().retrieve, request, *args, **kwargs)
+
+
+class ConditionalGetMixin:
+    """
+    ``ETag``/``Last-Modified`` validators from ``updated_at``.
+    
+    Lists are validated by ``max(updated_at)`` and the row count of the
+    filtered queryset, details by the ``updated_at`` of the row, both read
+    with one aggregate query without the fetch plan's joins and
+    annotations. A matching ``If-None-Match`` answers ``304`` before
+    anything is serialized. Updates and deletes honour ``If-Match`` and
+    ``If-Unmodified-Since`` with ``412``; the row stays locked from the
+    check until the write commits.
+    
+    ``Last-Modified`` is only sent, and ``If-Modified-Since`` only
+    honoured, for details without ``validator_related``: deleted rows, and
+    rows leaving a filter, change a list without moving its newest
+    ``updated_at``, so a date alone would answer ``304`` for stale content.
+    
+    ``validator_related`` names relations shown in the representation
+    (e.g. item counts) whose ``updated_at`` and row count are folded into
+    the validators, so changes to those rows invalidate them too.
+    """
+    validator_field = 'updated_at'
+    validator_related = []
+    
+    def get_validator_queryset(self):
+        """The filtered rows of the request, unordered and without the fetch plan."""
+        self.skip_fetch_plan = True
+        try:
+            queryset = self.get_queryset()
+        finally:
+            self.skip_fetch_plan = False
+        for backend in self.filter_backends:
+            if not issubclass(backend, filters.OrderingFilter):
+                queryset = backend().filter_queryset(self.request, queryset, self)
+        return queryset.order_by()
+    
+    def get_validators(self, queryset, detail=False):
+        """``(etag, last_modified)`` of ``queryset``, or ``(None, None)`` without rows."""
+        field = self.validator_field
+        aggregates = {'modified_0': Max(field), 'count_0': Count('pk', distinct=bool(self.validator_related))}
+        for index, relation in enumerate(self.validator_related, start=1):
+            aggregates[f'modified_{index}'] = Max(f'{relation}__{field}')
+            aggregates[f'count_{index}'] = Count(relation, distinct=True)
+        stats = queryset.aggregate(**aggregates)
+        if not stats['count_0']:
+            return None, None
+        modified = max(value for name, value in stats.items() if name.startswith('modified_') and value)
+        # Details are keyed by row so If-Match works across URLs; lists by
+        # their full path, since filters and pages change the content.
+        scope = self.kwargs[self.lookup_url_kwarg or self.lookup_field] if detail else self.request.get_full_path()
+        key = '|'.join(map(str, [
+            queryset.model._meta.label_lower, scope,
+            *(stats[name].isoformat() if stats[name] else '' for name in sorted(stats) if name.startswith('modified_')),
+            *(stats[name] for name in sorted(stats) if name.startswith('count_')),
+        ]))
+        return f'"{hashlib.sha256(key.encode()).hexdigest()[:32]}"', int(modified.timestamp())
+    
+    def uses_last_modified(self, detail):
+        return detail and not self.validator_related
+    
+    def get_detail_queryset(self):
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        return self.get_validator_queryset().filter(**{self.lookup_field: self.kwargs[lookup_url_kwarg]})
+    
+    def conditional_response(self, handler, request, *args, detail=False, **kwargs):
+        queryset = self.get_detail_queryset() if detail else self.get_validator_queryset()
+        etag, modified = self.get_validators(queryset, detail=detail)
+        if etag is None:
+            return handler(request, *args, **kwargs)
+        if not self.uses_last_modified(detail):
+            modified = None
+        response = get_conditional_response(request, etag=etag, last_modified=modified)
+        if response is None:
+            response = handler(request, *args, **kwargs)
+        return self.set_validators(response, etag, modified)
+    
+    def set_validators(self, response, etag, modified):
+        if response.status_code in (200, 304) and etag is not None:
+            response['ETag'] = etag
+            if modified is not None:
+                response['Last-Modified'] = http_date(modified)
+            patch_cache_control(response, private=True, no_cache=True)
+        return response
+    
+    def conditional_write(self, handler, request, *args, **kwargs):
+        with transaction.atomic():
+            if 'HTTP_IF_MATCH' in request.META or 'HTTP_IF_UNMODIFIED_SINCE' in request.META:
+                queryset = self.get_detail_queryset()
+                locked = queryset.model._default_manager.select_for_update().filter(pk__in=queryset.values('pk'))
+                if locked.exists():
+                    etag, modified = self.get_validators(queryset, detail=True)
+                    response = get_conditional_response(request, etag=etag, last_modified=modified)
+                    if response is not None:
+                        return response
+            response = handler(request, *args, **kwargs)
+        if request.method in ('PUT', 'PATCH') and response.status_code == 200:
+            # The new validators, for the next conditional write.
+            etag, modified = self.get_validators(self.get_detail_queryset(), detail=True)
+            response = self.set_validators(response, etag, modified if self.uses_last_modified(True) else None)
+        return response
+    
+    def list(self, request, *args, **kwargs):
+        return self.conditional_response(super().list, request, *args, **kwargs)
+    
+    def retrieve(self, request, *args, **kwargs):
+        return self.conditional_response(super().retrieve, request, *args, detail=True, **kwargs)
+    
+    def update(self, request, *args, **kwargs):
+        return self.conditional_write(super().update, request, *args, **kwargs)
+    
+    def destroy(self, request, *args, **kwargs):
+        return self.conditional_write(super().destroy, request, *args, **kwargs)
@@ -0,0 +1,227 @@
+"""
+Pagination supporting both page numbers and keyset cursors.
+"""
+import base64
+import binascii
+import datetime
+import decimal
+import json
+import uuid
+from functools import reduce
+from operator import or_
+
+from django.core.exceptions import FieldDoesNotExist, ValidationError as DjangoValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound, ValidationError
+from rest_framework.pagination import PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+def encode_value(value):
+    # Full precision: DjangoJSONEncoder truncates datetimes to milliseconds.
+    if isinstance(value, (datetime.datetime, datetime.date, datetime.time)):
+        return value.isoformat()
+    if isinstance(value, (decimal.Decimal, uuid.UUID)):
+        return str(value)
+    return value
+
+
+def keyset_filter(keys, values, backwards=False):
+    """
+    ``Q`` selecting the rows that sort after ``values`` for the ``keys``
+    ordering (before them with ``backwards``).
+
+    Expands to ``k1 > v1 OR (k1 = v1 AND k2 > v2) OR ...`` with the
+    comparison flipped for descending keys, plus a range condition on the
+    leading key so the matching index can be range-scanned.
+    """
+    clauses = []
+    equal = {}
+    for (name, descending), value in zip(keys, values):
+        lookup = 'lt' if descending != backwards else 'gt'
+        clauses.append(Q(**equal, **{f'{name}__{lookup}': value}))
+        equal[name] = value
+    (name, descending), value = keys[0], values[0]
+    leading = Q(**{f'{name}__{"lte" if descending != backwards else "gte"}': value})
+    return leading & reduce(or_, clauses)
+
+
+class HybridPagination(PageNumberPagination):
+    """
+    Page number pagination with an optional keyset mode.
+
+    ``?page=`` works as before; ``?count=false`` skips the ``COUNT(*)``.
+    ``?pagination=keyset`` (or any ``?cursor=``) switches to keyset
+    pagination over the queryset ordering, falling back to ``Meta.ordering``
+    with the primary key as tie-breaker. Each page is a single index range
+    scan, so deep pages cost the same as the first one.
+    """
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    cursor_query_param = 'cursor'
+    mode_query_param = 'pagination'
+    count_query_param = 'count'
+    invalid_cursor_message = 'Invalid cursor.'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.display_page_controls = False
+        params = request.query_params
+        self.keyset = (
+            self.cursor_query_param in params or params.get(self.mode_query_param) == 'keyset'
+        )
+        self.counted = params.get(self.count_query_param, '').lower() not in ('false', '0')
+        page_size = self.get_page_size(request)
+        if not page_size:
+            return None
+        if self.keyset:
+            return self.paginate_keyset(queryset, page_size)
+        if not self.counted:
+            return self.paginate_uncounted(queryset, page_size)
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        if self.keyset:
+            return Response({
+                'next': self.get_next_link(),
+                'previous': self.get_previous_link(),
+                'results': data,
+            })
+        if not self.counted:
+            return Response({
+                'count': None,
+                'next': self.get_next_link(),
+                'previous': self.get_previous_link(),
+                'results': data,
+            })
+        return super().get_paginated_response(data)
+
+    def get_next_link(self):
+        if self.keyset or not self.counted:
+            return self.next_link
+        return super().get_next_link()
+
+    def get_previous_link(self):
+        if self.keyset or not self.counted:
+            return self.previous_link
+        return super().get_previous_link()
+
+    # Page numbers without COUNT(*)
+
+    def paginate_uncounted(self, queryset, page_size):
+        try:
+            number = int(self.request.query_params.get(self.page_query_param, 1))
+        except ValueError:
+            number = 0
+        if number < 1:
+            raise NotFound(self.invalid_page_message.format(
+                page_number=self.request.query_params.get(self.page_query_param),
+                message='That page number is less than 1',
+            ))
+        offset = (number - 1) * page_size
+        rows = list(queryset[offset:offset + page_size + 1])
+
+        url = self.request.build_absolute_uri()
+        self.next_link = None
+        self.previous_link = None
+        if len(rows) > page_size:
+            self.next_link = replace_query_param(url, self.page_query_param, number + 1)
+        if number == 2:
+            self.previous_link = remove_query_param(url, self.page_query_param)
+        elif number > 2:
+            self.previous_link = replace_query_param(url, self.page_query_param, number - 1)
+        return rows[:page_size]
+
+    # Keyset pagination
+
+    def get_keyset_ordering(self, queryset):
+        """``(attname, descending)`` pairs the keyset is ordered by."""
+        opts = queryset.model._meta
+        ordering = list(queryset.query.order_by) or list(opts.ordering)
+        keys = []
+        for item in ordering:
+            if not isinstance(item, str):
+                raise ValidationError({'ordering': 'Keyset pagination needs a field ordering.'})
+            name = item.lstrip('-')
+            if name == 'pk':
+                name = opts.pk.name
+            try:
+                field = opts.get_field(name)
+            except FieldDoesNotExist:
+                field = None
+            if field is None or not field.concrete or field.many_to_many or field.null:
+                raise ValidationError(
+                    {'ordering': f'Keyset pagination does not support ordering by "{name}".'}
+                )
+            keys.append((field.attname, item.startswith('-')))
+
+        if not self.is_unique(opts, {name for name, _ in keys}):
+            descending = keys[-1][1] if keys else False
+            keys.append((opts.pk.attname, descending))
+        return keys
+
+    def is_unique(self, opts, attnames):
+        names = {f.name for f in opts.concrete_fields if f.attname in attnames}
+        if any(opts.get_field(name).unique for name in names):
+            return True
+        return any(set(fields) <= names for fields in opts.unique_together)
+
+    def encode_cursor(self, keys, row, backwards):
+        payload = {
+            'k': [('-' if descending else '') + name for name, descending in keys],
+            'v': [encode_value(getattr(row, name)) for name, _ in keys],
+            'b': backwards,
+        }
+        token = base64.urlsafe_b64encode(json.dumps(payload).encode()).decode()
+        return replace_query_param(
+            remove_query_param(self.request.build_absolute_uri(), self.page_query_param),
+            self.cursor_query_param,
+            token,
+        )
+
+    def decode_cursor(self, keys, opts):
+        token = self.request.query_params.get(self.cursor_query_param)
+        if not token:
+            return None, False
+        fields = {field.attname: field for field in opts.concrete_fields}
+        try:
+            payload = json.loads(base64.urlsafe_b64decode(token.encode()))
+            expected = [('-' if descending else '') + name for name, descending in keys]
+            if payload['k'] != expected or len(payload['v']) != len(keys):
+                raise ValueError
+            # Converted here: a bad value reaching the query is a server error.
+            values = [fields[name].to_python(value) for (name, _), value in zip(keys, payload['v'])]
+            if None in values:
+                raise ValueError
+            return values, bool(payload['b'])
+        except (binascii.Error, TypeError, KeyError, ValueError, DjangoValidationError):
+            raise NotFound(self.invalid_cursor_message)
+
+    def paginate_keyset(self, queryset, page_size):
+        keys = self.get_keyset_ordering(queryset)
+        values, backwards = self.decode_cursor(keys, queryset.model._meta)
+
+        deferred, defer = queryset.query.deferred_loading
+        if defer and deferred & {name for name, _ in keys}:
+            # The cursor is built from the key columns; never lazy-load them.
+            queryset = queryset.defer(None).defer(*(deferred - {name for name, _ in keys}))
+
+        order = [(name, descending != backwards) for name, descending in keys]
+        queryset = queryset.order_by(*[('-' if desc else '') + name for name, desc in order])
+        if values is not None:
+            queryset = queryset.filter(keyset_filter(keys, values, backwards))
+        rows = list(queryset[:page_size + 1])
+        has_more = len(rows) > page_size
+        rows = rows[:page_size]
+
+        if backwards:
+            rows.reverse()
+            has_next, has_previous = True, has_more
+        else:
+            has_next, has_previous = has_more, values is not None
+        self.next_link = self.encode_cursor(keys, rows[-1], False) if rows and has_next else None
+        self.previous_link = (
+            self.encode_cursor(keys, rows[0], True) if rows and has_previous else None
+        )
+        return rows
@@ -0,0 +1,48 @@
+"""
+Reusable serializer mixins.
+"""
+from rest_framework import serializers
+from rest_framework.permissions import SAFE_METHODS
+
+
+def parse_field_list(value):
+    """Set of names from a comma separated query parameter."""
+    return {name.strip() for name in (value or '').split(',') if name.strip()}
+
+
+class SparseFieldsetMixin:
+    """
+    Let clients choose which fields a serializer emits.
+    
+    On safe requests the top-level serializer honours ``?fields=a,b`` and
+    leaves out the ``Meta.expandable_fields`` on list views unless they are
+    named in ``?expand=`` (or ``?fields=``). Nested serializers and writes
+    always use the full field set.
+    """
+    
+    def is_top_level(self):
+        parent = self.parent
+        if isinstance(parent, serializers.ListSerializer):
+            parent = parent.parent
+        return parent is None
+    
+    def get_fields(self):
+        fields = super().get_fields()
+        request = self.context.get('request')
+        if request is None or request.method not in SAFE_METHODS or not self.is_top_level():
+            return fields
+        
+        requested = parse_field_list(request.query_params.get('fields'))
+        expanded = parse_field_list(request.query_params.get('expand'))
+        view = self.context.get('view')
+        summary = getattr(view, 'action', None) == 'list'
+        expandable = set(getattr(self.Meta, 'expandable_fields', ()))
+        
+        for name in list(fields):
+            if name in expanded:
+                continue
+            if requested and name not in requested:
+                fields.pop(name)
+            elif summary and name in expandable and name not in requested:
+                fields.pop(name)
+        return fields
@@ -1,5 +1,8 @@
 from django.db import models
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
 from django.conf import settings
+from apps.core.autocomplete import prefix_indexes
 from apps.projects.models import Project
 
 
@@ -60,6 +63,9 @@ class Device(models.Model):
         related_name='created_devices'
     )
     
+    # Weighted full-text vector, maintained by apps.search.
+    search_vector = SearchVectorField(null=True, editable=False)
+    
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
@@ -71,6 +77,10 @@ class Device(models.Model):
             models.Index(fields=['serial_number']),
             models.Index(fields=['device_type']),
             models.Index(fields=['status']),
+            models.Index(fields=['project', 'updated_at', 'id']),
+            GinIndex(fields=['search_vector'], name='devices_device_search_idx'),
+            *prefix_indexes('device', 'serial_number'),
+            *prefix_indexes('device', 'name'),
         ]
     
     def __str__(self):
@@ -1,8 +1,9 @@
 from rest_framework import serializers
+from apps.core.serializers import SparseFieldsetMixin
 from .models import Device
 
 
-class DeviceSerializer(serializers.ModelSerializer):
+class DeviceSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     project_name = serializers.CharField(source='project.name', read_only=True)
     created_by_name = serializers.CharField(source='created_by.full_name', read_only=True)
     
@@ -1,17 +1,36 @@
 from rest_framework import viewsets, filters
+from rest_framework.exceptions import NotFound, ValidationError
 from rest_framework.permissions import IsAuthenticated
+from apps.core.mixins import AutocompleteMixin, ConditionalGetMixin, ExportMixin, FetchPlanMixin
+from apps.projects.models import Project
+from apps.search.filters import SearchVectorFilter
 from .models import Device
 from .serializers import DeviceSerializer
 
 
-class DeviceViewSet(viewsets.ModelViewSet):
+class DeviceViewSet(ConditionalGetMixin, AutocompleteMixin, ExportMixin, FetchPlanMixin, viewsets.ModelViewSet):
     """ViewSet for device management."""
     queryset = Device.objects.all()
     serializer_class = DeviceSerializer
     permission_classes = [IsAuthenticated]
-    filter_backends = [filters.SearchFilter, filters.OrderingFilter]
+    filter_backends = [SearchVectorFilter, filters.OrderingFilter]
     search_fields = ['name', 'serial_number', 'manufacturer', 'model']
     ordering_fields = ['name', 'device_type', 'status', 'created_at']
+    fetch_plans = {
+        'default': {'fields': {
+            'project_name': {'select_related': ['project']},
+            'created_by_name': {'select_related': ['created_by']},
+        }},
+    }
+    export_fields = [
+        'id', 'project__code', 'name', 'device_type', 'manufacturer', 'model',
+        'serial_number', 'status', 'location', 'mac_address',
+        'firmware_version', 'installation_date', 'warranty_expiry', 'notes',
+        'created_at', 'updated_at',
+    ]
+    autocomplete_fields = ['serial_number', 'name']
+    autocomplete_columns = ['name', 'serial_number']
+    autocomplete_label = '{name} ({serial_number})'
     
     def get_queryset(self):
         queryset = super().get_queryset()
@@ -28,5 +47,14 @@ class DeviceViewSet(viewsets.ModelViewSet):
         
         return queryset
     
+    def get_autocomplete_queryset(self):
+        # Suggestions are always scoped to one project the user can see.
+        project = self.request.query_params.get('project', '')
+        if not project.isdigit():
+            raise ValidationError({'project': 'A project id is required.'})
+        if not Project.objects.visible_to(self.request.user).filter(pk=project).exists():
+            raise NotFound('Project not found.')
+        return Device.objects.filter(project_id=project)
+    
     def perform_create(self, serializer):
         serializer.save(created_by=self.request.user)
@@ -1,5 +1,23 @@
 from django.contrib import admin
-from .models import Document, Photo
+from .models import Blob, Document, Photo, UploadSession
+
+
+@admin.register(Blob)
+class BlobAdmin(admin.ModelAdmin):
+    list_display = ['sha256', 'size', 'ref_count', 'created_at', 'updated_at']
+    search_fields = ['sha256']
+    ordering = ['-created_at']
+    
+    fieldsets = (
+        ('Content', {
+            'fields': ('sha256', 'size', 'file')
+        }),
+        ('Usage', {
+            'fields': ('ref_count', 'created_at', 'updated_at')
+        }),
+    )
+    
+    readonly_fields = ['sha256', 'size', 'file', 'ref_count', 'created_at', 'updated_at']
 
 
 @admin.register(Document)
@@ -14,7 +32,7 @@ class DocumentAdmin(admin.ModelAdmin):
             'fields': ('project', 'task', 'title', 'document_type', 'description', 'version')
         }),
         ('File', {
-            'fields': ('file', 'file_size')
+            'fields': ('file', 'file_size', 'blob')
         }),
         ('Tags', {
             'fields': ('tags',)
@@ -24,13 +42,13 @@ class DocumentAdmin(admin.ModelAdmin):
         }),
     )
     
-    readonly_fields = ['file_size', 'created_at', 'updated_at']
+    readonly_fields = ['file_size', 'blob', 'created_at', 'updated_at']
 
 
 @admin.register(Photo)
 class PhotoAdmin(admin.ModelAdmin):
-    list_display = ['title', 'project', 'task', 'location', 'uploaded_by', 'taken_at', 'created_at']
-    list_filter = ['project', 'created_at']
+    list_display = ['title', 'project', 'task', 'location', 'uploaded_by', 'taken_at', 'derivatives_status', 'created_at']
+    list_filter = ['project', 'derivatives_status', 'created_at']
     search_fields = ['title', 'description', 'location']
     ordering = ['-created_at']
     
@@ -39,7 +57,7 @@ class PhotoAdmin(admin.ModelAdmin):
             'fields': ('project', 'task', 'title', 'description')
         }),
         ('Images', {
-            'fields': ('image', 'thumbnail')
+            'fields': ('image', 'blob', 'derivatives_status', 'thumbnail', 'medium', 'web')
         }),
         ('Location', {
             'fields': ('location', 'gps_coordinates')
@@ -52,4 +70,32 @@ class PhotoAdmin(admin.ModelAdmin):
         }),
     )
     
-    readonly_fields = ['created_at', 'updated_at']
+    readonly_fields = ['blob', 'derivatives_status', 'thumbnail', 'medium', 'web', 'created_at', 'updated_at']
+
+
+@admin.register(UploadSession)
+class UploadSessionAdmin(admin.ModelAdmin):
+    list_display = ['filename', 'target', 'status', 'offset', 'total_size', 'created_by', 'updated_at']
+    list_filter = ['target', 'status', 'created_at']
+    search_fields = ['filename']
+    ordering = ['-created_at']
+    
+    fieldsets = (
+        ('Upload', {
+            'fields': ('id', 'target', 'filename', 'content_type', 'status')
+        }),
+        ('Progress', {
+            'fields': ('total_size', 'offset', 'expected_sha256', 'sha256')
+        }),
+        ('Result', {
+            'fields': ('blob', 'document', 'photo')
+        }),
+        ('Metadata', {
+            'fields': ('created_by', 'created_at', 'updated_at')
+        }),
+    )
+    
+    readonly_fields = [
+        'id', 'target', 'filename', 'content_type', 'status', 'total_size', 'offset',
+        'expected_sha256', 'sha256', 'blob', 'document', 'photo', 'created_by', 'created_at', 'updated_at'
+    ]
@@ -0,0 +1,126 @@
+"""
+Content-addressed storage for document and photo files.
+
+Uploads are hashed while Django streams them to disk
+(``HashingUploadHandler``); ``store`` then returns the ``Blob`` already
+holding those bytes, or writes a new one, and the document or photo points
+its file field at the blob's file. Reference counts follow the ``blob``
+foreign keys through the signal handlers with ``F()`` updates, and
+``gc_blobs`` deletes blobs no row uses any more.
+"""
+import hashlib
+
+from django.core.files.uploadhandler import FileUploadHandler
+from django.db import IntegrityError, transaction
+from django.db.models import Exists, F, OuterRef
+from django.utils import timezone
+
+from apps.projects.models import Project
+from .models import Blob, Document, Photo
+
+
+class HashingUploadHandler(FileUploadHandler):
+    """
+    Computes the SHA-256 of each uploaded file as its chunks arrive and
+    records it in ``request.upload_sha256`` by field name. Passes the data
+    on untouched, so the next handlers still build the file.
+    """
+
+    def new_file(self, *args, **kwargs):
+        super().new_file(*args, **kwargs)
+        self.digest = hashlib.sha256()
+
+    def receive_data_chunk(self, raw_data, start):
+        self.digest.update(raw_data)
+        return raw_data
+
+    def file_complete(self, file_size):
+        self.request.upload_sha256[self.field_name] = self.digest.hexdigest()
+        return None
+
+
+def file_sha256(file):
+    digest = hashlib.sha256()
+    for chunk in file.chunks():
+        digest.update(chunk)
+    file.seek(0)
+    return digest.hexdigest()
+
+
+def touch(blob):
+    # Marks the blob as in use so a concurrent gc_blobs keeps it.
+    Blob.objects.filter(pk=blob.pk).update(updated_at=timezone.now())
+
+
+def find(sha256, size=None):
+    """The stored blob with ``sha256`` (and ``size``, if given), or ``None``."""
+    if not sha256:
+        return None
+    blob = Blob.objects.filter(sha256=sha256.lower()).first()
+    if blob is None or (size is not None and blob.size != size):
+        return None
+    touch(blob)
+    return blob
+
+
+def find_visible(sha256, size, user):
+    """
+    ``find`` limited to blobs a document or photo in a project visible to
+    ``user`` already uses, so knowing a hash grants nothing beyond what the
+    user can download anyway.
+    """
+    if not sha256:
+        return None
+    visible = Project.objects.visible_to(user).values('pk')
+    blob = Blob.objects.filter(sha256=sha256.lower(), size=size).filter(
+        Exists(Document.objects.filter(blob=OuterRef('pk'), project__in=visible))
+        | Exists(Photo.objects.filter(blob=OuterRef('pk'), project__in=visible))
+    ).first()
+    if blob is not None:
+        touch(blob)
+    return blob
+
+
+def store(file, sha256=None):
+    """
+    Return the blob holding the content of ``file``, writing it only when
+    no blob has that hash yet. ``sha256`` skips hashing when the caller
+    already knows it.
+    """
+    sha256 = sha256 or file_sha256(file)
+    blob = find(sha256)
+    if blob is not None:
+        return blob
+    blob = Blob(sha256=sha256, size=file.size)
+    blob.file.save(file.name, file, save=False)
+    try:
+        with transaction.atomic():
+            blob.save()
+    except IntegrityError:
+        # Another upload stored the same content first.
+        blob.file.delete(save=False)
+        blob = find(sha256)
+    return blob
+
+
+def save_with_blob(serializer, field, blob, **kwargs):
+    """Save a document or photo serializer pointing ``field`` at ``blob``."""
+    return serializer.save(**{field: blob.file.name}, blob=blob, **kwargs)
+
+
+def ensure_snapshot(instance):
+    """Load the stored blob of an existing row without a snapshot."""
+    if instance._state.adding or hasattr(instance, '_saved_blob_id'):
+        return
+    instance._saved_blob_id = (
+        type(instance).objects.filter(pk=instance.pk).values_list('blob_id', flat=True).first()
+    )
+
+
+def reference_changed(old_blob_id, new_blob_id):
+    if old_blob_id == new_blob_id:
+        return
+    if old_blob_id is not None:
+        Blob.objects.filter(pk=old_blob_id).update(ref_count=F('ref_count') - 1, updated_at=timezone.now())
+    if new_blob_id is not None:
+        Blob.objects.filter(pk=new_blob_id).update(ref_count=F('ref_count') + 1, updated_at=timezone.now())
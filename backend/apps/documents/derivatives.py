@@ -0,0 +1,172 @@
+"""
+Photo derivatives and EXIF extraction.
+
+``generate`` decodes the original once, reads its EXIF block into
+``Photo.metadata`` (filling ``taken_at`` and ``gps_coordinates`` when they
+were not given), then writes progressively smaller JPEG renditions from
+that single decode. Renditions are rotated upright and saved without
+EXIF, so they never carry the camera location.
+"""
+import datetime
+import io
+import logging
+import os
+
+from django.core.files.base import ContentFile
+from django.utils import timezone
+from PIL import ExifTags, Image, ImageOps
+
+from .models import Photo
+
+logger = logging.getLogger(__name__)
+
+# Field name -> (longest edge in pixels, JPEG quality), largest first.
+DERIVATIVES = {
+    'web': (2048, 82),
+    'medium': (1024, 80),
+    'thumbnail': (320, 75),
+}
+
+EXIF_TAGS = {
+    ExifTags.Base.Make: 'make',
+    ExifTags.Base.Model: 'model',
+    ExifTags.Base.LensModel: 'lens_model',
+    ExifTags.Base.Software: 'software',
+    ExifTags.Base.Orientation: 'orientation',
+    ExifTags.Base.ExposureTime: 'exposure_time',
+    ExifTags.Base.FNumber: 'f_number',
+    ExifTags.Base.ISOSpeedRatings: 'iso',
+    ExifTags.Base.FocalLength: 'focal_length',
+    ExifTags.Base.Flash: 'flash',
+    ExifTags.Base.DateTimeOriginal: 'date_time_original',
+    ExifTags.Base.OffsetTimeOriginal: 'offset_time_original',
+}
+
+
+def exif_value(value):
+    """JSON-serializable form of an EXIF value."""
+    if isinstance(value, bytes):
+        return value.decode('ascii', 'replace').strip('\x00').strip()
+    if isinstance(value, str):
+        return value.strip('\x00').strip()
+    if isinstance(value, (tuple, list)):
+        return [exif_value(item) for item in value]
+    if isinstance(value, int):
+        return value
+    try:
+        return round(float(value), 6)
+    except (TypeError, ValueError, ZeroDivisionError):
+        return str(value)
+
+
+def parse_taken_at(exif):
+    """``DateTimeOriginal`` as an aware datetime, or ``None``."""
+    raw = exif.get('date_time_original')
+    if not raw:
+        return None
+    try:
+        taken_at = datetime.datetime.strptime(raw, '%Y:%m:%d %H:%M:%S')
+    except (TypeError, ValueError):
+        return None
+    offset = exif.get('offset_time_original')
+    if offset:
+        try:
+            return taken_at.replace(tzinfo=datetime.datetime.strptime(offset, '%z').tzinfo)
+        except (TypeError, ValueError):
+            pass
+    # Cameras record local time without a zone; assume the project's zone.
+    return timezone.make_aware(taken_at)
+
+
+def gps_degrees(value, ref):
+    degrees, minutes, seconds = (float(part) for part in value)
+    result = degrees + minutes / 60 + seconds / 3600
+    return -result if ref in ('S', 'W') else result
+
+
+def parse_gps(gps_ifd):
+    """``"lat,lon"`` from a GPS IFD, or an empty string."""
+    try:
+        latitude = gps_degrees(gps_ifd[ExifTags.GPS.GPSLatitude], gps_ifd.get(ExifTags.GPS.GPSLatitudeRef))
+        longitude = gps_degrees(gps_ifd[ExifTags.GPS.GPSLongitude], gps_ifd.get(ExifTags.GPS.GPSLongitudeRef))
+    except (KeyError, TypeError, ValueError, ZeroDivisionError):
+        return ''
+    if not (-90 <= latitude <= 90 and -180 <= longitude <= 180):
+        return ''
+    return f'{latitude:.6f},{longitude:.6f}'
+
+
+def read_exif(image):
+    """Return ``(exif, gps_coordinates)`` read from an opened image."""
+    raw = image.getexif()
+    tags = {**raw, **raw.get_ifd(ExifTags.IFD.Exif)}
+    exif = {
+        name: exif_value(tags[tag]) for tag, name in EXIF_TAGS.items() if tag in tags
+    }
+    return exif, parse_gps(raw.get_ifd(ExifTags.IFD.GPSInfo))
+
+
+def render(image, size, quality):
+    # Shrinks ``image`` in place, so each rendition starts from the last.
+    image.thumbnail((size, size), Image.LANCZOS)
+    output = io.BytesIO()
+    image.save(output, 'JPEG', quality=quality, optimize=True, progressive=True)
+    return output.getvalue()
+
+
+def delete_derivatives(photo):
+    for name in DERIVATIVES:
+        field = getattr(photo, name)
+        if field:
+            field.storage.delete(field.name)
+
+
+def generate(photo):
+    """
+    Extract EXIF and write the derivatives of ``photo``. Returns ``True``
+    on success; an unreadable image marks the photo ``failed``.
+    """
+    # Only write results for the image that was processed; a replacement
+    # uploaded meanwhile has its own run queued.
+    current = Photo.objects.filter(pk=photo.pk, image=photo.image.name)
+    try:
+        with photo.image.open('rb'), Image.open(photo.image) as original:
+            exif, gps_coordinates = read_exif(original)
+            info = {'width': original.width, 'height': original.height, 'format': original.format}
+            # Let JPEG decode at a reduced scale when the original is far
+            # larger than the largest rendition.
+            largest = max(size for size, _ in DERIVATIVES.values())
+            original.draft('RGB', (largest, largest))
+            image = ImageOps.exif_transpose(original).convert('RGB')
+            renditions = {name: render(image, size, quality) for name, (size, quality) in DERIVATIVES.items()}
+    except (OSError, ValueError, Image.DecompressionBombError) as exc:
+        logger.warning('Could not generate derivatives for photo %s: %s', photo.pk, exc)
+        current.update(derivatives_status='failed', updated_at=timezone.now())
+        return False
+
+    previous = [getattr(photo, name).name for name in DERIVATIVES if getattr(photo, name)]
+    stem = os.path.splitext(os.path.basename(photo.image.name))[0]
+    for name, content in renditions.items():
+        getattr(photo, name).save(f'{photo.pk}-{stem}.jpg', ContentFile(content), save=False)
+
+    photo.metadata = {**photo.metadata, 'exif': exif, 'image': info}
+    if not photo.taken_at:
+        photo.taken_at = parse_taken_at(exif)
+    if not photo.gps_coordinates:
+        photo.gps_coordinates = gps_coordinates
+    photo.derivatives_status = 'ready'
+    # An update() so the write does not go through the upload signals again.
+    updated = current.update(
+        **{name: getattr(photo, name).name for name in DERIVATIVES},
+        metadata=photo.metadata,
+        taken_at=photo.taken_at,
+        gps_coordinates=photo.gps_coordinates,
+        derivatives_status='ready',
+        updated_at=timezone.now(),
+    )
+    if not updated:
+        delete_derivatives(photo)
+        return False
+    for name in previous:
+        photo.image.storage.delete(name)
+    return True
@@ -0,0 +1,56 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from apps.documents import blobs
+from apps.documents.models import Document, Photo
+
+
+class Command(BaseCommand):
+    help = 'Move document and photo files uploaded before content-addressed storage into shared blobs'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--project', type=int, help='Only files of this project id')
+
+    def still_used(self, name):
+        return (
+            Document.objects.filter(file=name).exists()
+            or Photo.objects.filter(image=name).exists()
+        )
+
+    def handle(self, *args, **options):
+        moved = missing = 0
+        for model in (Document, Photo):
+            field = model.blob_field
+            rows = model.objects.filter(blob__isnull=True).exclude(**{field: ''}).order_by('pk')
+            if options['project']:
+                rows = rows.filter(project_id=options['project'])
+
+            for row in rows.only('pk', field).iterator(chunk_size=100):
+                file = getattr(row, field)
+                old_name = file.name
+                try:
+                    file.open('rb')
+                except FileNotFoundError:
+                    missing += 1
+                    continue
+                try:
+                    blob = blobs.store(file)
+                finally:
+                    file.close()
+                if blob.file.name == old_name:
+                    continue
+
+                # An update() so photos keep their derivatives: the content is unchanged.
+                with transaction.atomic():
+                    updated = model.objects.filter(pk=row.pk, blob__isnull=True, **{field: old_name}).update(
+                        **{field: blob.file.name}, blob=blob
+                    )
+                    blobs.reference_changed(None, blob.pk if updated else None)
+                if not updated:
+                    continue
+                moved += 1
+                if not self.still_used(old_name):
+                    file.storage.delete(old_name)
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Moved {moved} file(s) into blobs; {missing} file(s) missing.'
+        ))
@@ -0,0 +1,71 @@
+import datetime
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import Count, Exists, F, IntegerField, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+from apps.documents.models import Blob, Document, Photo, UploadSession
+
+
+def reference_count(model):
+    return Coalesce(Subquery(
+        model.objects.filter(blob=OuterRef('pk')).order_by()
+        .values('blob').annotate(count=Count('pk')).values('count'),
+        output_field=IntegerField(),
+    ), Value(0))
+
+
+class Command(BaseCommand):
+    help = 'Delete stored blobs no document or photo references any more'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--hours', type=int, default=settings.BLOB_GC_GRACE_HOURS,
+            help='Keep unreferenced blobs used in the last N hours (default: BLOB_GC_GRACE_HOURS)',
+        )
+        parser.add_argument(
+            '--reconcile', action='store_true',
+            help='Recount the references of every blob first',
+        )
+        parser.add_argument('--dry-run', action='store_true', help='Only report what would be deleted')
+
+    def handle(self, *args, **options):
+        if options['hours'] < 0:
+            raise CommandError('--hours must not be negative.')
+        cutoff = timezone.now() - datetime.timedelta(hours=options['hours'])
+
+        if options['reconcile'] and not options['dry_run']:
+            fixed = Blob.objects.annotate(
+                actual=reference_count(Document) + reference_count(Photo)
+            ).exclude(ref_count=F('actual'))
+            changed = [Blob(pk=pk, ref_count=actual) for pk, actual in fixed.values_list('pk', 'actual')]
+            Blob.objects.bulk_update(changed, ['ref_count'], batch_size=500)
+            self.stdout.write(f'Corrected the reference count of {len(changed)} blob(s).')
+
+        unused = Blob.objects.filter(ref_count__lte=0, updated_at__lt=cutoff).exclude(
+            Exists(Document.objects.filter(blob=OuterRef('pk')))
+        ).exclude(
+            Exists(Photo.objects.filter(blob=OuterRef('pk')))
+        ).exclude(
+            Exists(UploadSession.objects.filter(blob=OuterRef('pk'), status='active'))
+        )
+
+        deleted = freed = 0
+        for pk in unused.values_list('pk', flat=True).iterator():
+            with transaction.atomic():
+                # Re-checked under the row lock: an upload may have just reused it.
+                blob = unused.select_for_update(skip_locked=True).filter(pk=pk).first()
+                if blob is None:
+                    continue
+                deleted += 1
+                freed += blob.size
+                if options['dry_run']:
+                    continue
+                storage, name = blob.file.storage, blob.file.name
+                blob.delete()
+                transaction.on_commit(lambda storage=storage, name=name: storage.delete(name))
+
+        verb = 'Would delete' if options['dry_run'] else 'Deleted'
+        self.stdout.write(self.style.SUCCESS(f'{verb} {deleted} blob(s), {freed} bytes.'))
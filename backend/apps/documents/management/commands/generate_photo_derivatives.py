@@ -0,0 +1,43 @@
+from django.core.management.base import BaseCommand
+from apps.documents import derivatives
+from apps.documents.models import Photo
+from apps.documents.tasks import generate_photo_derivatives
+
+
+class Command(BaseCommand):
+    help = 'Generate thumbnails, medium and web renditions and EXIF metadata for existing photos'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--project', type=int, help='Only photos of this project id')
+        parser.add_argument(
+            '--all', action='store_true',
+            help='Regenerate photos whose derivatives are already ready',
+        )
+        parser.add_argument(
+            '--queue', action='store_true',
+            help='Queue a Celery task per photo instead of processing them here',
+        )
+
+    def handle(self, *args, **options):
+        photos = Photo.objects.exclude(image='').order_by('pk')
+        if options['project']:
+            photos = photos.filter(project_id=options['project'])
+        if not options['all']:
+            photos = photos.exclude(derivatives_status='ready')
+
+        if options['queue']:
+            queued = 0
+            for photo_id in photos.values_list('pk', flat=True).iterator():
+                generate_photo_derivatives.delay(photo_id)
+                queued += 1
+            self.stdout.write(self.style.SUCCESS(f'Queued {queued} photo(s).'))
+            return
+
+        done = failed = 0
+        for photo in photos.iterator(chunk_size=100):
+            if derivatives.generate(photo):
+                done += 1
+            else:
+                failed += 1
+
+        self.stdout.write(self.style.SUCCESS(f'Generated derivatives for {done} photo(s), {failed} failed.'))
@@ -0,0 +1,29 @@
+import datetime
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from apps.documents.models import UploadSession
+
+
+class Command(BaseCommand):
+    help = 'Delete upload sessions and their staged files after they have been idle for the expiry period'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--hours', type=int, default=settings.UPLOAD_SESSION_EXPIRE_HOURS,
+            help='Keep sessions updated in the last N hours (default: UPLOAD_SESSION_EXPIRE_HOURS)',
+        )
+
+    def handle(self, *args, **options):
+        if options['hours'] < 0:
+            raise CommandError('--hours must not be negative.')
+        cutoff = timezone.now() - datetime.timedelta(hours=options['hours'])
+
+        # Deleted one by one so the post_delete handler removes each staged file.
+        deleted = 0
+        for session in UploadSession.objects.filter(updated_at__lt=cutoff).iterator():
+            session.delete()
+            deleted += 1
+
+        self.stdout.write(self.style.SUCCESS(f'Deleted {deleted} upload session(s).'))
@@ -1,10 +1,70 @@
+import os
+import uuid
+
 from django.db import models
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
 from django.conf import settings
 from apps.projects.models import Project
 from apps.tasks.models import Task
 
 
-class Document(models.Model):
+def blob_path(instance, filename):
+    """``blobs/ab/<sha256>/<name>``: keyed by content, keeping a readable name."""
+    name = os.path.basename(filename)
+    stem, ext = os.path.splitext(name)
+    name = stem[:150 - len(ext[:20])] + ext[:20]
+    return f'blobs/{instance.sha256[:2]}/{instance.sha256}/{name}'
+
+
+class Blob(models.Model):
+    """
+    File content stored once and shared by every document and photo with
+    the same bytes. ``ref_count`` counts the rows pointing at it; unused
+    blobs are removed by ``python manage.py gc_blobs``.
+    """
+    
+    sha256 = models.CharField(max_length=64, unique=True)
+    size = models.BigIntegerField()
+    file = models.FileField(upload_to=blob_path, max_length=255)
+    ref_count = models.IntegerField(default=0)
+    
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        ordering = ['-created_at']
+        verbose_name = 'Blob'
+        verbose_name_plural = 'Blobs'
+        indexes = [
+            models.Index(fields=['ref_count', 'updated_at']),
+        ]
+    
+    def __str__(self):
+        return f"{self.sha256[:12]} ({self.size} bytes)"
+
+
+class BlobReferenceMixin(models.Model):
+    """Snapshots the stored blob so reference counts can follow changes."""
+    
+    blob_field = 'file'
+    
+    class Meta:
+        abstract = True
+    
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        if 'blob_id' not in instance.get_deferred_fields():
+            instance._saved_blob_id = instance.blob_id
+        return instance
+    
+    def blob_matches_file(self):
+        """Whether the file field still points at the blob's file."""
+        return self.blob is None or self.blob.file.name == getattr(self, self.blob_field).name
+
+
+class Document(BlobReferenceMixin, models.Model):
     """Document model for managing project documentation."""
     
     DOC_TYPE_CHOICES = [
@@ -35,8 +95,15 @@ class Document(models.Model):
     document_type = models.CharField(max_length=50, choices=DOC_TYPE_CHOICES)
     description = models.TextField(blank=True)
     
-    file = models.FileField(upload_to='documents/')
-    file_size = models.IntegerField(default=0)  # in bytes
+    file = models.FileField(upload_to='documents/', max_length=255)
+    file_size = models.BigIntegerField(default=0)  # in bytes
+    blob = models.ForeignKey(
+        Blob,
+        on_delete=models.PROTECT,
+        null=True,
+        blank=True,
+        related_name='documents'
+    )
     
     version = models.CharField(max_length=20, default='1.0')
     
@@ -49,6 +116,9 @@ class Document(models.Model):
     
     tags = models.JSONField(default=list, blank=True)
     
+    # Weighted full-text vector, maintained by apps.search.
+    search_vector = SearchVectorField(null=True, editable=False)
+    
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
@@ -59,15 +129,24 @@ class Document(models.Model):
         indexes = [
             models.Index(fields=['project']),
             models.Index(fields=['document_type']),
+            GinIndex(fields=['search_vector'], name='documents_document_search_idx'),
         ]
     
     def __str__(self):
         return f"{self.title} ({self.version})"
 
 
-class Photo(models.Model):
+class Photo(BlobReferenceMixin, models.Model):
     """Photo model for project and task documentation."""
     
+    blob_field = 'image'
+    
+    DERIVATIVES_STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('ready', 'Ready'),
+        ('failed', 'Failed'),
+    ]
+    
     project = models.ForeignKey(
         Project,
         on_delete=models.CASCADE,
@@ -85,8 +164,22 @@ class Photo(models.Model):
     title = models.CharField(max_length=255, blank=True)
     description = models.TextField(blank=True)
     
-    image = models.ImageField(upload_to='photos/')
-    thumbnail = models.ImageField(upload_to='photos/thumbnails/', null=True, blank=True)
+    image = models.ImageField(upload_to='photos/', max_length=255)
+    blob = models.ForeignKey(
+        Blob,
+        on_delete=models.PROTECT,
+        null=True,
+        blank=True,
+        related_name='photos'
+    )
+    thumbnail = models.ImageField(upload_to='photos/thumbnails/', max_length=255, null=True, blank=True)
+    medium = models.ImageField(upload_to='photos/medium/', max_length=255, null=True, blank=True)
+    web = models.ImageField(upload_to='photos/web/', max_length=255, null=True, blank=True)
+    derivatives_status = models.CharField(
+        max_length=20,
+        choices=DERIVATIVES_STATUS_CHOICES,
+        default='pending'
+    )
     
     location = models.CharField(max_length=255, blank=True)
     gps_coordinates = models.CharField(max_length=100, blank=True)
@@ -112,7 +205,106 @@ class Photo(models.Model):
         indexes = [
             models.Index(fields=['project']),
             models.Index(fields=['task']),
+            models.Index(fields=['created_at', 'id']),
+            models.Index(fields=['project', 'created_at']),
+            models.Index(fields=['project', 'updated_at', 'id']),
+            models.Index(fields=['derivatives_status']),
         ]
     
     def __str__(self):
         return self.title or f"Photo {self.id}"
+    
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        photo = super().from_db(db, field_names, values)
+        # Snapshot the stored image so a replaced upload gets new derivatives.
+        if 'image' not in photo.get_deferred_fields():
+            photo._saved_image = photo.image.name
+        return photo
+    
+    def image_changed(self):
+        if self._state.adding:
+            return True
+        if hasattr(self, '_saved_image'):
+            saved_image = self._saved_image
+        else:
+            saved_image = Photo.objects.values_list('image', flat=True).filter(pk=self.pk).first()
+        return saved_image != self.image.name
+
+
+class UploadSession(models.Model):
+    """Resumable chunked upload of a large document or photo file."""
+    
+    TARGET_CHOICES = [
+        ('document', 'Document'),
+        ('photo', 'Photo'),
+    ]
+    
+    STATUS_CHOICES = [
+        ('active', 'Active'),
+        ('completed', 'Completed'),
+    ]
+    
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    target = models.CharField(max_length=20, choices=TARGET_CHOICES)
+    filename = models.CharField(max_length=255)
+    content_type = models.CharField(max_length=100, blank=True)
+    total_size = models.BigIntegerField()
+    offset = models.BigIntegerField(default=0)
+    expected_sha256 = models.CharField(max_length=64, blank=True)
+    sha256 = models.CharField(max_length=64, blank=True)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='active')
+    
+    # Set when the expected hash is already stored: no bytes need sending.
+    blob = models.ForeignKey(
+        Blob,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='upload_sessions'
+    )
+    
+    document = models.ForeignKey(
+        Document,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='upload_sessions'
+    )
+    photo = models.ForeignKey(
+        Photo,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='upload_sessions'
+    )
+    
+    created_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='upload_sessions'
+    )
+    
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        ordering = ['-created_at']
+        verbose_name = 'Upload Session'
+        verbose_name_plural = 'Upload Sessions'
+        indexes = [
+            models.Index(fields=['created_by', 'status']),
+            models.Index(fields=['status', 'updated_at']),
+        ]
+    
+    def __str__(self):
+        return f"{self.filename} ({self.offset}/{self.total_size})"
+    
+    @property
+    def staging_path(self):
+        """Local file the received chunks are appended to until finalized."""
+        return os.path.join(settings.UPLOAD_SESSION_DIR, f'{self.pk}.part')
+    
+    @property
+    def is_complete(self):
+        return self.offset >= self.total_size
@@ -1,8 +1,13 @@
+import os
+
+from django.conf import settings
+from django.utils.text import get_valid_filename
 from rest_framework import serializers
-from .models import Document, Photo
+from apps.core.serializers import SparseFieldsetMixin
+from .models import Document, Photo, UploadSession
 
 
-class DocumentSerializer(serializers.ModelSerializer):
+class DocumentSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     project_name = serializers.CharField(source='project.name', read_only=True)
     task_title = serializers.CharField(source='task.title', read_only=True)
     uploaded_by_name = serializers.CharField(source='uploaded_by.full_name', read_only=True)
@@ -18,7 +23,7 @@ class DocumentSerializer(serializers.ModelSerializer):
         read_only_fields = ['file_size', 'created_at', 'updated_at']
 
 
-class PhotoSerializer(serializers.ModelSerializer):
+class PhotoSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     project_name = serializers.CharField(source='project.name', read_only=True)
     task_title = serializers.CharField(source='task.title', read_only=True)
     uploaded_by_name = serializers.CharField(source='uploaded_by.full_name', read_only=True)
@@ -27,8 +32,43 @@ class PhotoSerializer(serializers.ModelSerializer):
         model = Photo
         fields = [
             'id', 'project', 'project_name', 'task', 'task_title',
-            'title', 'description', 'image', 'thumbnail', 'location',
-            'gps_coordinates', 'taken_at', 'uploaded_by', 'uploaded_by_name',
-            'tags', 'metadata', 'created_at', 'updated_at'
+            'title', 'description', 'image', 'thumbnail', 'medium', 'web',
+            'derivatives_status', 'location', 'gps_coordinates', 'taken_at',
+            'uploaded_by', 'uploaded_by_name', 'tags', 'metadata',
+            'created_at', 'updated_at'
         ]
-        read_only_fields = ['thumbnail', 'created_at', 'updated_at']
+        read_only_fields = [
+            'thumbnail', 'medium', 'web', 'derivatives_status', 'created_at', 'updated_at'
+        ]
+
+
+class UploadSessionSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = UploadSession
+        fields = [
+            'id', 'target', 'filename', 'content_type', 'total_size', 'offset',
+            'expected_sha256', 'sha256', 'status', 'document', 'photo',
+            'created_at', 'updated_at'
+        ]
+        read_only_fields = [
+            'offset', 'sha256', 'status', 'document', 'photo', 'created_at', 'updated_at'
+        ]
+    
+    def validate_filename(self, value):
+        filename = get_valid_filename(os.path.basename(value))
+        if not filename:
+            raise serializers.ValidationError('Invalid file name.')
+        return filename
+    
+    def validate_total_size(self, value):
+        if value <= 0:
+            raise serializers.ValidationError('Size must be positive.')
+        if value > settings.UPLOAD_MAX_BYTES:
+            raise serializers.ValidationError(f'Files must not exceed {settings.UPLOAD_MAX_BYTES} bytes.')
+        return value
+    
+    def validate_expected_sha256(self, value):
+        value = value.lower()
+        if value and not (len(value) == 64 and all(char in '0123456789abcdef' for char in value)):
+            raise serializers.ValidationError('Expected a hex SHA-256 digest.')
+        return value
@@ -0,0 +1,65 @@
+"""
+Signal handlers keeping blob reference counts in sync with documents and
+photos, queueing photo derivatives when an image is uploaded or replaced,
+and removing derivative files with their photo and staging files with their
+upload session.
+"""
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from . import blobs, tasks
+from .derivatives import delete_derivatives
+from .models import Document, Photo, UploadSession
+from .uploads import discard_staging
+
+
+@receiver(pre_save, sender=Document)
+@receiver(pre_save, sender=Photo)
+def blob_reference_saving(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    blobs.ensure_snapshot(instance)
+    # A file written directly (e.g. from the admin) no longer uses the blob.
+    if not instance.blob_matches_file():
+        instance.blob = None
+
+
+@receiver(post_save, sender=Document)
+@receiver(post_save, sender=Photo)
+def blob_reference_saved(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    blobs.reference_changed(getattr(instance, '_saved_blob_id', None), instance.blob_id)
+    instance._saved_blob_id = instance.blob_id
+
+
+@receiver(post_delete, sender=Document)
+@receiver(post_delete, sender=Photo)
+def blob_reference_deleted(sender, instance, **kwargs):
+    blobs.reference_changed(instance.blob_id, None)
+
+
+@receiver(pre_save, sender=Photo)
+def photo_saving(sender, instance, raw=False, **kwargs):
+    instance._image_changed = not raw and bool(instance.image) and instance.image_changed()
+    if instance._image_changed:
+        instance.derivatives_status = 'pending'
+
+
+@receiver(post_save, sender=Photo)
+def photo_saved(sender, instance, raw=False, **kwargs):
+    instance._saved_image = instance.image.name
+    if getattr(instance, '_image_changed', False):
+        instance._image_changed = False
+        transaction.on_commit(lambda: tasks.generate_photo_derivatives.delay(instance.pk))
+
+
+@receiver(post_delete, sender=Photo)
+def photo_deleted(sender, instance, **kwargs):
+    transaction.on_commit(lambda: delete_derivatives(instance))
+
+
+@receiver(post_delete, sender=UploadSession)
+def upload_session_deleted(sender, instance, **kwargs):
+    transaction.on_commit(lambda: discard_staging(instance))
@@ -0,0 +1,12 @@
+from celery import shared_task
+
+from . import derivatives
+from .models import Photo
+
+
+@shared_task(ignore_result=True)
+def generate_photo_derivatives(photo_id):
+    """Build the derivatives of a photo (see ``apps.documents.derivatives``)."""
+    photo = Photo.objects.filter(pk=photo_id).first()
+    if photo is not None and photo.image:
+        derivatives.generate(photo)
@@ -0,0 +1,181 @@
+"""
+Resumable chunked uploads.
+
+A client creates an ``UploadSession`` with the file size, sends the bytes
+as ``PUT`` requests carrying ``Content-Range: bytes start-end/total`` and
+then finalizes the session into a ``Document`` or ``Photo``. Chunks are
+streamed from the request into a local staging file at the session offset,
+never buffered whole, and the offset only advances once a chunk is fully on
+disk, so an interrupted client asks for the session and resumes from
+``offset``. On finalize the staging file is hashed in one sequential pass
+and stored as a content-addressed blob (see ``apps.documents.blobs``); the
+storage backend moves it into place when it is a local file system. A
+session created with the ``expected_sha256`` of content already used in a
+project the user can see starts complete and is finalized without sending
+any bytes; other content is uploaded and deduplicated once hashed.
+"""
+import hashlib
+import os
+import re
+
+from django.conf import settings
+from django.core.files import File
+from django.db import transaction
+
+from apps.projects.models import Project
+from . import blobs
+from .models import UploadSession
+
+CONTENT_RANGE = re.compile(r'^bytes (\d+)-(\d+)/(\d+)$')
+READ_SIZE = 64 * 1024
+
+
+class UploadError(Exception):
+    """A rejected upload request; ``status`` is the HTTP status to answer with."""
+
+    def __init__(self, detail, status=400):
+        super().__init__(detail)
+        self.detail = detail
+        self.status = status
+
+
+class StagedFile(File):
+    """
+    The completed staging file, looking like a Django temporary upload so
+    form validation and ``FileSystemStorage`` use the path instead of
+    reading it into memory or copying it.
+    """
+
+    def __init__(self, session):
+        super().__init__(open(session.staging_path, 'rb'), name=session.filename)
+        self.size = session.total_size
+        self.content_type = session.content_type
+        self.path = session.staging_path
+
+    def temporary_file_path(self):
+        return self.path
+
+
+def parse_content_range(header, total_size):
+    """Return ``(start, length)`` of a ``Content-Range`` header."""
+    match = CONTENT_RANGE.match((header or '').strip())
+    if not match:
+        raise UploadError('Content-Range must be "bytes start-end/total".')
+    start, end, total = (int(value) for value in match.groups())
+    if total != total_size:
+        raise UploadError(f'Content-Range total must be the session size {total_size}.')
+    if end < start or end >= total:
+        raise UploadError('Content-Range is out of bounds.')
+    length = end - start + 1
+    if length > settings.UPLOAD_CHUNK_MAX_BYTES:
+        raise UploadError(f'Chunks must not exceed {settings.UPLOAD_CHUNK_MAX_BYTES} bytes.')
+    return start, length
+
+
+def write_chunk(session_id, stream, content_range, checksum=''):
+    """
+    Append a chunk to a session and return the updated session.
+
+    The session row stays locked while the chunk is written, so concurrent
+    retries of one chunk cannot interleave. Bytes left past the offset by
+    an interrupted request are overwritten by the next chunk.
+    """
+    with transaction.atomic():
+        session = UploadSession.objects.select_for_update().get(pk=session_id)
+        if session.status != 'active':
+            raise UploadError('Upload session is already finalized.', status=409)
+        start, length = parse_content_range(content_range, session.total_size)
+        if start != session.offset:
+            raise UploadError(f'Expected a chunk starting at offset {session.offset}.', status=409)
+
+        digest = hashlib.sha256()
+        received = 0
+        os.makedirs(settings.UPLOAD_SESSION_DIR, exist_ok=True)
+        mode = 'r+b' if os.path.exists(session.staging_path) else 'wb'
+        with open(session.staging_path, mode) as staging:
+            staging.seek(start)
+            while received < length and stream is not None:
+                data = stream.read(min(READ_SIZE, length - received))
+                if not data:
+                    break
+                staging.write(data)
+                digest.update(data)
+                received += len(data)
+            if received != length:
+                raise UploadError(f'Received {received} of {length} bytes; resend the chunk.')
+            if checksum and checksum.lower() != digest.hexdigest():
+                raise UploadError('Chunk checksum does not match.')
+            staging.truncate()
+            staging.flush()
+            os.fsync(staging.fileno())
+
+        session.offset = start + length
+        session.save(update_fields=['offset', 'updated_at'])
+    return session
+
+
+def file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as staged:
+        for block in iter(lambda: staged.read(1024 * 1024), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def check_project(serializer, user):
+    project = serializer.validated_data['project']
+    if not Project.objects.visible_to(user).filter(pk=project.pk).exists():
+        raise UploadError('You do not have access to this project.', status=403)
+
+
+def finalize(session_id, serializer_class, data, user, context=None):
+    """
+    Validate ``data`` with the target serializer, create the document or
+    photo from the staging file and mark the session completed. Returns
+    ``(session, serializer)``; the session row is locked throughout, so a
+    repeated finalize waits and then finds the session completed.
+    """
+    with transaction.atomic():
+        session = UploadSession.objects.select_for_update().get(pk=session_id)
+        if session.status != 'active':
+            raise UploadError('Upload session is already finalized.', status=409)
+        if not session.is_complete:
+            raise UploadError(
+                f'Upload is incomplete: {session.offset} of {session.total_size} bytes received.', status=409
+            )
+        field = 'file' if session.target == 'document' else 'image'
+        extra = {'uploaded_by': user}
+        if session.target == 'document':
+            extra['file_size'] = session.total_size
+        if session.blob is not None:
+            # Known content: validate and link the stored blob.
+            serializer = serializer_class(data={**data, field: session.blob.file}, context=context)
+            serializer.is_valid(raise_exception=True)
+            check_project(serializer, user)
+            blob = session.blob
+        else:
+            sha256 = file_sha256(session.staging_path)
+            if session.expected_sha256 and session.expected_sha256.lower() != sha256:
+                raise UploadError('File checksum does not match the expected SHA-256.')
+            staged = StagedFile(session)
+            try:
+                serializer = serializer_class(data={**data, field: staged}, context=context)
+                serializer.is_valid(raise_exception=True)
+                check_project(serializer, user)
+                blob = blobs.store(staged, sha256)
+            finally:
+                staged.close()
+        instance = blobs.save_with_blob(serializer, field, blob, **extra)
+        session.status = 'completed'
+        session.sha256 = blob.sha256
+        setattr(session, session.target, instance)
+        session.save(update_fields=['status', 'sha256', session.target, 'updated_at'])
+    discard_staging(session)
+    return session, serializer
+
+
+def discard_staging(session):
+    try:
+        os.remove(session.staging_path)
+    except FileNotFoundError:
+        pass
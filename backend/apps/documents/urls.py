@@ -1,10 +1,11 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from .views import DocumentViewSet, PhotoViewSet
+from .views import DocumentViewSet, PhotoViewSet, UploadSessionViewSet
 
 router = DefaultRouter()
 router.register(r'documents', DocumentViewSet, basename='document')
 router.register(r'photos', PhotoViewSet, basename='photo')
+router.register(r'uploads', UploadSessionViewSet, basename='upload-session')
 
 urlpatterns = [
     path('', include(router.urls)),
@@ -1,17 +1,86 @@
-from rest_framework import viewsets, filters
+import os
+
+from rest_framework import viewsets, filters, mixins, status
+from rest_framework.decorators import action
+from rest_framework.exceptions import NotFound, PermissionDenied, ValidationError
 from rest_framework.permissions import IsAuthenticated
-from .models import Document, Photo
-from .serializers import DocumentSerializer, PhotoSerializer
+from rest_framework.response import Response
+from apps.core import downloads
+from apps.core.mixins import ConditionalGetMixin, FetchPlanMixin
+from apps.projects.models import Project
+from apps.search.filters import SearchVectorFilter
+from . import blobs, uploads
+from .models import Document, Photo, UploadSession
+from .serializers import DocumentSerializer, PhotoSerializer, UploadSessionSerializer
+
+
+UPLOAD_PLAN = {
+    'default': {'fields': {
+        'project_name': {'select_related': ['project']},
+        'task_title': {'select_related': ['task']},
+        'uploaded_by_name': {'select_related': ['uploaded_by']},
+    }},
+    'download': {'select_related': ['blob']},
+}
+
+PHOTO_VARIANTS = ['original', 'web', 'medium', 'thumbnail']
+
+
+class DownloadMixin:
+    """
+    Authenticated ``download`` action for the stored file of a row (see
+    ``apps.core.downloads``). ``?inline=true`` asks browsers to display
+    the file instead of saving it.
+    """
+    
+    def get_download_file(self, instance):
+        """Return ``(file, sha256 or None)`` to send for ``instance``."""
+        raise NotImplementedError
+    
+    @action(detail=True, methods=['get', 'head'])
+    def download(self, request, pk=None):
+        instance = self.get_object()
+        if not Project.objects.visible_to(request.user).filter(pk=instance.project_id).exists():
+            raise NotFound()
+        file, digest = self.get_download_file(instance)
+        inline = request.query_params.get('inline') in ('true', '1')
+        return downloads.serve(
+            request, file, os.path.basename(file.name), digest=digest, as_attachment=not inline
+        )
+
 
+class BlobUploadMixin:
+    """
+    Stores the uploaded ``blob_field`` file as a content-addressed blob,
+    hashing it while the request body is parsed.
+    """
+    blob_field = 'file'
+    
+    def initial(self, request, *args, **kwargs):
+        request.upload_sha256 = {}
+        request.upload_handlers.insert(0, blobs.HashingUploadHandler(request))
+        super().initial(request, *args, **kwargs)
+    
+    def save_upload(self, serializer, **kwargs):
+        project = serializer.validated_data.get('project') or getattr(serializer.instance, 'project', None)
+        if project is not None and not Project.objects.visible_to(self.request.user).filter(pk=project.pk).exists():
+            raise PermissionDenied('You do not have access to this project.')
+        file = self.request.FILES.get(self.blob_field)
+        if file is None:
+            return serializer.save(**kwargs)
+        blob = blobs.store(file, self.request.upload_sha256.get(self.blob_field))
+        return blobs.save_with_blob(serializer, self.blob_field, blob, **kwargs)
 
-class DocumentViewSet(viewsets.ModelViewSet):
+
+class DocumentViewSet(ConditionalGetMixin, DownloadMixin, BlobUploadMixin, FetchPlanMixin, viewsets.ModelViewSet):
     """ViewSet for document management."""
     queryset = Document.objects.all()
     serializer_class = DocumentSerializer
     permission_classes = [IsAuthenticated]
-    filter_backends = [filters.SearchFilter, filters.OrderingFilter]
+    filter_backends = [SearchVectorFilter, filters.OrderingFilter]
     search_fields = ['title', 'description']
     ordering_fields = ['title', 'document_type', 'version', 'created_at']
+    fetch_plans = UPLOAD_PLAN
     
     def get_queryset(self):
         queryset = super().get_queryset()
@@ -31,10 +100,20 @@ class DocumentViewSet(viewsets.ModelViewSet):
     def perform_create(self, serializer):
         file = self.request.FILES.get('file')
         file_size = file.size if file else 0
-        serializer.save(uploaded_by=self.request.user, file_size=file_size)
+        self.save_upload(serializer, uploaded_by=self.request.user, file_size=file_size)
+    
+    def perform_update(self, serializer):
+        file = self.request.FILES.get('file')
+        if file is None:
+            serializer.save()
+        else:
+            self.save_upload(serializer, file_size=file.size)
+    
+    def get_download_file(self, document):
+        return document.file, document.blob.sha256 if document.blob else None
 
 
-class PhotoViewSet(viewsets.ModelViewSet):
+class PhotoViewSet(ConditionalGetMixin, DownloadMixin, BlobUploadMixin, FetchPlanMixin, viewsets.ModelViewSet):
     """ViewSet for photo management."""
     queryset = Photo.objects.all()
     serializer_class = PhotoSerializer
@@ -42,6 +121,8 @@ class PhotoViewSet(viewsets.ModelViewSet):
     filter_backends = [filters.SearchFilter, filters.OrderingFilter]
     search_fields = ['title', 'description', 'location']
     ordering_fields = ['title', 'taken_at', 'created_at']
+    fetch_plans = UPLOAD_PLAN
+    blob_field = 'image'
     
     def get_queryset(self):
         queryset = super().get_queryset()
@@ -56,4 +137,85 @@ class PhotoViewSet(viewsets.ModelViewSet):
         return queryset
     
     def perform_create(self, serializer):
-        serializer.save(uploaded_by=self.request.user)
+        self.save_upload(serializer, uploaded_by=self.request.user)
+    
+    def perform_update(self, serializer):
+        self.save_upload(serializer)
+    
+    def get_download_file(self, photo):
+        """``?variant=original|web|medium|thumbnail``, the original by default."""
+        variant = self.request.query_params.get('variant', 'original')
+        if variant not in PHOTO_VARIANTS:
+            raise ValidationError({'variant': f'Expected one of: {", ".join(PHOTO_VARIANTS)}.'})
+        if variant == 'original':
+            return photo.image, photo.blob.sha256 if photo.blob else None
+        return getattr(photo, variant), None
+
+
+class UploadSessionViewSet(
+    mixins.CreateModelMixin,
+    mixins.RetrieveModelMixin,
+    mixins.DestroyModelMixin,
+    viewsets.GenericViewSet
+):
+    """
+    Resumable chunked uploads of documents and photos (see
+    ``apps.documents.uploads``). Deleting an active session aborts it.
+    """
+    serializer_class = UploadSessionSerializer
+    permission_classes = [IsAuthenticated]
+    
+    def get_queryset(self):
+        return UploadSession.objects.filter(created_by=self.request.user)
+    
+    def perform_create(self, serializer):
+        # Content the user can already see needs no upload: the session starts
+        # complete. Anything else is sent and deduplicated once it is hashed.
+        blob = blobs.find_visible(
+            serializer.validated_data.get('expected_sha256'),
+            serializer.validated_data['total_size'],
+            self.request.user,
+        )
+        offset = serializer.validated_data['total_size'] if blob else 0
+        serializer.save(created_by=self.request.user, blob=blob, offset=offset)
+    
+    def upload_error(self, session, exc):
+        data = {'detail': exc.detail}
+        data['offset'] = UploadSession.objects.values_list('offset', flat=True).get(pk=session.pk)
+        return Response(data, status=exc.status)
+    
+    @action(detail=True, methods=['put'])
+    def chunk(self, request, pk=None):
+        """
+        Write the request body at the range given by ``Content-Range:
+        bytes start-end/total``; ``start`` must be the session offset. An
+        optional ``X-Chunk-SHA256`` header is checked against the body.
+        """
+        session = self.get_object()
+        try:
+            session = uploads.write_chunk(
+                session.pk,
+                request.stream,
+                request.headers.get('Content-Range'),
+                request.headers.get('X-Chunk-SHA256', ''),
+            )
+        except uploads.UploadError as exc:
+            return self.upload_error(session, exc)
+        return Response(self.get_serializer(session).data)
+    
+    @action(detail=True, methods=['post'])
+    def finalize(self, request, pk=None):
+        """
+        Create the document or photo from the uploaded file; the body takes
+        the other fields of the target, as for a regular upload.
+        """
+        session = self.get_object()
+        serializer_class = DocumentSerializer if session.target == 'document' else PhotoSerializer
+        try:
+            session, serializer = uploads.finalize(
+                session.pk, serializer_class, request.data, request.user,
+                context=self.get_serializer_context(),
+            )
+        except uploads.UploadError as exc:
+            return self.upload_error(session, exc)
+        return Response(serializer.data, status=status.HTTP_201_CREATED)
@@ -52,6 +52,7 @@ class Checklist(models.Model):
         indexes = [
             models.Index(fields=['task']),
             models.Index(fields=['status']),
+            models.Index(fields=['updated_at', 'id']),
         ]
     
     def __str__(self):
@@ -94,6 +95,7 @@ class ChecklistItem(models.Model):
         verbose_name_plural = 'Checklist Items'
         indexes = [
             models.Index(fields=['checklist', 'order']),
+            models.Index(fields=['updated_at', 'id']),
         ]
     
     def __str__(self):
@@ -1,8 +1,9 @@
 from rest_framework import serializers
+from apps.core.serializers import SparseFieldsetMixin
 from .models import Checklist, ChecklistItem
 
 
-class ChecklistItemSerializer(serializers.ModelSerializer):
+class ChecklistItemSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     completed_by_name = serializers.CharField(source='completed_by.full_name', read_only=True)
     
     class Meta:
@@ -15,13 +16,14 @@ class ChecklistItemSerializer(serializers.ModelSerializer):
         read_only_fields = ['created_at', 'updated_at']
 
 
-class ChecklistSerializer(serializers.ModelSerializer):
+class ChecklistSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     task_title = serializers.CharField(source='task.title', read_only=True)
     created_by_name = serializers.CharField(source='created_by.full_name', read_only=True)
     assigned_to_name = serializers.CharField(source='assigned_to.full_name', read_only=True)
     items = ChecklistItemSerializer(many=True, read_only=True)
-    items_count = serializers.SerializerMethodField()
-    completed_items_count = serializers.SerializerMethodField()
+    # Annotated by the viewset; a checklist without them is new.
+    items_count = serializers.IntegerField(read_only=True, default=0)
+    completed_items_count = serializers.IntegerField(read_only=True, default=0)
     
     class Meta:
         model = Checklist
@@ -32,9 +34,4 @@ class ChecklistSerializer(serializers.ModelSerializer):
             'created_at', 'updated_at'
         ]
         read_only_fields = ['created_at', 'updated_at']
-    
-    def get_items_count(self, obj):
-        return obj.items.count()
-    
-    def get_completed_items_count(self, obj):
-        return obj.items.filter(is_completed=True).count()
+        expandable_fields = ['items']
@@ -2,19 +2,38 @@ from rest_framework import viewsets, filters
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.decorators import action
 from rest_framework.response import Response
+from django.db.models import Count, Prefetch, Q
 from django.utils import timezone
+from apps.core.mixins import ConditionalGetMixin, FetchPlanMixin
 from .models import Checklist, ChecklistItem
 from .serializers import ChecklistSerializer, ChecklistItemSerializer
 
 
-class ChecklistViewSet(viewsets.ModelViewSet):
+class ChecklistViewSet(ConditionalGetMixin, FetchPlanMixin, viewsets.ModelViewSet):
     """ViewSet for checklist management."""
     queryset = Checklist.objects.all()
     serializer_class = ChecklistSerializer
     permission_classes = [IsAuthenticated]
+    validator_related = ['items']
     filter_backends = [filters.SearchFilter, filters.OrderingFilter]
     search_fields = ['name', 'description']
     ordering_fields = ['name', 'status', 'due_date', 'created_at']
+    fetch_plans = {
+        'default': {
+            'annotate': {
+                'items_count': Count('items'),
+                'completed_items_count': Count('items', filter=Q(items__is_completed=True)),
+            },
+            'fields': {
+                'task_title': {'select_related': ['task']},
+                'created_by_name': {'select_related': ['created_by']},
+                'assigned_to_name': {'select_related': ['assigned_to']},
+                'items': {'prefetch_related': [Prefetch(
+                    'items', queryset=ChecklistItem.objects.select_related('completed_by')
+                )]},
+            },
+        },
+    }
     
     def get_queryset(self):
         queryset = super().get_queryset()
@@ -45,7 +64,7 @@ class ChecklistViewSet(viewsets.ModelViewSet):
         return Response(serializer.data)
 
 
-class ChecklistItemViewSet(viewsets.ModelViewSet):
+class ChecklistItemViewSet(ConditionalGetMixin, FetchPlanMixin, viewsets.ModelViewSet):
     """ViewSet for checklist item management."""
     queryset = ChecklistItem.objects.all()
     serializer_class = ChecklistItemSerializer
@@ -53,6 +72,9 @@ class ChecklistItemViewSet(viewsets.ModelViewSet):
     filter_backends = [filters.SearchFilter, filters.OrderingFilter]
     search_fields = ['title', 'description']
     ordering_fields = ['order', 'title', 'created_at']
+    fetch_plans = {
+        'default': {'fields': {'completed_by_name': {'select_related': ['completed_by']}}},
+    }
     
     def get_queryset(self):
         queryset = super().get_queryset()
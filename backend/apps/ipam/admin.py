@@ -4,14 +4,14 @@ from .models import IPAddressPool, IPAddress
 
 @admin.register(IPAddressPool)
 class IPAddressPoolAdmin(admin.ModelAdmin):
-    list_display = ['name', 'network', 'project', 'vlan_id', 'created_at']
+    list_display = ['name', 'network', 'capacity', 'project', 'vlan_id', 'created_at']
     list_filter = ['project', 'created_at']
     search_fields = ['name', 'network', 'description']
     ordering = ['name']
     
     fieldsets = (
         ('Basic Information', {
-            'fields': ('project', 'name', 'network', 'vlan_id', 'description')
+            'fields': ('project', 'name', 'network', 'capacity', 'vlan_id', 'description')
         }),
         ('Network Configuration', {
             'fields': ('gateway', 'dns_primary', 'dns_secondary')
@@ -21,7 +21,7 @@ class IPAddressPoolAdmin(admin.ModelAdmin):
         }),
     )
     
-    readonly_fields = ['created_at', 'updated_at']
+    readonly_fields = ['capacity', 'created_at', 'updated_at']
 
 
 @admin.register(IPAddress)
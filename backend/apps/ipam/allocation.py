@@ -0,0 +1,156 @@
+"""
+Address allocation engine for IP address pools.
+
+Used addresses are collapsed into a sorted list of ``(start, end)`` integer
+ranges, so searching for the next free address (or a contiguous block) only
+walks the gaps between ranges instead of every host of the network.
+"""
+import ipaddress
+import socket
+
+from django.db import transaction
+from django.utils import timezone
+
+from .models import IPAddressPool, IPAddress
+
+
+class AllocationError(Exception):
+    """Raised when a pool cannot satisfy an allocation request."""
+
+
+def host_bounds(network):
+    """First and last assignable host of ``network`` as integers."""
+    first = int(network.network_address)
+    last = int(network.broadcast_address)
+    if network.version == 4 and network.prefixlen >= 31:
+        return first, last
+    if network.version == 4:
+        return first + 1, last - 1
+    # Skip the IPv6 subnet-router anycast address.
+    return first + 1, last
+
+
+def address_to_int(value, family):
+    """Integer form of an address string; much cheaper than ``ip_address``."""
+    return int.from_bytes(socket.inet_pton(family, value), 'big')
+
+
+def used_ranges(pool, network):
+    """
+    Sorted, merged ``(start, end)`` ranges of addresses that are taken.
+
+    Rows with status ``available`` are free; the gateway and DNS servers of
+    the pool are always treated as taken.
+    """
+    family = socket.AF_INET if network.version == 4 else socket.AF_INET6
+    lowest = int(network.network_address)
+    highest = int(network.broadcast_address)
+    addresses = list(
+        IPAddress.objects.filter(pool=pool)
+        .exclude(status='available')
+        .values_list('ip_address', flat=True)
+    )
+    addresses += [a for a in (pool.gateway, pool.dns_primary, pool.dns_secondary) if a]
+
+    used = set()
+    for value in addresses:
+        try:
+            number = address_to_int(value, family)
+        except OSError:
+            continue  # other address family
+        if lowest <= number <= highest:
+            used.add(number)
+
+    ranges = []
+    for value in sorted(used):
+        if ranges and ranges[-1][1] + 1 == value:
+            ranges[-1][1] = value
+        else:
+            ranges.append([value, value])
+    return [tuple(r) for r in ranges]
+
+
+def free_gaps(network, ranges):
+    """Yield ``(start, end)`` ranges of free host addresses in order."""
+    first, last = host_bounds(network)
+    cursor = first
+    for start, end in ranges:
+        if end < cursor:
+            continue
+        if start > last:
+            break
+        if start > cursor:
+            yield cursor, start - 1
+        cursor = end + 1
+    if cursor <= last:
+        yield cursor, last
+
+
+def find_free(network, ranges, count=1, contiguous=True):
+    """
+    Return ``count`` free addresses of ``network`` as ``ip_address`` objects.
+
+    With ``contiguous`` the addresses form a single block; otherwise the
+    lowest free addresses are returned.
+    """
+    found = []
+    for start, end in free_gaps(network, ranges):
+        size = end - start + 1
+        if contiguous:
+            if size >= count:
+                found = list(range(start, start + count))
+                break
+            continue
+        found.extend(range(start, start + min(size, count - len(found))))
+        if len(found) == count:
+            break
+    if len(found) < count:
+        raise AllocationError(
+            f'Pool {network} has no {"block of " if contiguous else ""}{count} free address(es).'
+        )
+    return [ipaddress.ip_address(value) for value in found]
+
+
+def preview(pool, count=1, contiguous=True):
+    """Next free address(es) of ``pool`` without reserving them."""
+    network = pool.ip_network
+    if network is None:
+        raise AllocationError(f'Pool network "{pool.network}" is not a valid CIDR.')
+    return find_free(network, used_ranges(pool, network), count, contiguous)
+
+
+def allocate(pool, count=1, contiguous=True, status='allocated', user=None, **attrs):
+    """
+    Atomically allocate ``count`` free addresses from ``pool``.
+
+    The pool row is locked with ``SELECT ... FOR UPDATE`` for the duration of
+    the transaction, so concurrent requests against the same pool are
+    serialised and can never receive the same address. Existing
+    ``available`` rows are reused; missing ones are bulk-created.
+    """
+    with transaction.atomic():
+        pool = IPAddressPool.objects.select_for_update().get(pk=pool.pk)
+        addresses = [str(a) for a in preview(pool, count, contiguous)]
+
+        now = timezone.now()
+        values = dict(attrs, status=status, assigned_to=user, assigned_at=now)
+        existing = {
+            ip.ip_address: ip
+            for ip in IPAddress.objects.filter(pool=pool, ip_address__in=addresses)
+        }
+        for ip in existing.values():
+            for name, value in values.items():
+                setattr(ip, name, value)
+            ip.updated_at = now
+        IPAddress.objects.bulk_update(existing.values(), list(values) + ['updated_at'])
+        IPAddress.objects.bulk_create([
+            IPAddress(pool=pool, ip_address=address, **values)
+            for address in addresses if address not in existing
+        ])
+        # Bulk writes send no signals; touch the pool so its listeners run.
+        pool.save(update_fields=['updated_at'])
+
+        return list(
+            IPAddress.objects.filter(pool=pool, ip_address__in=addresses)
+            .select_related('pool', 'device', 'assigned_to')
+        )
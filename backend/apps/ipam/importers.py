@@ -0,0 +1,161 @@
+"""
+Bulk import of IP addresses into a pool.
+
+Rows are validated as a batch against the pool CIDR, the existing
+``unique_together(pool, ip_address)`` rows and the project devices, then
+written in a single transaction: with ``COPY`` on PostgreSQL and
+``bulk_create`` elsewhere.
+"""
+import io
+import ipaddress
+import re
+
+from django.db import connection, transaction
+from django.utils import timezone
+
+from apps.devices.models import Device
+from .allocation import host_bounds
+from .models import IPAddressPool, IPAddress
+
+IMPORT_FIELDS = ['ip_address', 'hostname', 'mac_address', 'device_serial', 'status', 'description']
+MAC_RE = re.compile(r'^[0-9A-Fa-f]{2}([:-]?)(?:[0-9A-Fa-f]{2}\1){4}[0-9A-Fa-f]{2}$')
+STATUSES = {choice for choice, _ in IPAddress.STATUS_CHOICES}
+BATCH_SIZE = 2000
+
+
+def _clean(row):
+    """Stripped string values of the import columns, or ``None`` if ``row`` is not a mapping."""
+    if not isinstance(row, dict):
+        return None
+    return {name: '' if row.get(name) is None else str(row[name]).strip() for name in IMPORT_FIELDS}
+
+
+def _normalize_mac(value):
+    digits = re.sub(r'[^0-9A-Fa-f]', '', value).upper()
+    return ':'.join(digits[i:i + 2] for i in range(0, 12, 2))
+
+
+def _copy_value(value):
+    # Every value is quoted, so no text can read as the unquoted empty NULL.
+    if value is None:
+        return ''
+    return '"' + str(value).replace('"', '""') + '"'
+
+
+def copy_insert(objects):
+    """Stream unsaved ``IPAddress`` objects into the table with ``COPY``."""
+    fields = [f for f in IPAddress._meta.concrete_fields if not f.primary_key]
+    buffer = io.StringIO()
+    for obj in objects:
+        buffer.write(','.join(_copy_value(field.pre_save(obj, True)) for field in fields) + '\n')
+    buffer.seek(0)
+    
+    quote = connection.ops.quote_name
+    columns = ', '.join(quote(field.column) for field in fields)
+    with connection.cursor() as cursor:
+        cursor.copy_expert(
+            f"COPY {quote(IPAddress._meta.db_table)} ({columns}) "
+            "FROM STDIN WITH (FORMAT csv)",
+            buffer,
+        )
+
+
+def import_addresses(pool, rows, user=None, default_status='allocated', skip_invalid=False):
+    """
+    Validate and insert ``rows`` (an iterable of dicts) into ``pool``.
+    
+    Returns a report dict with the number of rows read and created and a
+    per-row error list (rows are numbered from 1). Unless ``skip_invalid``
+    is set, a single invalid row aborts the whole import.
+    """
+    with transaction.atomic():
+        # Serialise against allocations and other imports into this pool.
+        pool = IPAddressPool.objects.select_for_update().get(pk=pool.pk)
+        network = pool.ip_network
+        if network is None:
+            return {
+                'total': 0, 'created': 0,
+                'errors': [{'row': None, 'errors': {'pool': f'Invalid pool network "{pool.network}".'}}],
+            }
+        first, last = host_bounds(network)
+        
+        # Read every row up front: the device lookup needs all serials and an
+        # aborting import must see every row before writing any. The rows
+        # are small dicts and the objects to insert are held anyway, so this
+        # keeps memory linear in the import size, not in the upload size.
+        rows = [_clean(row) for row in rows]
+        # NUL characters cannot be sent to PostgreSQL; those rows are rejected below.
+        serials = {
+            row['device_serial'] for row in rows
+            if row and row['device_serial'] and '\x00' not in row['device_serial']
+        }
+        devices = dict(
+            Device.objects.filter(project_id=pool.project_id, serial_number__in=serials)
+            .values_list('serial_number', 'id')
+        )
+        taken = set(
+            IPAddress.objects.filter(pool=pool).values_list('ip_address', flat=True)
+        )
+        
+        now = timezone.now()
+        seen = set()
+        objects = []
+        errors = []
+        for number, row in enumerate(rows, start=1):
+            if row is None:
+                errors.append({'row': number, 'ip_address': '', 'errors': {'row': 'Expected an object.'}})
+                continue
+            row_errors = {}
+            address = None
+            try:
+                address = ipaddress.ip_address(row['ip_address'])
+            except ValueError:
+                row_errors['ip_address'] = 'Enter a valid IP address.'
+            if address is not None:
+                if address.version != network.version or not first <= int(address) <= last:
+                    row_errors['ip_address'] = f'Address is not a host of pool network {network}.'
+                elif str(address) in taken:
+                    row_errors['ip_address'] = 'Address already exists in this pool.'
+                elif str(address) in seen:
+                    row_errors['ip_address'] = 'Duplicate address in import.'
+            if row['mac_address'] and not MAC_RE.match(row['mac_address']):
+                row_errors['mac_address'] = 'Enter a valid MAC address.'
+            if row['device_serial'] and row['device_serial'] not in devices:
+                row_errors['device_serial'] = 'No device with this serial number in the pool project.'
+            status = row['status'] or default_status
+            if status not in STATUSES:
+                row_errors['status'] = f'"{status}" is not a valid choice.'
+            if len(row['hostname']) > 255:
+                row_errors['hostname'] = 'Ensure this field has no more than 255 characters.'
+            for name, value in row.items():
+                if '\x00' in value:
+                    row_errors[name] = 'Null characters are not allowed.'
+            
+            if row_errors:
+                errors.append({'row': number, 'ip_address': row['ip_address'], 'errors': row_errors})
+                continue
+            
+            seen.add(str(address))
+            objects.append(IPAddress(
+                pool=pool,
+                ip_address=str(address),
+                hostname=row['hostname'],
+                mac_address=_normalize_mac(row['mac_address']) if row['mac_address'] else '',
+                device_id=devices.get(row['device_serial']),
+                status=status,
+                description=row['description'],
+                assigned_to=user if status == 'allocated' else None,
+                assigned_at=now if status == 'allocated' else None,
+            ))
+        
+        created = 0
+        if objects and (skip_invalid or not errors):
+            if connection.vendor == 'postgresql':
+                copy_insert(objects)
+            else:
+                IPAddress.objects.bulk_create(objects, batch_size=BATCH_SIZE)
+            created = len(objects)
+            # Bulk writes send no signals; touch the pool so its listeners run.
+            pool.save(update_fields=['updated_at'])
+        
+        return {'total': len(rows), 'created': created, 'errors': errors}
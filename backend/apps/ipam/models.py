@@ -1,12 +1,57 @@
+import ipaddress
+
 from django.db import models
+from django.db.models import Count, F, Q, Value, DecimalField, FloatField
+from django.db.models.functions import Cast, Coalesce, NullIf
 from django.conf import settings
 from apps.projects.models import Project
 from apps.devices.models import Device
 
 
+def usable_host_count(network):
+    """Number of assignable host addresses in an ``ip_network``."""
+    if network.version == 4 and network.prefixlen < 31:
+        count = network.num_addresses - 2
+    else:
+        count = network.num_addresses
+    # Large IPv6 networks do not fit in a bigint column.
+    return min(count, 2 ** 63 - 1)
+
+
+class IPAddressPoolQuerySet(models.QuerySet):
+    """QuerySet helpers for IP address pools."""
+    
+    def with_utilization(self):
+        """
+        Annotate address counters and utilization in a single grouped query.
+        
+        ``free_ips`` is the pool capacity minus every registered address that
+        is not ``available``; ``utilization`` is the used share in percent.
+        """
+        return self.annotate(
+            total_ips=Count('ip_addresses'),
+            allocated_ips=Count('ip_addresses', filter=Q(ip_addresses__status='allocated')),
+            reserved_ips=Count('ip_addresses', filter=Q(ip_addresses__status='reserved')),
+            used_ips=Count('ip_addresses', filter=~Q(ip_addresses__status='available')),
+        ).annotate(
+            free_ips=F('capacity') - F('used_ips'),
+            utilization=Cast(
+                Coalesce(
+                    Cast(F('used_ips'), FloatField()) * Value(100.0) / NullIf(F('capacity'), 0),
+                    Value(0.0),
+                ),
+                DecimalField(max_digits=6, decimal_places=2),
+            ),
+        )
+
+
 class IPAddressPool(models.Model):
     """IP Address Pool for managing network ranges."""
     
+    UTILIZATION_FIELDS = [
+        'total_ips', 'allocated_ips', 'reserved_ips', 'used_ips', 'free_ips', 'utilization',
+    ]
+    
     project = models.ForeignKey(
         Project,
         on_delete=models.CASCADE,
@@ -15,6 +60,7 @@ class IPAddressPool(models.Model):
     
     name = models.CharField(max_length=255)
     network = models.CharField(max_length=50)  # e.g., 192.168.1.0/24
+    capacity = models.BigIntegerField(default=0, editable=False)  # usable host addresses
     gateway = models.GenericIPAddressField(null=True, blank=True)
     dns_primary = models.GenericIPAddressField(null=True, blank=True)
     dns_secondary = models.GenericIPAddressField(null=True, blank=True)
@@ -32,6 +78,8 @@ class IPAddressPool(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
+    objects = IPAddressPoolQuerySet.as_manager()
+    
     class Meta:
         ordering = ['name']
         verbose_name = 'IP Address Pool'
@@ -40,6 +88,30 @@ class IPAddressPool(models.Model):
     
     def __str__(self):
         return f"{self.name} ({self.network})"
+    
+    @property
+    def ip_network(self):
+        """Parsed ``network`` or ``None`` when it is not a valid CIDR."""
+        try:
+            return ipaddress.ip_network(self.network, strict=False)
+        except ValueError:
+            return None
+    
+    def refresh_utilization(self):
+        """Load the ``with_utilization`` annotations onto this instance."""
+        values = (
+            IPAddressPool.objects.filter(pk=self.pk)
+            .with_utilization()
+            .values(*self.UTILIZATION_FIELDS)
+            .first()
+        ) or {}
+        for name in self.UTILIZATION_FIELDS:
+            setattr(self, name, values.get(name, 0))
+    
+    def save(self, *args, **kwargs):
+        network = self.ip_network
+        self.capacity = usable_host_count(network) if network else 0
+        super().save(*args, **kwargs)
 
 
 class IPAddress(models.Model):
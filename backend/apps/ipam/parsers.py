@@ -0,0 +1,19 @@
+import codecs
+import csv
+
+from rest_framework.parsers import BaseParser
+
+
+class CSVParser(BaseParser):
+    """
+    Parse a ``text/csv`` request body into a lazy iterator of row dicts.
+    
+    The body is decoded line by line, so the raw upload is never held in
+    memory as a whole; the importer keeps only the parsed columns.
+    """
+    media_type = 'text/csv'
+    
+    def parse(self, stream, media_type=None, parser_context=None):
+        parser_context = parser_context or {}
+        encoding = parser_context.get('encoding', 'utf-8')
+        return {'rows': csv.DictReader(codecs.iterdecode(stream, encoding))}
@@ -1,30 +1,44 @@
+import ipaddress
+
 from rest_framework import serializers
+from apps.core.serializers import SparseFieldsetMixin
+from apps.devices.models import Device
 from .models import IPAddressPool, IPAddress
 
 
-class IPAddressPoolSerializer(serializers.ModelSerializer):
+class IPAddressPoolSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     project_name = serializers.CharField(source='project.name', read_only=True)
-    total_ips = serializers.SerializerMethodField()
-    allocated_ips = serializers.SerializerMethodField()
+    total_ips = serializers.IntegerField(read_only=True)
+    allocated_ips = serializers.IntegerField(read_only=True)
+    reserved_ips = serializers.IntegerField(read_only=True)
+    free_ips = serializers.IntegerField(read_only=True)
+    utilization = serializers.DecimalField(max_digits=6, decimal_places=2, read_only=True)
     
     class Meta:
         model = IPAddressPool
         fields = [
-            'id', 'project', 'project_name', 'name', 'network',
+            'id', 'project', 'project_name', 'name', 'network', 'capacity',
             'gateway', 'dns_primary', 'dns_secondary', 'vlan_id',
-            'description', 'total_ips', 'allocated_ips',
+            'description', 'total_ips', 'allocated_ips', 'reserved_ips',
+            'free_ips', 'utilization',
             'created_by', 'created_at', 'updated_at'
         ]
-        read_only_fields = ['created_at', 'updated_at']
+        read_only_fields = ['capacity', 'created_at', 'updated_at']
     
-    def get_total_ips(self, obj):
-        return obj.ip_addresses.count()
+    def validate_network(self, value):
+        try:
+            return str(ipaddress.ip_network(value, strict=False))
+        except ValueError:
+            raise serializers.ValidationError('Enter a valid network in CIDR notation.')
     
-    def get_allocated_ips(self, obj):
-        return obj.ip_addresses.filter(status='allocated').count()
+    def to_representation(self, instance):
+        # Counters are annotated by the viewset; load them for fresh instances.
+        if not hasattr(instance, 'free_ips'):
+            instance.refresh_utilization()
+        return super().to_representation(instance)
 
 
-class IPAddressSerializer(serializers.ModelSerializer):
+class IPAddressSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     pool_name = serializers.CharField(source='pool.name', read_only=True)
     device_name = serializers.CharField(source='device.name', read_only=True)
     assigned_to_name = serializers.CharField(source='assigned_to.full_name', read_only=True)
@@ -38,3 +52,24 @@ class IPAddressSerializer(serializers.ModelSerializer):
             'created_at', 'updated_at'
         ]
         read_only_fields = ['created_at', 'updated_at']
+    
+    def validate(self, attrs):
+        pool = attrs.get('pool', getattr(self.instance, 'pool', None))
+        address = attrs.get('ip_address', getattr(self.instance, 'ip_address', None))
+        network = pool.ip_network if pool else None
+        if network and address and ipaddress.ip_address(address) not in network:
+            raise serializers.ValidationError(
+                {'ip_address': f'Address is outside pool network {network}.'}
+            )
+        return attrs
+
+
+class IPAllocationSerializer(serializers.Serializer):
+    count = serializers.IntegerField(min_value=1, max_value=1024, default=1)
+    contiguous = serializers.BooleanField(default=True)
+    status = serializers.ChoiceField(choices=['allocated', 'reserved'], default='allocated')
+    hostname = serializers.CharField(max_length=255, required=False, allow_blank=True)
+    device = serializers.PrimaryKeyRelatedField(
+        queryset=Device.objects.all(), required=False, allow_null=True
+    )
+    description = serializers.CharField(required=False, allow_blank=True)
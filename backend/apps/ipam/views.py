@@ -1,32 +1,93 @@
-from rest_framework import viewsets, filters
+import codecs
+import csv
+from decimal import Decimal, InvalidOperation
+
+from django.shortcuts import get_object_or_404
+from rest_framework import viewsets, filters, status
 from rest_framework.permissions import IsAuthenticated
+from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
+from rest_framework.parsers import JSONParser, MultiPartParser
+from rest_framework.response import Response
+from apps.core.mixins import ConditionalGetMixin, ExportMixin, FetchPlanMixin
+from . import allocation
+from .importers import import_addresses
+from .parsers import CSVParser
 from .models import IPAddressPool, IPAddress
-from .serializers import IPAddressPoolSerializer, IPAddressSerializer
+from .serializers import IPAddressPoolSerializer, IPAddressSerializer, IPAllocationSerializer
 
 
-class IPAddressPoolViewSet(viewsets.ModelViewSet):
+class IPAddressPoolViewSet(ConditionalGetMixin, FetchPlanMixin, viewsets.ModelViewSet):
     """ViewSet for IP address pool management."""
     queryset = IPAddressPool.objects.all()
     serializer_class = IPAddressPoolSerializer
     permission_classes = [IsAuthenticated]
+    # The utilization figures come from the addresses.
+    validator_related = ['ip_addresses']
     filter_backends = [filters.SearchFilter, filters.OrderingFilter]
     search_fields = ['name', 'network', 'description']
-    ordering_fields = ['name', 'network', 'created_at']
+    ordering_fields = [
+        'name', 'network', 'capacity', 'total_ips', 'allocated_ips',
+        'reserved_ips', 'free_ips', 'utilization', 'created_at'
+    ]
+    fetch_plans = {
+        'default': {'fields': {'project_name': {'select_related': ['project']}}},
+    }
     
     def get_queryset(self):
-        queryset = super().get_queryset()
+        queryset = super().get_queryset().with_utilization()
         project = self.request.query_params.get('project', None)
+        min_utilization = self.request.query_params.get('min_utilization', None)
+        max_utilization = self.request.query_params.get('max_utilization', None)
         
         if project:
             queryset = queryset.filter(project_id=project)
+        if min_utilization:
+            queryset = queryset.filter(utilization__gte=self.parse_percent('min_utilization', min_utilization))
+        if max_utilization:
+            queryset = queryset.filter(utilization__lte=self.parse_percent('max_utilization', max_utilization))
         
         return queryset
     
+    def parse_percent(self, name, value):
+        try:
+            percent = Decimal(value)
+        except InvalidOperation:
+            raise ValidationError({name: 'Expected a number.'})
+        if not percent.is_finite():
+            raise ValidationError({name: 'Expected a number.'})
+        return percent
+    
     def perform_create(self, serializer):
         serializer.save(created_by=self.request.user)
+    
+    @action(detail=True, methods=['get', 'post'])
+    def allocate(self, request, pk=None):
+        """
+        GET previews the next free address(es) of the pool;
+        POST allocates them atomically.
+        """
+        pool = self.get_object()
+        data = request.query_params if request.method == 'GET' else request.data
+        serializer = IPAllocationSerializer(data=data)
+        serializer.is_valid(raise_exception=True)
+        params = dict(serializer.validated_data)
+        count = params.pop('count')
+        contiguous = params.pop('contiguous')
+        
+        try:
+            if request.method == 'GET':
+                addresses = allocation.preview(pool, count, contiguous)
+                return Response({'addresses': [str(a) for a in addresses]})
+            ips = allocation.allocate(pool, count, contiguous, user=request.user, **params)
+        except allocation.AllocationError as exc:
+            return Response({'detail': str(exc)}, status=status.HTTP_409_CONFLICT)
+        
+        serializer = IPAddressSerializer(ips, many=True)
+        return Response(serializer.data, status=status.HTTP_201_CREATED)
 
 
-class IPAddressViewSet(viewsets.ModelViewSet):
+class IPAddressViewSet(ConditionalGetMixin, ExportMixin, FetchPlanMixin, viewsets.ModelViewSet):
     """ViewSet for IP address management."""
     queryset = IPAddress.objects.all()
     serializer_class = IPAddressSerializer
@@ -34,13 +95,28 @@ class IPAddressViewSet(viewsets.ModelViewSet):
     filter_backends = [filters.SearchFilter, filters.OrderingFilter]
     search_fields = ['ip_address', 'hostname', 'mac_address']
     ordering_fields = ['ip_address', 'hostname', 'status', 'created_at']
+    fetch_plans = {
+        'default': {'fields': {
+            'pool_name': {'select_related': ['pool']},
+            'device_name': {'select_related': ['device']},
+            'assigned_to_name': {'select_related': ['assigned_to']},
+        }},
+    }
+    export_fields = [
+        'id', 'pool__project__code', 'pool__name', 'pool__network', 'ip_address',
+        'hostname', 'status', 'device__name', 'mac_address', 'description',
+        'assigned_to__username', 'assigned_at', 'created_at', 'updated_at',
+    ]
     
     def get_queryset(self):
         queryset = super().get_queryset()
         pool = self.request.query_params.get('pool', None)
+        project = self.request.query_params.get('project', None)
         status = self.request.query_params.get('status', None)
         device = self.request.query_params.get('device', None)
         
+        if project:
+            queryset = queryset.filter(pool__project_id=project)
         if pool:
             queryset = queryset.filter(pool_id=pool)
         if status:
@@ -49,3 +125,53 @@ class IPAddressViewSet(viewsets.ModelViewSet):
             queryset = queryset.filter(device_id=device)
         
         return queryset
+    
+    @action(detail=False, methods=['post'], parser_classes=[JSONParser, MultiPartParser, CSVParser])
+    def bulk_import(self, request):
+        """
+        Import addresses into a pool from JSON (an array of rows, or an
+        object with ``pool`` and ``rows``/``addresses``), a CSV file upload
+        or a raw ``text/csv`` body and return a per-row error report.
+        """
+        data = request.data
+        if isinstance(data, list):
+            # A bare JSON array of rows; the pool comes from ?pool=.
+            data = {'rows': data}
+        elif not hasattr(data, 'get'):
+            return Response(
+                {'detail': 'Expected a JSON object or array, a CSV upload or a text/csv body.'},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        pool_id = request.query_params.get('pool') or data.get('pool')
+        if not pool_id:
+            return Response({'pool': 'This field is required.'}, status=status.HTTP_400_BAD_REQUEST)
+        if not str(pool_id).isdigit():
+            return Response({'pool': 'A valid integer is required.'}, status=status.HTTP_400_BAD_REQUEST)
+        pool = get_object_or_404(IPAddressPool, pk=pool_id)
+        
+        if 'rows' in data:
+            rows = data['rows']
+        elif 'file' in request.FILES:
+            rows = csv.DictReader(codecs.iterdecode(request.FILES['file'], 'utf-8-sig'))
+        else:
+            rows = data.get('addresses', [])
+        if isinstance(rows, (str, bytes, dict)) or not hasattr(rows, '__iter__'):
+            return Response({'rows': 'Expected a list of objects.'}, status=status.HTTP_400_BAD_REQUEST)
+        
+        on_error = request.query_params.get('on_error', 'abort')
+        try:
+            report = import_addresses(
+                pool,
+                rows,
+                user=request.user,
+                default_status=request.query_params.get('status', 'allocated'),
+                skip_invalid=on_error == 'skip',
+            )
+        except UnicodeDecodeError:
+            # CSV rows are decoded as they are read, inside the import.
+            return Response({'detail': 'The CSV data is not valid UTF-8.'}, status=status.HTTP_400_BAD_REQUEST)
+        except csv.Error as exc:
+            return Response({'detail': f'Invalid CSV data: {exc}.'}, status=status.HTTP_400_BAD_REQUEST)
+        if report['errors'] and not report['created']:
+            return Response(report, status=status.HTTP_400_BAD_REQUEST)
+        return Response(report, status=status.HTTP_201_CREATED)
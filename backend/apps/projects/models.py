@@ -1,7 +1,18 @@
 from django.db import models
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
 from django.conf import settings
 
 
+class ProjectQuerySet(models.QuerySet):
+    def visible_to(self, user):
+        """Projects ``user`` manages or is a team member of; staff see all."""
+        if user.is_staff or user.is_superuser:
+            return self
+        member = self.filter(team_members=user).values('pk')
+        return self.filter(models.Q(manager=user) | models.Q(pk__in=member))
+
+
 class Project(models.Model):
     """Project model for managing telecommunications projects."""
     
@@ -48,9 +59,14 @@ class Project(models.Model):
     
     metadata = models.JSONField(default=dict, blank=True)
     
+    # Weighted full-text vector, maintained by apps.search.
+    search_vector = SearchVectorField(null=True, editable=False)
+    
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
+    objects = ProjectQuerySet.as_manager()
+    
     class Meta:
         ordering = ['-created_at']
         verbose_name = 'Project'
@@ -59,6 +75,7 @@ class Project(models.Model):
             models.Index(fields=['code']),
             models.Index(fields=['status']),
             models.Index(fields=['manager']),
+            GinIndex(fields=['search_vector'], name='projects_project_search_idx'),
         ]
     
     def __str__(self):
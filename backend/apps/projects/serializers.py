@@ -1,9 +1,10 @@
 from rest_framework import serializers
+from apps.core.serializers import SparseFieldsetMixin
 from .models import Project, Contract
 from apps.authentication.serializers import UserSerializer
 
 
-class ProjectSerializer(serializers.ModelSerializer):
+class ProjectSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     manager_details = UserSerializer(source='manager', read_only=True)
     team_members_details = UserSerializer(source='team_members', many=True, read_only=True)
     
@@ -18,7 +19,7 @@ class ProjectSerializer(serializers.ModelSerializer):
         read_only_fields = ['created_at', 'updated_at']
 
 
-class ProjectListSerializer(serializers.ModelSerializer):
+class ProjectListSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     manager_name = serializers.CharField(source='manager.full_name', read_only=True)
     
     class Meta:
@@ -29,7 +30,7 @@ class ProjectListSerializer(serializers.ModelSerializer):
         ]
 
 
-class ContractSerializer(serializers.ModelSerializer):
+class ContractSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     project_details = ProjectListSerializer(source='project', read_only=True)
     created_by_details = UserSerializer(source='created_by', read_only=True)
     
@@ -1,18 +1,31 @@
 from rest_framework import viewsets, filters
+from django.db.models import Prefetch
 from rest_framework.permissions import IsAuthenticated
+from apps.authentication.models import User
+from apps.core.mixins import ConditionalGetMixin, FetchPlanMixin
+from apps.search.filters import SearchVectorFilter
 from .models import Project, Contract
 from .serializers import ProjectSerializer, ProjectListSerializer, ContractSerializer
 
 
-class ProjectViewSet(viewsets.ModelViewSet):
+class ProjectViewSet(ConditionalGetMixin, FetchPlanMixin, viewsets.ModelViewSet):
     """
     ViewSet for project management.
     """
     queryset = Project.objects.all()
     permission_classes = [IsAuthenticated]
-    filter_backends = [filters.SearchFilter, filters.OrderingFilter]
+    filter_backends = [SearchVectorFilter, filters.OrderingFilter]
     search_fields = ['name', 'code', 'client', 'location']
     ordering_fields = ['name', 'code', 'status', 'priority', 'created_at']
+    fetch_plans = {
+        'default': {'fields': {
+            'manager_name': {'select_related': ['manager']},
+            'manager_details': {'select_related': ['manager__role']},
+            'team_members_details': {'prefetch_related': [Prefetch(
+                'team_members', queryset=User.objects.select_related('role')
+            )]},
+        }},
+    }
     
     def get_serializer_class(self):
         if self.action == 'list':
@@ -35,7 +48,7 @@ class ProjectViewSet(viewsets.ModelViewSet):
         return queryset
 
 
-class ContractViewSet(viewsets.ModelViewSet):
+class ContractViewSet(ConditionalGetMixin, FetchPlanMixin, viewsets.ModelViewSet):
     """
     ViewSet for contract management.
     """
@@ -45,6 +58,12 @@ class ContractViewSet(viewsets.ModelViewSet):
     filter_backends = [filters.SearchFilter, filters.OrderingFilter]
     search_fields = ['contract_number', 'title', 'contractor']
     ordering_fields = ['contract_number', 'status', 'created_at']
+    fetch_plans = {
+        'default': {'fields': {
+            'project_details': {'select_related': ['project__manager']},
+            'created_by_details': {'select_related': ['created_by__role']},
+        }},
+    }
     
     def get_queryset(self):
         queryset = super().get_queryset()
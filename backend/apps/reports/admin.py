@@ -0,0 +1,31 @@
+from django.contrib import admin
+from .models import ReportJob
+
+
+@admin.register(ReportJob)
+class ReportJobAdmin(admin.ModelAdmin):
+    list_display = ['id', 'report_type', 'project', 'status', 'progress', 'requested_by', 'created_at', 'finished_at']
+    list_filter = ['report_type', 'status', 'created_at']
+    search_fields = ['project__name', 'project__code', 'requested_by__username']
+    ordering = ['-created_at']
+    
+    fieldsets = (
+        ('Request', {
+            'fields': ('report_type', 'project', 'params', 'requested_by')
+        }),
+        ('Progress', {
+            'fields': ('status', 'progress', 'message', 'error', 'celery_task_id')
+        }),
+        ('Output', {
+            'fields': ('file', 'file_size', 'params_hash', 'data_version')
+        }),
+        ('Timestamps', {
+            'fields': ('created_at', 'started_at', 'finished_at', 'updated_at')
+        }),
+    )
+    
+    readonly_fields = [
+        'report_type', 'project', 'params', 'requested_by', 'status', 'progress',
+        'message', 'error', 'celery_task_id', 'file', 'file_size', 'params_hash',
+        'data_version', 'created_at', 'started_at', 'finished_at', 'updated_at'
+    ]
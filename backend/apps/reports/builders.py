@@ -0,0 +1,120 @@
+"""
+Report builders.
+
+A builder writes the report of a job to a binary file object and reports
+how far it got through ``progress(percent, message)``. Rows are read with
+server-side cursors and written as they arrive, so memory use does not grow
+with the size of the project. ``BUILDERS`` maps each report type to its
+builder and file extension.
+"""
+import json
+import shutil
+import zipfile
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils import timezone
+
+from apps.bom.models import BOMInstanceItem
+from apps.core.export import csv_stream
+from apps.devices.models import Device
+from apps.documents.models import Document, Photo
+from apps.installation.models import ChecklistItem
+from apps.ipam.models import IPAddress
+from apps.statistics.dashboard import build_summaries
+from apps.tasks.models import Task
+
+CHUNK_SIZE = 2000
+
+# (file name, model, project lookup, columns)
+CLOSEOUT_SECTIONS = [
+    ('tasks.csv', Task, 'project_id', [
+        'id', 'parent_id', 'title', 'task_type', 'status', 'priority',
+        'assigned_to__username', 'due_date', 'estimated_hours', 'actual_hours',
+        'completed_at', 'created_at',
+    ]),
+    ('checklist_items.csv', ChecklistItem, 'checklist__task__project_id', [
+        'checklist_id', 'checklist__name', 'checklist__task__title', 'checklist__status',
+        'order', 'title', 'is_required', 'is_completed', 'completed_by__username',
+        'completed_at', 'notes',
+    ]),
+    ('bom_items.csv', BOMInstanceItem, 'bom_instance__project_id', [
+        'bom_instance__name', 'bom_instance__status', 'component__sku', 'component__name',
+        'component__unit_of_measure', 'quantity_planned', 'quantity_ordered',
+        'quantity_received', 'quantity_installed', 'unit_cost', 'total_cost', 'notes',
+    ]),
+    ('devices.csv', Device, 'project_id', [
+        'id', 'name', 'device_type', 'manufacturer', 'model', 'serial_number', 'status',
+        'location', 'mac_address', 'firmware_version', 'installation_date', 'warranty_expiry',
+    ]),
+    ('ip_addresses.csv', IPAddress, 'pool__project_id', [
+        'pool__name', 'pool__network', 'pool__vlan_id', 'ip_address', 'hostname', 'status',
+        'device__name', 'device__serial_number', 'mac_address', 'description',
+    ]),
+    ('documents.csv', Document, 'project_id', [
+        'id', 'title', 'document_type', 'version', 'file', 'file_size',
+        'uploaded_by__username', 'created_at',
+    ]),
+    ('photos.csv', Photo, 'project_id', [
+        'id', 'title', 'task__title', 'image', 'location', 'gps_coordinates', 'taken_at',
+    ]),
+]
+
+
+def write_csv(package, name, queryset, columns):
+    rows = queryset.order_by('pk').values_list(*columns).iterator(chunk_size=CHUNK_SIZE)
+    with package.open(name, 'w') as member:
+        for line in csv_stream(columns, rows):
+            member.write(line.encode())
+
+
+def project_closeout(job, output, progress):
+    """
+    Zip package with the project summary and CSV listings of its tasks,
+    checklists, BOM, devices, IP addresses, documents and photos; with the
+    ``include_files`` param also the document files themselves.
+    """
+    project = job.project
+    include_files = job.params.get('include_files', False)
+    steps = len(CLOSEOUT_SECTIONS) + 1 + include_files
+    
+    with zipfile.ZipFile(output, 'w', compression=zipfile.ZIP_DEFLATED) as package:
+        summary = {
+            'generated_at': timezone.now(),
+            'project': {
+                'id': project.pk,
+                'code': project.code,
+                'name': project.name,
+                'status': project.status,
+                'client': project.client,
+                'start_date': project.start_date,
+                'end_date': project.end_date,
+            },
+            'summary': build_summaries([project.pk]).get(project.pk),
+        }
+        package.writestr('summary.json', json.dumps(summary, cls=DjangoJSONEncoder, indent=2))
+        progress(100 // steps, 'Wrote summary.json')
+        
+        for step, (name, model, lookup, columns) in enumerate(CLOSEOUT_SECTIONS, start=2):
+            write_csv(package, name, model.objects.filter(**{lookup: project.pk}), columns)
+            progress(100 * step // steps, f'Wrote {name}')
+        
+        if include_files:
+            missing = []
+            documents = Document.objects.filter(project=project).exclude(file='').only('id', 'file')
+            for document in documents.iterator(chunk_size=CHUNK_SIZE):
+                name = f"documents/{document.pk}-{document.file.name.rsplit('/', 1)[-1]}"
+                try:
+                    source = document.file.open('rb')
+                except FileNotFoundError:
+                    missing.append(document.file.name)
+                    continue
+                with source, package.open(name, 'w', force_zip64=True) as member:
+                    shutil.copyfileobj(source, member)
+            if missing:
+                package.writestr('documents/MISSING.txt', '\n'.join(missing) + '\n')
+            progress(100 * steps // steps, 'Added document files')
+
+
+BUILDERS = {
+    'project_closeout': (project_closeout, 'zip'),
+}
@@ -0,0 +1,104 @@
+"""
+Report job lifecycle.
+
+``submit`` reuses a live job for the same request and project data version
+(so identical concurrent requests, and repeats while nothing changed, share
+one build) or creates one and queues it on commit. ``run`` executes a job
+in the Celery worker, writes the output to the default storage
+(``MEDIA_ROOT``) and records progress on the job row as it goes.
+"""
+import logging
+import tempfile
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.files import File
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+from django.utils.text import slugify
+
+from apps.core.cache import namespace_version
+from apps.statistics.dashboard import project_namespace
+from . import tasks
+from .builders import BUILDERS
+from .models import ReportJob
+
+logger = logging.getLogger(__name__)
+
+
+def data_version(project_id):
+    """
+    Version of the project data, bumped by the signal handlers whenever a
+    row of the project changes (see ``apps.statistics.dashboard``).
+    """
+    return str(namespace_version(project_namespace(project_id)))
+
+
+def expire_stale(params_hash):
+    """Fail unfinished jobs whose worker stopped reporting progress."""
+    cutoff = timezone.now() - timedelta(minutes=settings.REPORT_JOB_TIMEOUT_MINUTES)
+    ReportJob.objects.filter(
+        params_hash=params_hash, status__in=['pending', 'running'], updated_at__lt=cutoff
+    ).update(status='failed', error='Timed out.', finished_at=timezone.now(), updated_at=timezone.now())
+
+
+def submit(user, report_type, project, params):
+    """Return ``(job, created)`` for a report request."""
+    params_hash = ReportJob.hash_params(report_type, project.pk, params)
+    version = data_version(project.pk)
+    expire_stale(params_hash)
+    
+    live = ReportJob.objects.filter(
+        params_hash=params_hash, data_version=version, status__in=ReportJob.REUSABLE_STATUSES
+    )
+    job = live.first()
+    if job is not None:
+        return job, False
+    try:
+        with transaction.atomic():
+            job = ReportJob.objects.create(
+                report_type=report_type, project=project, params=params,
+                params_hash=params_hash, data_version=version, requested_by=user,
+            )
+    except IntegrityError:
+        # Submitted concurrently; share the other request's job.
+        return live.get(), False
+    transaction.on_commit(lambda: tasks.generate_report.delay(job.pk))
+    return job, True
+
+
+def set_progress(job_id, percent, message=''):
+    ReportJob.objects.filter(pk=job_id).update(
+        progress=min(percent, 99), message=message[:255], updated_at=timezone.now()
+    )
+
+
+def run(job_id, task_id=''):
+    """Build the report of a pending job; no-op if another worker claimed it."""
+    claimed = ReportJob.objects.filter(pk=job_id, status='pending').update(
+        status='running', started_at=timezone.now(), celery_task_id=task_id or '',
+        updated_at=timezone.now(),
+    )
+    if not claimed:
+        return
+    job = ReportJob.objects.select_related('project').get(pk=job_id)
+    builder, extension = BUILDERS[job.report_type]
+    
+    try:
+        with tempfile.TemporaryFile() as output:
+            builder(job, output, lambda percent, message='': set_progress(job.pk, percent, message))
+            output.seek(0)
+            name = f'{slugify(job.project.code)}-{job.report_type}-{job.pk}.{extension}'
+            job.file.save(name, File(output), save=False)
+    except Exception as exc:
+        logger.exception('Report job %s failed', job.pk)
+        ReportJob.objects.filter(pk=job.pk).update(
+            status='failed', error=str(exc) or exc.__class__.__name__, finished_at=timezone.now(),
+            updated_at=timezone.now(),
+        )
+        return
+    
+    ReportJob.objects.filter(pk=job.pk).update(
+        status='completed', progress=100, message='', file=job.file.name,
+        file_size=job.file.size, finished_at=timezone.now(), updated_at=timezone.now(),
+    )
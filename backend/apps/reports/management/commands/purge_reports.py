@@ -0,0 +1,29 @@
+import datetime
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from apps.reports.models import ReportJob
+
+
+class Command(BaseCommand):
+    help = 'Delete finished report jobs and their files after the retention period'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days', type=int, default=settings.REPORT_RETENTION_DAYS,
+            help='Keep jobs finished in the last N days (default: REPORT_RETENTION_DAYS)',
+        )
+
+    def handle(self, *args, **options):
+        if options['days'] < 0:
+            raise CommandError('--days must not be negative.')
+        cutoff = timezone.now() - datetime.timedelta(days=options['days'])
+
+        # Deleted one by one so the post_delete handler removes each file.
+        deleted = 0
+        for job in ReportJob.objects.filter(status__in=['completed', 'failed'], finished_at__lt=cutoff).iterator():
+            job.delete()
+            deleted += 1
+
+        self.stdout.write(self.style.SUCCESS(f'Deleted {deleted} report job(s).'))
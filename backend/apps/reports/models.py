@@ -0,0 +1,83 @@
+import hashlib
+import json
+
+from django.db import models
+from django.conf import settings
+from apps.projects.models import Project
+
+
+class ReportJob(models.Model):
+    """Report generated in the background by a Celery worker."""
+    
+    REPORT_TYPE_CHOICES = [
+        ('project_closeout', 'Project Close-out Package'),
+    ]
+    
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('running', 'Running'),
+        ('completed', 'Completed'),
+        ('failed', 'Failed'),
+    ]
+    
+    # Jobs in these states are reused for identical requests.
+    REUSABLE_STATUSES = ['pending', 'running', 'completed']
+    
+    report_type = models.CharField(max_length=50, choices=REPORT_TYPE_CHOICES)
+    project = models.ForeignKey(
+        Project,
+        on_delete=models.CASCADE,
+        related_name='report_jobs'
+    )
+    params = models.JSONField(default=dict, blank=True)
+    # Identity of the request (type, project, params) and of the project
+    # data it was built from; equal pairs produce equal reports.
+    params_hash = models.CharField(max_length=64, editable=False)
+    data_version = models.CharField(max_length=64, editable=False)
+    
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending')
+    progress = models.PositiveSmallIntegerField(default=0)  # percent
+    message = models.CharField(max_length=255, blank=True)
+    error = models.TextField(blank=True)
+    
+    file = models.FileField(upload_to='reports/%Y/%m/', blank=True)
+    file_size = models.BigIntegerField(default=0)  # in bytes
+    
+    requested_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        related_name='report_jobs'
+    )
+    celery_task_id = models.CharField(max_length=255, blank=True)
+    
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        ordering = ['-created_at']
+        verbose_name = 'Report Job'
+        verbose_name_plural = 'Report Jobs'
+        constraints = [
+            # At most one live job per request and data version; concurrent
+            # submissions collide here and reuse the winner.
+            models.UniqueConstraint(
+                fields=['params_hash', 'data_version'],
+                condition=models.Q(status__in=['pending', 'running', 'completed']),
+                name='reports_reportjob_unique_live',
+            ),
+        ]
+        indexes = [
+            models.Index(fields=['project', 'created_at']),
+            models.Index(fields=['requested_by', 'created_at']),
+        ]
+    
+    def __str__(self):
+        return f"{self.get_report_type_display()} #{self.pk} ({self.status})"
+    
+    @staticmethod
+    def hash_params(report_type, project_id, params):
+        payload = json.dumps([report_type, project_id, params], sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode()).hexdigest()
@@ -0,0 +1,53 @@
+from rest_framework import serializers
+from rest_framework.reverse import reverse
+from apps.core.serializers import SparseFieldsetMixin
+from apps.projects.models import Project
+from .models import ReportJob
+
+
+class ProjectCloseoutParamsSerializer(serializers.Serializer):
+    include_files = serializers.BooleanField(default=False)
+
+
+# Parameters accepted by each report type.
+PARAMS_SERIALIZERS = {
+    'project_closeout': ProjectCloseoutParamsSerializer,
+}
+
+
+class ReportJobSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
+    project_name = serializers.CharField(source='project.name', read_only=True)
+    requested_by_name = serializers.CharField(source='requested_by.full_name', read_only=True)
+    download_url = serializers.SerializerMethodField()
+    
+    class Meta:
+        model = ReportJob
+        fields = [
+            'id', 'report_type', 'project', 'project_name', 'params',
+            'status', 'progress', 'message', 'error', 'file_size', 'download_url',
+            'requested_by', 'requested_by_name',
+            'created_at', 'started_at', 'finished_at', 'updated_at'
+        ]
+        read_only_fields = [
+            'status', 'progress', 'message', 'error', 'file_size', 'requested_by',
+            'created_at', 'started_at', 'finished_at', 'updated_at'
+        ]
+    
+    def validate_project(self, value):
+        request = self.context['request']
+        if not Project.objects.visible_to(request.user).filter(pk=value.pk).exists():
+            raise serializers.ValidationError('You do not have access to this project.')
+        return value
+    
+    def validate(self, attrs):
+        params = PARAMS_SERIALIZERS[attrs['report_type']](data=attrs.get('params') or {})
+        if not params.is_valid():
+            raise serializers.ValidationError({'params': params.errors})
+        # Normalized with defaults so equal requests hash equally.
+        attrs['params'] = params.validated_data
+        return attrs
+    
+    def get_download_url(self, obj):
+        if obj.status != 'completed':
+            return None
+        return reverse('report-job-download', args=[obj.pk], request=self.context.get('request'))
@@ -0,0 +1,51 @@
+"""
+Signal handlers bumping the project data version for the rows report
+packages include beyond those the dashboard already tracks, and removing
+report files with their jobs.
+"""
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from apps.documents.models import Document, Photo
+from apps.installation.models import Checklist, ChecklistItem
+from apps.statistics import dashboard
+from apps.statistics.signals import related_project_id
+from apps.tasks.models import Task
+from .models import ReportJob
+
+
+@receiver(post_save, sender=Document)
+@receiver(post_delete, sender=Document)
+@receiver(post_save, sender=Photo)
+@receiver(post_delete, sender=Photo)
+def document_changed(sender, instance, raw=False, **kwargs):
+    if not raw:
+        dashboard.invalidate_project(instance.project_id)
+
+
+@receiver(post_save, sender=Checklist)
+@receiver(post_delete, sender=Checklist)
+def checklist_changed(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    dashboard.invalidate_project(related_project_id(instance, 'task', Task))
+
+
+@receiver(post_save, sender=ChecklistItem)
+@receiver(post_delete, sender=ChecklistItem)
+def checklist_item_changed(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    project_id = (
+        Checklist.objects.filter(pk=instance.checklist_id)
+        .values_list('task__project_id', flat=True).first()
+    )
+    dashboard.invalidate_project(project_id)
+
+
+@receiver(post_delete, sender=ReportJob)
+def report_job_deleted(sender, instance, **kwargs):
+    if instance.file:
+        storage, name = instance.file.storage, instance.file.name
+        transaction.on_commit(lambda: storage.delete(name))
@@ -0,0 +1,9 @@
+from celery import shared_task
+
+from . import jobs
+
+
+@shared_task(bind=True, ignore_result=True)
+def generate_report(self, job_id):
+    """Build the output of a report job (see ``apps.reports.jobs.run``)."""
+    jobs.run(job_id, task_id=self.request.id)
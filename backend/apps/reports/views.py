@@ -0,0 +1,72 @@
+import os
+
+from rest_framework import mixins, viewsets, status
+from rest_framework.decorators import action
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from apps.core import downloads
+from apps.core.mixins import ConditionalGetMixin, FetchPlanMixin
+from apps.projects.models import Project
+from . import jobs
+from .models import ReportJob
+from .serializers import ReportJobSerializer
+
+
+class ReportJobViewSet(ConditionalGetMixin, FetchPlanMixin, mixins.CreateModelMixin, viewsets.ReadOnlyModelViewSet):
+    """
+    Background report jobs.
+    
+    ``POST`` submits a report; an identical request for unchanged project
+    data returns the existing job instead of building it again. Poll the job
+    for ``status`` and ``progress`` and fetch the file from ``download``.
+    """
+    queryset = ReportJob.objects.all()
+    serializer_class = ReportJobSerializer
+    permission_classes = [IsAuthenticated]
+    fetch_plans = {
+        'default': {'fields': {
+            'project_name': {'select_related': ['project']},
+            'requested_by_name': {'select_related': ['requested_by']},
+        }},
+    }
+    
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        user = self.request.user
+        if not (user.is_staff or user.is_superuser):
+            queryset = queryset.filter(project__in=Project.objects.visible_to(user))
+        project = self.request.query_params.get('project', None)
+        report_type = self.request.query_params.get('report_type', None)
+        job_status = self.request.query_params.get('status', None)
+        
+        if project:
+            queryset = queryset.filter(project_id=project)
+        if report_type:
+            queryset = queryset.filter(report_type=report_type)
+        if job_status:
+            queryset = queryset.filter(status=job_status)
+        
+        return queryset
+    
+    def create(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        job, created = jobs.submit(
+            request.user,
+            serializer.validated_data['report_type'],
+            serializer.validated_data['project'],
+            serializer.validated_data['params'],
+        )
+        response_status = status.HTTP_200_OK if job.status == 'completed' else status.HTTP_202_ACCEPTED
+        return Response(self.get_serializer(job).data, status=response_status)
+    
+    @action(detail=True, methods=['get', 'head'])
+    def download(self, request, pk=None):
+        """Download the output of a completed job."""
+        job = self.get_object()
+        if job.status != 'completed' or not job.file:
+            return Response(
+                {'detail': f'Report is not ready (status: {job.status}).'},
+                status=status.HTTP_409_CONFLICT
+            )
+        return downloads.serve(request, job.file, os.path.basename(job.file.name))
@@ -0,0 +1 @@
+# Search has no models of its own to administer.
@@ -0,0 +1,21 @@
+from django.apps import AppConfig
+from django.db.models.signals import pre_migrate
+
+
+def create_extensions(using, **kwargs):
+    """Trigram indexes on the searchable models need ``pg_trgm``."""
+    from django.db import connections
+    connection = connections[using]
+    if connection.vendor == 'postgresql':
+        with connection.cursor() as cursor:
+            cursor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+
+
+class SearchConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'apps.search'
+    verbose_name = 'Search'
+    
+    def ready(self):
+        import apps.search.signals  # noqa
+        pre_migrate.connect(create_extensions, sender=self, dispatch_uid='search_create_extensions')
@@ -0,0 +1,17 @@
+from rest_framework.filters import SearchFilter
+
+from . import index
+
+
+class SearchVectorFilter(SearchFilter):
+    """
+    ``?search=`` for searchable models, answered from the ``search_vector``
+    GIN index (and the trigram indexes of prefix columns) instead of
+    ``ILIKE`` scans over ``search_fields``.
+    """
+
+    def filter_queryset(self, request, queryset, view):
+        text = request.query_params.get(self.search_param, '')
+        if not text.strip():
+            return queryset
+        return index.filter_queryset(queryset, text)
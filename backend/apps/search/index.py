@@ -0,0 +1,199 @@
+"""
+Full-text search index.
+
+Each searchable model stores a weighted ``tsvector`` of its text columns in
+``search_vector`` (GIN-indexed), rebuilt on save by the signal handlers and
+in bulk by ``python manage.py rebuild_search_index``. Vectors and queries
+are built with every configuration in ``SEARCH_CONFIGS`` (``simple`` for
+unstemmed Polish words, codes and serial numbers, plus ``english``), and
+query terms match as prefixes so search-as-you-type works. Columns listed
+under ``prefix`` (serial numbers, SKUs) additionally match by
+case-insensitive prefix through their ``UPPER()`` pattern indexes (see
+``apps.core.autocomplete.prefix_indexes``).
+
+``search`` ranks the matches of several models in a single ``UNION ALL``
+query.
+"""
+import re
+from functools import reduce
+from operator import or_
+
+from django.conf import settings
+from django.contrib.postgres.search import SearchQuery, SearchRank, SearchVector
+from django.db.models import Case, CharField, F, FloatField, IntegerField, Q, Value, When
+from django.db.models.functions import Cast, Greatest
+
+from apps.bom.models import Component
+from apps.devices.models import Device
+from apps.documents.models import Document
+from apps.projects.models import Project
+from apps.tasks.models import Task
+
+# Result type -> model, weighted columns ('A' highest), result title and
+# subtitle columns, project lookup (None for catalog rows) and prefix columns.
+SEARCHABLE = {
+    'project': {
+        'model': Project,
+        'fields': {'code': 'A', 'name': 'A', 'client': 'B', 'location': 'B', 'description': 'C', 'address': 'D'},
+        'title': 'name',
+        'subtitle': 'code',
+        'project': 'id',
+        'prefix': [],
+    },
+    'task': {
+        'model': Task,
+        'fields': {'title': 'A', 'description': 'C'},
+        'title': 'title',
+        'subtitle': 'status',
+        'project': 'project_id',
+        'prefix': [],
+    },
+    'document': {
+        'model': Document,
+        'fields': {'title': 'A', 'version': 'B', 'description': 'C'},
+        'title': 'title',
+        'subtitle': 'document_type',
+        'project': 'project_id',
+        'prefix': [],
+    },
+    'device': {
+        'model': Device,
+        'fields': {
+            'name': 'A', 'serial_number': 'A', 'manufacturer': 'B', 'model': 'B',
+            'mac_address': 'B', 'location': 'C', 'notes': 'D',
+        },
+        'title': 'name',
+        'subtitle': 'serial_number',
+        'project': 'project_id',
+        'prefix': ['serial_number'],
+    },
+    'component': {
+        'model': Component,
+        'fields': {'sku': 'A', 'name': 'A', 'manufacturer': 'B', 'model_number': 'B', 'description': 'C'},
+        'title': 'name',
+        'subtitle': 'sku',
+        'project': None,
+        'prefix': ['sku'],
+    },
+}
+
+MAX_TERMS = 8
+# Lexemes for the query: letters and digits, dropping tsquery operators.
+TERM = re.compile(r'[^\W_]+')
+
+
+def spec_for(model):
+    for kind, spec in SEARCHABLE.items():
+        if spec['model'] is model:
+            return kind, spec
+    return None, None
+
+
+def vector(spec):
+    """Expression computing the ``search_vector`` of a row."""
+    return reduce(lambda left, right: left + right, (
+        SearchVector(field, weight=weight, config=config)
+        for field, weight in spec['fields'].items()
+        for config in settings.SEARCH_CONFIGS
+    ))
+
+
+def update_vectors(model, queryset=None):
+    """Recompute ``search_vector`` for ``queryset`` (all rows by default)."""
+    _, spec = spec_for(model)
+    if queryset is None:
+        queryset = model.objects.all()
+    return queryset.order_by().update(search_vector=vector(spec))
+
+
+def parse_query(text):
+    """
+    ``SearchQuery`` matching rows containing every term of ``text`` as a
+    word prefix, or ``None`` when ``text`` has no searchable terms.
+    """
+    terms = TERM.findall((text or '').lower())[:MAX_TERMS]
+    if not terms:
+        return None
+    raw = ' & '.join(f'{term}:*' for term in terms)
+    return reduce(or_, (SearchQuery(raw, config=config, search_type='raw') for config in settings.SEARCH_CONFIGS))
+
+
+def matches(spec, query, text):
+    """Filter for rows of ``spec`` matching ``query`` or a ``prefix`` column."""
+    condition = Q(search_vector=query)
+    for field in spec['prefix']:
+        condition |= Q(**{f'{field}__istartswith': text.strip()})
+    return condition
+
+
+def rank(spec, query, text):
+    score = SearchRank(F('search_vector'), query)
+    if spec['prefix']:
+        # An exact code prefix (serial number, SKU) outranks any text match.
+        score = Greatest(score, Case(
+            When(reduce(or_, (Q(**{f'{field}__istartswith': text.strip()}) for field in spec['prefix'])), then=1.0),
+            default=0.0,
+            output_field=FloatField(),
+        ))
+    return score
+
+
+def filter_queryset(queryset, text):
+    """Narrow ``queryset`` of a searchable model to rows matching ``text``."""
+    _, spec = spec_for(queryset.model)
+    query = parse_query(text)
+    if query is None:
+        return queryset
+    return queryset.filter(matches(spec, query, text))
+
+
+def search(user, text, kinds=None, project=None, limit=20):
+    """
+    Ranked matches of ``text`` across the ``kinds`` of rows ``user`` may
+    see, optionally within one project, as dicts with ``type``, ``id``,
+    ``title``, ``subtitle``, ``project`` and ``rank``.
+    """
+    query = parse_query(text)
+    if query is None:
+        return []
+    visible = Project.objects.visible_to(user).values('pk')
+    parts = []
+    for kind in kinds or SEARCHABLE:
+        spec = SEARCHABLE[kind]
+        queryset = spec['model'].objects.filter(matches(spec, query, text))
+        if spec['project'] is None:
+            if project is not None:
+                continue
+            project_ref = Value(None, output_field=IntegerField())
+        else:
+            queryset = queryset.filter(**{f"{spec['project']}__in": visible})
+            if project is not None:
+                queryset = queryset.filter(**{spec['project']: project})
+            project_ref = Cast(spec['project'], IntegerField())
+        parts.append(
+            queryset.order_by().annotate(
+                result_type=Value(kind, output_field=CharField()),
+                result_title=Cast(spec['title'], CharField()),
+                result_subtitle=Cast(spec['subtitle'], CharField()),
+                result_project=project_ref,
+                result_rank=rank(spec, query, text),
+            ).values(
+                'id', 'result_type', 'result_title', 'result_subtitle', 'result_project', 'result_rank'
+            ).order_by('-result_rank')[:limit]
+        )
+    if not parts:
+        return []
+    rows = parts[0]
+    if len(parts) > 1:
+        rows = parts[0].union(*parts[1:], all=True).order_by('-result_rank', 'result_type', 'id')[:limit]
+    return [
+        {
+            'type': row['result_type'],
+            'id': row['id'],
+            'title': row['result_title'],
+            'subtitle': row['result_subtitle'],
+            'project': row['result_project'],
+            'rank': row['result_rank'],
+        }
+        for row in rows
+    ]
@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand, CommandError
+from apps.search import index
+
+
+class Command(BaseCommand):
+    help = 'Recompute the full-text search vectors of all searchable rows'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--type', action='append', dest='types',
+            help=f'Only this result type (repeatable): {", ".join(index.SEARCHABLE)}',
+        )
+
+    def handle(self, *args, **options):
+        types = options['types'] or list(index.SEARCHABLE)
+        unknown = set(types) - set(index.SEARCHABLE)
+        if unknown:
+            raise CommandError(f'Unknown types: {", ".join(sorted(unknown))}.')
+
+        for kind in types:
+            updated = index.update_vectors(index.SEARCHABLE[kind]['model'])
+            self.stdout.write(f'{kind}: {updated} row(s)')
+
+        self.stdout.write(self.style.SUCCESS('Search index rebuilt.'))
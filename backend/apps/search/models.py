@@ -0,0 +1,2 @@
+# The searchable models carry their own ``search_vector`` column and GIN
+# index; ``apps.search.index`` defines what goes into each vector.
@@ -0,0 +1,42 @@
+from rest_framework import serializers
+from rest_framework.reverse import reverse
+
+from .index import SEARCHABLE
+
+# Result type -> router basename of its detail endpoint.
+DETAIL_ROUTES = {
+    'project': 'project-detail',
+    'task': 'task-detail',
+    'document': 'document-detail',
+    'device': 'device-detail',
+    'component': 'component-detail',
+}
+
+
+class SearchQuerySerializer(serializers.Serializer):
+    q = serializers.CharField(max_length=200, trim_whitespace=True)
+    types = serializers.CharField(required=False, allow_blank=True)
+    project = serializers.IntegerField(required=False, min_value=1)
+    limit = serializers.IntegerField(required=False, min_value=1, max_value=100, default=20)
+    
+    def validate_types(self, value):
+        types = [name.strip() for name in value.split(',') if name.strip()]
+        unknown = set(types) - set(SEARCHABLE)
+        if unknown:
+            raise serializers.ValidationError(
+                f'Unknown types: {", ".join(sorted(unknown))}. Expected: {", ".join(SEARCHABLE)}.'
+            )
+        return types
+
+
+class SearchResultSerializer(serializers.Serializer):
+    type = serializers.CharField()
+    id = serializers.IntegerField()
+    title = serializers.CharField()
+    subtitle = serializers.CharField(allow_null=True)
+    project = serializers.IntegerField(allow_null=True)
+    rank = serializers.FloatField()
+    url = serializers.SerializerMethodField()
+    
+    def get_url(self, obj):
+        return reverse(DETAIL_ROUTES[obj['type']], args=[obj['id']], request=self.context.get('request'))
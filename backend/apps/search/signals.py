@@ -0,0 +1,27 @@
+"""
+Signal handlers refreshing the ``search_vector`` of a searchable row when
+it is saved with any of its indexed columns.
+"""
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+
+from apps.bom.models import Component
+from apps.devices.models import Device
+from apps.documents.models import Document
+from apps.projects.models import Project
+from apps.tasks.models import Task
+from . import index
+
+
+@receiver(post_save, sender=Project)
+@receiver(post_save, sender=Task)
+@receiver(post_save, sender=Document)
+@receiver(post_save, sender=Device)
+@receiver(post_save, sender=Component)
+def searchable_saved(sender, instance, raw=False, update_fields=None, **kwargs):
+    if raw:
+        return
+    _, spec = index.spec_for(sender)
+    if update_fields is not None and not set(update_fields) & set(spec['fields']):
+        return
+    index.update_vectors(sender, sender.objects.filter(pk=instance.pk))
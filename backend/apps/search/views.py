@@ -0,0 +1,27 @@
+from rest_framework import viewsets
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+
+from . import index
+from .serializers import SearchQuerySerializer, SearchResultSerializer
+
+
+class SearchViewSet(viewsets.ViewSet):
+    """
+    Ranked full-text search across projects, tasks, documents, devices and
+    components in one query (see ``apps.search.index``).
+    """
+    permission_classes = [IsAuthenticated]
+    
+    def list(self, request):
+        params = SearchQuerySerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        results = index.search(
+            request.user,
+            params.validated_data['q'],
+            kinds=params.validated_data.get('types') or None,
+            project=params.validated_data.get('project'),
+            limit=params.validated_data['limit'],
+        )
+        serializer = SearchResultSerializer(results, many=True, context={'request': request})
+        return Response({'count': len(results), 'results': serializer.data})
@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import WorkLog, Metric
+from .models import WorkLog, WorkLogRollup, Metric, MetricRollup
 
 
 @admin.register(WorkLog)
@@ -24,6 +24,31 @@ class WorkLogAdmin(admin.ModelAdmin):
     readonly_fields = ['duration_hours', 'created_at', 'updated_at']
 
 
+@admin.register(WorkLogRollup)
+class WorkLogRollupAdmin(admin.ModelAdmin):
+    list_display = ['period', 'period_start', 'user', 'task', 'project', 'total_hours', 'entries']
+    list_filter = ['period', 'period_start']
+    search_fields = ['task__title', 'user__username']
+    ordering = ['-period_start']
+    
+    fieldsets = (
+        ('Bucket', {
+            'fields': ('period', 'period_start', 'user', 'task', 'project')
+        }),
+        ('Totals', {
+            'fields': ('total_hours', 'entries')
+        }),
+        ('Timestamps', {
+            'fields': ('updated_at',)
+        }),
+    )
+    
+    readonly_fields = [
+        'period', 'period_start', 'user', 'task', 'project',
+        'total_hours', 'entries', 'updated_at'
+    ]
+
+
 @admin.register(Metric)
 class MetricAdmin(admin.ModelAdmin):
     list_display = ['name', 'metric_type', 'project', 'value', 'target_value', 'unit', 'recorded_at']
@@ -47,3 +72,28 @@ class MetricAdmin(admin.ModelAdmin):
     )
     
     readonly_fields = ['created_at', 'updated_at']
+
+
+@admin.register(MetricRollup)
+class MetricRollupAdmin(admin.ModelAdmin):
+    list_display = ['name', 'project', 'bucket_start', 'count', 'min_value', 'max_value', 'last_value']
+    list_filter = ['metric_type', 'project', 'bucket_start']
+    search_fields = ['name']
+    ordering = ['-bucket_start']
+    
+    fieldsets = (
+        ('Bucket', {
+            'fields': ('project', 'name', 'metric_type', 'unit', 'bucket_start')
+        }),
+        ('Aggregates', {
+            'fields': ('count', 'total', 'min_value', 'max_value', 'last_value', 'last_recorded_at')
+        }),
+        ('Timestamps', {
+            'fields': ('updated_at',)
+        }),
+    )
+    
+    readonly_fields = [
+        'project', 'name', 'metric_type', 'unit', 'bucket_start', 'count', 'total',
+        'min_value', 'max_value', 'last_value', 'last_recorded_at', 'updated_at'
+    ]
@@ -5,3 +5,6 @@ class StatisticsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.statistics'
     verbose_name = 'Statistics'
+    
+    def ready(self):
+        import apps.statistics.signals  # noqa
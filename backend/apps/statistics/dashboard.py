@@ -0,0 +1,171 @@
+"""
+Project dashboard summaries.
+
+Each project summary is assembled from one grouped query per source (tasks,
+devices, IP pools, daily work log rollups) for all requested projects at
+once and cached under a per-project versioned namespace. Signal handlers
+bump the namespace of a project whenever one of its rows changes, so a write
+only invalidates the summary of the project it belongs to.
+"""
+from datetime import timedelta
+from decimal import Decimal
+
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count, Q, Sum
+from django.utils import timezone
+
+from apps.core.cache import bump_namespace, namespace_versions, versioned_key
+from apps.devices.models import Device
+from apps.ipam.models import IPAddressPool
+from apps.projects.models import Project
+from apps.tasks.models import Task
+from .models import WorkLogRollup
+
+CACHE_TIMEOUT = 5 * 60
+ACCESS_NAMESPACE = 'dashboard:access'
+CLOSED_TASK_STATUSES = ['done', 'cancelled']
+COST_FIELDS = ['planned_cost', 'ordered_cost', 'received_cost', 'installed_cost']
+ZERO = Decimal('0.00')
+
+
+def project_namespace(project_id):
+    return f'dashboard:project:{project_id}'
+
+
+def invalidate_project(project_id):
+    if project_id is not None:
+        transaction.on_commit(lambda: bump_namespace(project_namespace(project_id)))
+
+
+def invalidate_access():
+    transaction.on_commit(lambda: bump_namespace(ACCESS_NAMESPACE))
+
+
+def visible_project_ids(user):
+    key = versioned_key(ACCESS_NAMESPACE, user.pk)
+    project_ids = cache.get(key)
+    if project_ids is None:
+        project_ids = list(Project.objects.visible_to(user).values_list('id', flat=True))
+        cache.set(key, project_ids, CACHE_TIMEOUT)
+    return project_ids
+
+
+def _amount(value):
+    return str((value or ZERO).quantize(ZERO))
+
+
+def build_summaries(project_ids):
+    """Dashboard summary per project id for ``project_ids``."""
+    now = timezone.now()
+    summaries = {}
+    projects = Project.objects.filter(id__in=project_ids).values(
+        'id', 'name', 'code', 'status', 'priority',
+        *[f'bom_cost__{field}' for field in COST_FIELDS],
+    )
+    for project in projects:
+        summaries[project['id']] = {
+            'id': project['id'],
+            'name': project['name'],
+            'code': project['code'],
+            'status': project['status'],
+            'priority': project['priority'],
+            'tasks': {'total': 0, 'open': 0, 'overdue': 0, 'by_status': {}, 'by_type': {}},
+            'devices': {'total': 0, 'by_status': {}},
+            'bom': {field: _amount(project[f'bom_cost__{field}']) for field in COST_FIELDS},
+            'ipam': {'pools': 0, 'capacity': 0, 'used': 0, 'utilization': '0.00'},
+            'hours': {'total': '0.00', 'last_7_days': '0.00'},
+        }
+
+    tasks = (
+        Task.objects.filter(project_id__in=summaries)
+        .values('project_id', 'status', 'task_type')
+        .annotate(
+            count=Count('id'),
+            overdue=Count('id', filter=Q(due_date__lt=now) & ~Q(status__in=CLOSED_TASK_STATUSES)),
+        )
+    )
+    for row in tasks:
+        counts = summaries[row['project_id']]['tasks']
+        counts['total'] += row['count']
+        counts['overdue'] += row['overdue']
+        if row['status'] not in CLOSED_TASK_STATUSES:
+            counts['open'] += row['count']
+        counts['by_status'][row['status']] = counts['by_status'].get(row['status'], 0) + row['count']
+        counts['by_type'][row['task_type']] = counts['by_type'].get(row['task_type'], 0) + row['count']
+
+    devices = (
+        Device.objects.filter(project_id__in=summaries)
+        .values('project_id', 'status')
+        .annotate(count=Count('id'))
+    )
+    for row in devices:
+        counts = summaries[row['project_id']]['devices']
+        counts['total'] += row['count']
+        counts['by_status'][row['status']] = row['count']
+
+    pools = (
+        IPAddressPool.objects.filter(project_id__in=summaries)
+        .with_utilization()
+        .values('project_id', 'capacity', 'used_ips')
+    )
+    for row in pools:
+        ipam = summaries[row['project_id']]['ipam']
+        ipam['pools'] += 1
+        ipam['capacity'] += row['capacity']
+        ipam['used'] += row['used_ips']
+    for summary in summaries.values():
+        ipam = summary['ipam']
+        if ipam['capacity']:
+            ipam['utilization'] = _amount(Decimal(ipam['used'] * 100) / ipam['capacity'])
+
+    week_start = timezone.localdate(now) - timedelta(days=6)
+    hours = (
+        WorkLogRollup.objects.filter(period='day', project_id__in=summaries)
+        .values('project_id')
+        .annotate(
+            total=Sum('total_hours'),
+            last_7_days=Sum('total_hours', filter=Q(period_start__gte=week_start)),
+        )
+        .order_by()
+    )
+    for row in hours:
+        summaries[row['project_id']]['hours'] = {
+            'total': _amount(row['total']),
+            'last_7_days': _amount(row['last_7_days']),
+        }
+
+    return summaries
+
+
+def project_dashboard(user, project_ids=None):
+    """
+    Summaries of the projects visible to ``user`` (optionally limited to
+    ``project_ids``), served from the cache where still current.
+    """
+    visible = visible_project_ids(user)
+    if project_ids:
+        wanted = set(project_ids)
+        visible = [project_id for project_id in visible if project_id in wanted]
+
+    versions = namespace_versions([project_namespace(project_id) for project_id in visible])
+    keys = {
+        project_id: versioned_key(
+            project_namespace(project_id), 'summary',
+            version=versions[project_namespace(project_id)],
+        )
+        for project_id in visible
+    }
+    cached = cache.get_many(keys.values())
+    summaries = {
+        project_id: cached[key] for project_id, key in keys.items() if key in cached
+    }
+    missing = [project_id for project_id in visible if project_id not in summaries]
+    if missing:
+        built = build_summaries(missing)
+        cache.set_many(
+            {keys[project_id]: summary for project_id, summary in built.items()},
+            CACHE_TIMEOUT,
+        )
+        summaries.update(built)
+    return [summaries[project_id] for project_id in visible if project_id in summaries]
@@ -0,0 +1,30 @@
+import datetime
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from apps.statistics import timeseries
+
+
+class Command(BaseCommand):
+    help = 'Compact raw metric points past their retention into hourly rollups'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days', type=int, default=settings.METRIC_RAW_RETENTION_DAYS,
+            help='Keep raw points of the last N days (default: METRIC_RAW_RETENTION_DAYS)',
+        )
+
+    def handle(self, *args, **options):
+        if options['days'] < 0:
+            raise CommandError('--days must not be negative.')
+        # Cut at a full hour so no hourly bucket is split.
+        before = (timezone.now() - datetime.timedelta(days=options['days'])).replace(
+            minute=0, second=0, microsecond=0
+        )
+
+        compacted = timeseries.compact(before)
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Compacted {compacted} metric point(s) recorded before {before:%Y-%m-%d %H:%M}.'
+        ))
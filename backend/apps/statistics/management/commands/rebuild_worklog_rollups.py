@@ -0,0 +1,24 @@
+import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+from apps.statistics import rollups
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the day/week/month work log rollups from the work logs'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--since', help='Only rebuild periods from this date (YYYY-MM-DD)')
+        parser.add_argument('--user', type=int, help='Only rebuild this user')
+
+    def handle(self, *args, **options):
+        since = None
+        if options['since']:
+            try:
+                since = datetime.date.fromisoformat(options['since'])
+            except ValueError:
+                raise CommandError('--since must be a date in YYYY-MM-DD format.')
+
+        written = rollups.rebuild(since=since, user_id=options['user'])
+
+        self.stdout.write(self.style.SUCCESS(f'Wrote {written} work log rollup row(s).'))
@@ -1,3 +1,6 @@
+from decimal import Decimal
+
+from django.contrib.postgres.indexes import BrinIndex
 from django.db import models
 from django.conf import settings
 from apps.projects.models import Project
@@ -33,12 +36,28 @@ class WorkLog(models.Model):
         verbose_name_plural = 'Work Logs'
         indexes = [
             models.Index(fields=['task', 'user']),
-            models.Index(fields=['start_time']),
+            models.Index(fields=['start_time', 'id']),
+            models.Index(fields=['user', 'start_time']),
+            models.Index(fields=['updated_at', 'id']),
         ]
     
     def __str__(self):
         return f"{self.user.username} - {self.task.title} ({self.duration_hours}h)"
     
+    # Fields the work log rollups are derived from.
+    ROLLUP_DEPENDENCIES = {'task_id', 'user_id', 'start_time', 'duration_hours'}
+    
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        log = super().from_db(db, field_names, values)
+        # Snapshot the persisted values so rollups can be updated by delta.
+        if not log.get_deferred_fields() & log.ROLLUP_DEPENDENCIES:
+            log._saved_rollup = log.rollup_values()
+        return log
+    
+    def rollup_values(self):
+        return (self.user_id, self.task_id, self.start_time, Decimal(str(self.duration_hours)))
+    
     def save(self, *args, **kwargs):
         if self.start_time and self.end_time:
             duration = (self.end_time - self.start_time).total_seconds() / 3600
@@ -46,6 +65,53 @@ class WorkLog(models.Model):
         super().save(*args, **kwargs)
 
 
+class WorkLogRollup(models.Model):
+    """Hours logged per user and task, summed per day, week or month."""
+    
+    PERIOD_CHOICES = [
+        ('day', 'Day'),
+        ('week', 'Week'),
+        ('month', 'Month'),
+    ]
+    
+    period = models.CharField(max_length=10, choices=PERIOD_CHOICES)
+    period_start = models.DateField()
+    
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='work_log_rollups'
+    )
+    task = models.ForeignKey(
+        Task,
+        on_delete=models.CASCADE,
+        related_name='work_log_rollups'
+    )
+    project = models.ForeignKey(
+        Project,
+        on_delete=models.CASCADE,
+        related_name='work_log_rollups'
+    )
+    
+    total_hours = models.DecimalField(max_digits=10, decimal_places=2, default=0)
+    entries = models.IntegerField(default=0)
+    
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        ordering = ['period', 'period_start']
+        verbose_name = 'Work Log Rollup'
+        verbose_name_plural = 'Work Log Rollups'
+        unique_together = ['period', 'period_start', 'user', 'task']
+        indexes = [
+            models.Index(fields=['period', 'user', 'period_start']),
+            models.Index(fields=['period', 'project', 'period_start']),
+        ]
+    
+    def __str__(self):
+        return f"{self.user_id} / {self.task_id} {self.period} {self.period_start}: {self.total_hours}h"
+
+
 class Metric(models.Model):
     """Metric model for tracking project metrics."""
     
@@ -90,8 +156,44 @@ class Metric(models.Model):
         verbose_name_plural = 'Metrics'
         indexes = [
             models.Index(fields=['project', 'metric_type']),
-            models.Index(fields=['recorded_at']),
+            models.Index(fields=['project', 'name', 'recorded_at']),
+            # Points are appended roughly in time order, so a block range
+            # index serves range scans at a fraction of a B-tree's size.
+            BrinIndex(fields=['recorded_at'], name='statistics_metric_brin', autosummarize=True),
         ]
     
     def __str__(self):
         return f"{self.project.code} - {self.name}: {self.value}{self.unit}"
+
+
+class MetricRollup(models.Model):
+    """Hourly aggregate of compacted raw metric points (see timeseries.compact)."""
+    
+    project = models.ForeignKey(
+        Project,
+        on_delete=models.CASCADE,
+        related_name='metric_rollups'
+    )
+    
+    name = models.CharField(max_length=255)
+    metric_type = models.CharField(max_length=50, choices=Metric.METRIC_TYPE_CHOICES)
+    unit = models.CharField(max_length=50, blank=True)
+    
+    bucket_start = models.DateTimeField()
+    count = models.PositiveIntegerField(default=0)
+    total = models.DecimalField(max_digits=16, decimal_places=2, default=0)
+    min_value = models.DecimalField(max_digits=10, decimal_places=2)
+    max_value = models.DecimalField(max_digits=10, decimal_places=2)
+    last_value = models.DecimalField(max_digits=10, decimal_places=2)
+    last_recorded_at = models.DateTimeField()
+    
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        ordering = ['-bucket_start']
+        verbose_name = 'Metric Rollup'
+        verbose_name_plural = 'Metric Rollups'
+        unique_together = ['project', 'name', 'bucket_start']
+    
+    def __str__(self):
+        return f"{self.project_id} - {self.name} @ {self.bucket_start}: {self.count} point(s)"
@@ -0,0 +1,147 @@
+"""
+Incremental maintenance of work log rollups.
+
+Every work log contributes its hours to one ``WorkLogRollup`` row per
+period (day, week, month) for its user and task, bucketed by the local date
+of ``start_time``. Saves and deletes apply the difference to those rows
+with ``F()`` updates; ``rebuild`` recomputes them from scratch.
+"""
+from datetime import datetime, time, timedelta
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, DateField, F, Sum
+from django.db.models.functions import TruncDay, TruncMonth, TruncWeek
+from django.utils import timezone
+
+from apps.tasks.models import Task
+from .models import WorkLog, WorkLogRollup
+
+PERIODS = ['day', 'week', 'month']
+TRUNCATE = {'day': TruncDay, 'week': TruncWeek, 'month': TruncMonth}
+BATCH_SIZE = 1000
+
+
+def period_start(period, day):
+    """First day of the ``period`` containing ``day``."""
+    if period == 'week':
+        return day - timedelta(days=day.weekday())
+    if period == 'month':
+        return day.replace(day=1)
+    return day
+
+
+def bucket_starts(moment):
+    day = timezone.localtime(moment).date()
+    return {period: period_start(period, day) for period in PERIODS}
+
+
+def add(user_id, task_id, moment, hours, entries, create=True):
+    """
+    Add ``hours`` and ``entries`` to the rollups of one work log, creating
+    missing rows unless ``create`` is false.
+    """
+    project_id = None
+    for period, start in bucket_starts(moment).items():
+        rollups = WorkLogRollup.objects.filter(
+            period=period, period_start=start, user_id=user_id, task_id=task_id
+        )
+        updated = rollups.update(
+            total_hours=F('total_hours') + hours,
+            entries=F('entries') + entries,
+            updated_at=timezone.now(),
+        )
+        if updated or not create:
+            continue
+        if project_id is None:
+            project_id = Task.objects.values_list('project_id', flat=True).get(pk=task_id)
+        try:
+            with transaction.atomic():
+                WorkLogRollup.objects.create(
+                    period=period, period_start=start, user_id=user_id,
+                    task_id=task_id, project_id=project_id,
+                    total_hours=hours, entries=entries,
+                )
+        except IntegrityError:
+            # Created concurrently; apply the delta to that row instead.
+            rollups.update(
+                total_hours=F('total_hours') + hours,
+                entries=F('entries') + entries,
+                updated_at=timezone.now(),
+            )
+
+
+def subtract(user_id, task_id, moment, hours):
+    # Never create rows here: during cascade deletes the rollups of the
+    # task may already be gone.
+    add(user_id, task_id, moment, -hours, -1, create=False)
+    WorkLogRollup.objects.filter(
+        user_id=user_id, task_id=task_id, entries__lte=0,
+        period_start__in=set(bucket_starts(moment).values()),
+    ).delete()
+
+
+def ensure_snapshot(log):
+    """Load the persisted values of an existing work log without a snapshot."""
+    if log._state.adding or hasattr(log, '_saved_rollup'):
+        return
+    saved = WorkLog.objects.filter(pk=log.pk).first()
+    if saved is not None:
+        log._saved_rollup = saved._saved_rollup
+
+
+def log_saved(log):
+    old = getattr(log, '_saved_rollup', None)
+    new = log.rollup_values()
+    if old == new:
+        return
+    if old is not None:
+        subtract(*old)
+    add(*new, entries=1)
+    log._saved_rollup = new
+
+
+def log_deleted(log):
+    old = getattr(log, '_saved_rollup', None) or log.rollup_values()
+    subtract(*old)
+
+
+def rebuild(since=None, user_id=None):
+    """
+    Recompute the rollups from the work logs, optionally only for the
+    periods from ``since`` (a date) onwards and for one user.
+
+    Returns the number of rollup rows written.
+    """
+    written = 0
+    with transaction.atomic():
+        for period in PERIODS:
+            rollups = WorkLogRollup.objects.filter(period=period)
+            logs = WorkLog.objects.all()
+            if since is not None:
+                start = period_start(period, since)
+                rollups = rollups.filter(period_start__gte=start)
+                logs = logs.filter(
+                    start_time__gte=timezone.make_aware(datetime.combine(start, time.min))
+                )
+            if user_id is not None:
+                rollups = rollups.filter(user_id=user_id)
+                logs = logs.filter(user_id=user_id)
+            rollups.delete()
+
+            rows = (
+                logs.annotate(bucket=TRUNCATE[period]('start_time', output_field=DateField()))
+                .values('bucket', 'user_id', 'task_id', 'task__project_id')
+                .annotate(hours=Sum('duration_hours'), count=Count('id'))
+                .order_by()
+            )
+            objects = [
+                WorkLogRollup(
+                    period=period, period_start=row['bucket'], user_id=row['user_id'],
+                    task_id=row['task_id'], project_id=row['task__project_id'],
+                    total_hours=row['hours'], entries=row['count'],
+                )
+                for row in rows.iterator()
+            ]
+            WorkLogRollup.objects.bulk_create(objects, batch_size=BATCH_SIZE)
+            written += len(objects)
+    return written
@@ -1,8 +1,9 @@
 from rest_framework import serializers
+from apps.core.serializers import SparseFieldsetMixin
 from .models import WorkLog, Metric
 
 
-class WorkLogSerializer(serializers.ModelSerializer):
+class WorkLogSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     task_title = serializers.CharField(source='task.title', read_only=True)
     user_name = serializers.CharField(source='user.full_name', read_only=True)
     
@@ -16,7 +17,7 @@ class WorkLogSerializer(serializers.ModelSerializer):
         read_only_fields = ['duration_hours', 'created_at', 'updated_at']
 
 
-class MetricSerializer(serializers.ModelSerializer):
+class MetricSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     project_name = serializers.CharField(source='project.name', read_only=True)
     recorded_by_name = serializers.CharField(source='recorded_by.full_name', read_only=True)
     
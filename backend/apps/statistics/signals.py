@@ -0,0 +1,113 @@
+"""
+Signal handlers keeping work log rollups and task hours current and
+invalidating cached project dashboards.
+"""
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from apps.bom.models import BOMInstance, BOMInstanceItem, ProjectBOMCost
+from apps.devices.models import Device
+from apps.ipam.models import IPAddress, IPAddressPool
+from apps.projects.models import Project
+from apps.tasks import hours
+from apps.tasks.models import Task
+from . import dashboard, rollups
+from .models import WorkLog, WorkLogRollup
+
+
+def related_project_id(instance, relation, model):
+    """Project id of the object ``instance.<relation>`` points to."""
+    related = instance._state.fields_cache.get(relation)
+    if related is not None:
+        return related.project_id
+    related_id = getattr(instance, f'{relation}_id')
+    return model.objects.filter(pk=related_id).values_list('project_id', flat=True).first()
+
+
+@receiver(post_save, sender=Project)
+@receiver(post_delete, sender=Project)
+def project_changed(sender, instance, **kwargs):
+    dashboard.invalidate_project(instance.pk)
+    dashboard.invalidate_access()
+
+
+@receiver(m2m_changed, sender=Project.team_members.through)
+def project_members_changed(sender, action, **kwargs):
+    if action in ('post_add', 'post_remove', 'post_clear'):
+        dashboard.invalidate_access()
+
+
+@receiver(post_save, sender=Task)
+@receiver(post_delete, sender=Task)
+@receiver(post_save, sender=Device)
+@receiver(post_delete, sender=Device)
+@receiver(post_save, sender=IPAddressPool)
+@receiver(post_delete, sender=IPAddressPool)
+@receiver(post_save, sender=BOMInstance)
+@receiver(post_delete, sender=BOMInstance)
+@receiver(post_save, sender=ProjectBOMCost)
+def project_row_changed(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    dashboard.invalidate_project(instance.project_id)
+
+
+@receiver(pre_save, sender=WorkLog)
+def worklog_saving(sender, instance, raw=False, **kwargs):
+    if not raw:
+        rollups.ensure_snapshot(instance)
+
+
+def task_hours(values):
+    """``(task_id, hours)`` of a work log rollup snapshot."""
+    if values is None:
+        return None
+    _, task_id, _, duration = values
+    return task_id, duration
+
+
+@receiver(post_save, sender=WorkLog)
+def worklog_saved(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    old = getattr(instance, '_saved_rollup', None)
+    rollups.log_saved(instance)
+    hours.log_changed(task_hours(old), task_hours(instance.rollup_values()))
+
+
+@receiver(post_delete, sender=WorkLog)
+def worklog_deleted(sender, instance, **kwargs):
+    old = getattr(instance, '_saved_rollup', None) or instance.rollup_values()
+    rollups.log_deleted(instance)
+    hours.log_changed(task_hours(old), None)
+
+
+@receiver(post_save, sender=Task)
+def task_saved(sender, instance, created=False, raw=False, **kwargs):
+    if raw or created:
+        return
+    # Keep the denormalised project of the rollups in line with the task.
+    WorkLogRollup.objects.filter(task=instance).exclude(
+        project_id=instance.project_id
+    ).update(project_id=instance.project_id)
+
+
+@receiver(post_save, sender=WorkLog)
+@receiver(post_delete, sender=WorkLog)
+def worklog_changed(sender, instance, raw=False, **kwargs):
+    if not raw:
+        dashboard.invalidate_project(related_project_id(instance, 'task', Task))
+
+
+@receiver(post_save, sender=IPAddress)
+@receiver(post_delete, sender=IPAddress)
+def ip_address_changed(sender, instance, raw=False, **kwargs):
+    if not raw:
+        dashboard.invalidate_project(related_project_id(instance, 'pool', IPAddressPool))
+
+
+@receiver(post_save, sender=BOMInstanceItem)
+@receiver(post_delete, sender=BOMInstanceItem)
+def bom_item_changed(sender, instance, raw=False, **kwargs):
+    if not raw:
+        dashboard.invalidate_project(related_project_id(instance, 'bom_instance', BOMInstance))
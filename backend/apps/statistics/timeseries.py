@@ -0,0 +1,201 @@
+"""
+Metric time series.
+
+Raw ``Metric`` points are kept for ``settings.METRIC_RAW_RETENTION_DAYS``;
+``compact`` folds older points into hourly ``MetricRollup`` rows (count,
+sum, min, max and last value) and deletes them. ``series`` downsamples raw
+points and rollups alike to buckets of the requested interval with one
+grouped query each (plus one for the last values), so a chart gets a few
+hundred points no matter how many were recorded.
+"""
+from datetime import timedelta
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import Count, Max, Min, Sum
+from django.db.models.functions import Trunc
+from django.utils import timezone
+
+from .models import Metric, MetricRollup
+
+# Bucket widths, finest first; months are approximated for point counts.
+INTERVALS = {
+    'minute': timedelta(minutes=1),
+    'hour': timedelta(hours=1),
+    'day': timedelta(days=1),
+    'week': timedelta(weeks=1),
+    'month': timedelta(days=30),
+}
+MAX_POINTS = 2000
+BATCH_SIZE = 1000
+CENTS = Decimal('0.01')
+
+
+def bucket_count(start, end, interval):
+    return (end - start) / INTERVALS[interval]
+
+
+def choose_interval(start, end, points):
+    """Finest interval giving at most ``points`` buckets from ``start`` to ``end``."""
+    for interval in INTERVALS:
+        if bucket_count(start, end, interval) <= points:
+            return interval
+    return 'month'
+
+
+def attach_last(rows, queryset, time_field, value_field):
+    """
+    Set ``last`` on the grouped ``rows``: the value of ``queryset`` recorded
+    at each row's ``last_at`` (the newest row on ties).
+    """
+    rows = list(rows)
+    moments = sorted({row['last_at'] for row in rows})
+    latest = {}
+    for offset in range(0, len(moments), BATCH_SIZE):
+        matches = (
+            queryset.filter(**{f'{time_field}__in': moments[offset:offset + BATCH_SIZE]})
+            .order_by(time_field, 'pk')
+            .values_list('project_id', 'name', time_field, value_field)
+        )
+        for project_id, name, moment, value in matches:
+            latest[(project_id, name, moment)] = value
+    for row in rows:
+        row['last'] = latest[(row['project_id'], row['name'], row['last_at'])]
+    return rows
+
+
+def raw_buckets(points, interval):
+    """``points`` grouped per metric and bucket, with the last value of each."""
+    rows = (
+        points.annotate(bucket=Trunc('recorded_at', interval))
+        .values('project_id', 'name', 'bucket')
+        .annotate(
+            count=Count('id'),
+            total=Sum('value'),
+            min=Min('value'),
+            max=Max('value'),
+            last_at=Max('recorded_at'),
+            metric_type=Max('metric_type'),
+            unit=Max('unit'),
+        )
+        .order_by()
+    )
+    return attach_last(rows, points, 'recorded_at', 'value')
+
+
+def rollup_buckets(rollups, interval):
+    """Hourly ``rollups`` regrouped per metric and bucket of ``interval``."""
+    rows = (
+        rollups.annotate(bucket=Trunc('bucket_start', interval))
+        .values('project_id', 'name', 'bucket')
+        .annotate(
+            count=Sum('count'),
+            total=Sum('total'),
+            min=Min('min_value'),
+            max=Max('max_value'),
+            last_at=Max('last_recorded_at'),
+        )
+        .order_by()
+    )
+    return attach_last(rows, rollups, 'last_recorded_at', 'last_value')
+
+
+def merge(bucket, row):
+    """Fold the aggregates of ``row`` into ``bucket`` (same metric and bucket)."""
+    bucket['count'] += row['count']
+    bucket['total'] += Decimal(str(row['total']))
+    bucket['min'] = min(bucket['min'], row['min'])
+    bucket['max'] = max(bucket['max'], row['max'])
+    if row['last_at'] > bucket['last_at']:
+        bucket['last_at'], bucket['last'] = row['last_at'], row['last']
+
+
+def series(filters, start, end, interval):
+    """
+    Downsampled series of the metrics matching ``filters`` (lookups on
+    ``project_id``, ``name`` or ``metric_type``) recorded in ``[start, end)``,
+    one per project and metric name.
+    """
+    points = Metric.objects.filter(recorded_at__gte=start, recorded_at__lt=end, **filters)
+    rollups = MetricRollup.objects.filter(bucket_start__gte=start, bucket_start__lt=end, **filters)
+
+    buckets = {}
+    for rows in (rollup_buckets(rollups, interval), raw_buckets(points, interval)):
+        for row in rows:
+            key = (row['project_id'], row['name'], row['bucket'])
+            if key in buckets:
+                merge(buckets[key], row)
+            else:
+                buckets[key] = dict(row, total=Decimal(str(row['total'])))
+
+    result = {}
+    for (project_id, name, time), bucket in sorted(buckets.items()):
+        metric = result.setdefault((project_id, name), {
+            'project': project_id,
+            'name': name,
+            'points': [],
+        })
+        metric['points'].append({
+            'time': time,
+            'count': bucket['count'],
+            'avg': str((bucket['total'] / bucket['count']).quantize(CENTS)),
+            'min': str(Decimal(bucket['min']).quantize(CENTS)),
+            'max': str(Decimal(bucket['max']).quantize(CENTS)),
+            'last': str(Decimal(bucket['last']).quantize(CENTS)),
+        })
+    return list(result.values())
+
+
+def compact(before):
+    """
+    Fold the raw points recorded before ``before`` into hourly rollups and
+    delete them. Returns the number of points compacted.
+    """
+    with transaction.atomic():
+        points = Metric.objects.filter(recorded_at__lt=before)
+        # Only delete what was aggregated, not points inserted meanwhile.
+        last_pk = points.aggregate(last_pk=Max('pk'))['last_pk']
+        if last_pk is None:
+            return 0
+        points = points.filter(pk__lte=last_pk)
+        rows = raw_buckets(points, 'hour')
+        existing = {
+            (rollup.project_id, rollup.name, rollup.bucket_start): rollup
+            for rollup in MetricRollup.objects.select_for_update().filter(
+                bucket_start__gte=min(row['bucket'] for row in rows),
+                bucket_start__lte=max(row['bucket'] for row in rows),
+            )
+        }
+
+        created, updated = [], []
+        for row in rows:
+            rollup = existing.get((row['project_id'], row['name'], row['bucket']))
+            if rollup is None:
+                created.append(MetricRollup(
+                    project_id=row['project_id'], name=row['name'],
+                    metric_type=row['metric_type'], unit=row['unit'],
+                    bucket_start=row['bucket'], count=row['count'], total=row['total'],
+                    min_value=row['min'], max_value=row['max'],
+                    last_value=row['last'], last_recorded_at=row['last_at'],
+                ))
+                continue
+            # Points recorded late for an already compacted hour.
+            bucket = {
+                'count': rollup.count, 'total': rollup.total,
+                'min': rollup.min_value, 'max': rollup.max_value,
+                'last': rollup.last_value, 'last_at': rollup.last_recorded_at,
+            }
+            merge(bucket, row)
+            rollup.count, rollup.total = bucket['count'], bucket['total']
+            rollup.min_value, rollup.max_value = bucket['min'], bucket['max']
+            rollup.last_value, rollup.last_recorded_at = bucket['last'], bucket['last_at']
+            rollup.updated_at = timezone.now()
+            updated.append(rollup)
+
+        MetricRollup.objects.bulk_create(created, batch_size=BATCH_SIZE)
+        MetricRollup.objects.bulk_update(updated, [
+            'count', 'total', 'min_value', 'max_value', 'last_value', 'last_recorded_at', 'updated_at',
+        ], batch_size=BATCH_SIZE)
+        compacted = sum(row['count'] for row in rows)
+        points.delete()
+    return compacted
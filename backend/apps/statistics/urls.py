@@ -1,10 +1,12 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from .views import WorkLogViewSet, MetricViewSet
+from .views import WorkLogViewSet, MetricViewSet, DashboardViewSet, TimesheetViewSet
 
 router = DefaultRouter()
 router.register(r'worklogs', WorkLogViewSet, basename='worklog')
 router.register(r'metrics', MetricViewSet, basename='metric')
+router.register(r'dashboard', DashboardViewSet, basename='dashboard')
+router.register(r'timesheets', TimesheetViewSet, basename='timesheet')
 
 urlpatterns = [
     path('', include(router.urls)),
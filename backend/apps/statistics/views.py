@@ -1,10 +1,23 @@
+import datetime
+from decimal import Decimal
+
+from django.db.models import F, Q, Sum
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
 from rest_framework import viewsets, filters
+from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
 from rest_framework.permissions import IsAuthenticated
-from .models import WorkLog, Metric
+from rest_framework.response import Response
+from apps.core.mixins import ConditionalGetMixin, ExportMixin, FetchPlanMixin
+from apps.projects.models import Project
+from . import rollups, timeseries
+from .dashboard import project_dashboard
+from .models import WorkLog, WorkLogRollup, Metric
 from .serializers import WorkLogSerializer, MetricSerializer
 
 
-class WorkLogViewSet(viewsets.ModelViewSet):
+class WorkLogViewSet(ConditionalGetMixin, ExportMixin, FetchPlanMixin, viewsets.ModelViewSet):
     """ViewSet for work log management."""
     queryset = WorkLog.objects.all()
     serializer_class = WorkLogSerializer
@@ -12,6 +25,17 @@ class WorkLogViewSet(viewsets.ModelViewSet):
     filter_backends = [filters.SearchFilter, filters.OrderingFilter]
     search_fields = ['description', 'task__title', 'user__username']
     ordering_fields = ['start_time', 'end_time', 'duration_hours', 'created_at']
+    fetch_plans = {
+        'default': {'fields': {
+            'task_title': {'select_related': ['task']},
+            'user_name': {'select_related': ['user']},
+        }},
+    }
+    export_fields = [
+        'id', 'task__project__code', 'task_id', 'task__title', 'user__username',
+        'start_time', 'end_time', 'duration_hours', 'description',
+        'created_at', 'updated_at',
+    ]
     
     def get_queryset(self):
         queryset = super().get_queryset()
@@ -35,7 +59,7 @@ class WorkLogViewSet(viewsets.ModelViewSet):
         serializer.save(user=self.request.user)
 
 
-class MetricViewSet(viewsets.ModelViewSet):
+class MetricViewSet(ConditionalGetMixin, FetchPlanMixin, viewsets.ModelViewSet):
     """ViewSet for metric management."""
     queryset = Metric.objects.all()
     serializer_class = MetricSerializer
@@ -43,6 +67,12 @@ class MetricViewSet(viewsets.ModelViewSet):
     filter_backends = [filters.SearchFilter, filters.OrderingFilter]
     search_fields = ['name', 'description']
     ordering_fields = ['name', 'metric_type', 'value', 'recorded_at']
+    fetch_plans = {
+        'default': {'fields': {
+            'project_name': {'select_related': ['project']},
+            'recorded_by_name': {'select_related': ['recorded_by']},
+        }},
+    }
     
     def get_queryset(self):
         queryset = super().get_queryset()
@@ -58,3 +88,182 @@ class MetricViewSet(viewsets.ModelViewSet):
     
     def perform_create(self, serializer):
         serializer.save(recorded_by=self.request.user)
+    
+    def parse_moment(self, name, default):
+        value = self.request.query_params.get(name)
+        if not value:
+            return default
+        try:
+            moment = parse_datetime(value) or datetime.datetime.fromisoformat(value)
+        except ValueError:
+            raise ValidationError({name: 'Expected an ISO 8601 date or datetime.'})
+        if timezone.is_naive(moment):
+            moment = timezone.make_aware(moment)
+        return moment
+    
+    @action(detail=False, methods=['get'])
+    def series(self, request):
+        """
+        Metric values downsampled server-side: count, avg, min, max and last
+        value per bucket, one series per project and metric name.
+        
+        ``?start=`` / ``?end=`` (default: the last 30 days), ``?interval=``
+        (minute, hour, day, week or month) or ``?points=`` (default 300) to
+        pick the finest interval with at most that many buckets, and the
+        ``?project=``, ``?name=`` and ``?metric_type=`` filters.
+        """
+        params = request.query_params
+        end = self.parse_moment('end', timezone.now())
+        start = self.parse_moment('start', end - datetime.timedelta(days=30))
+        if start >= end:
+            raise ValidationError({'start': 'Must be before end.'})
+        
+        interval = params.get('interval')
+        if interval:
+            if interval not in timeseries.INTERVALS:
+                raise ValidationError({'interval': f'Expected one of: {", ".join(timeseries.INTERVALS)}.'})
+            if timeseries.bucket_count(start, end, interval) > timeseries.MAX_POINTS:
+                raise ValidationError({'interval': 'Too many buckets; choose a coarser interval.'})
+        else:
+            try:
+                points = int(params.get('points', 300))
+            except ValueError:
+                raise ValidationError({'points': 'Expected an integer.'})
+            points = min(max(points, 1), timeseries.MAX_POINTS)
+            interval = timeseries.choose_interval(start, end, points)
+        
+        filters = {}
+        if params.get('project'):
+            try:
+                filters['project_id'] = int(params['project'])
+            except ValueError:
+                raise ValidationError({'project': 'Expected an integer id.'})
+        for param in ('name', 'metric_type'):
+            if params.get(param):
+                filters[param] = params[param]
+        
+        return Response({
+            'start': start,
+            'end': end,
+            'interval': interval,
+            'results': timeseries.series(filters, start, end, interval),
+        })
+
+
+class DashboardViewSet(viewsets.ViewSet):
+    """
+    Per-project dashboard summaries for the current user.
+    
+    Optionally limited with ``?project=<id>,<id>``.
+    """
+    permission_classes = [IsAuthenticated]
+    
+    def list(self, request):
+        projects = request.query_params.get('project', '')
+        try:
+            project_ids = [int(value) for value in projects.split(',') if value.strip()]
+        except ValueError:
+            raise ValidationError({'project': 'Expected comma separated project ids.'})
+        
+        summaries = project_dashboard(request.user, project_ids)
+        return Response({
+            'generated_at': timezone.now(),
+            'totals': {
+                'projects': len(summaries),
+                'tasks': sum(s['tasks']['total'] for s in summaries),
+                'open_tasks': sum(s['tasks']['open'] for s in summaries),
+                'overdue_tasks': sum(s['tasks']['overdue'] for s in summaries),
+                'devices': sum(s['devices']['total'] for s in summaries),
+                'planned_cost': str(sum(Decimal(s['bom']['planned_cost']) for s in summaries)),
+                'hours': str(sum(Decimal(s['hours']['total']) for s in summaries)),
+            },
+            'projects': summaries,
+        })
+
+
+class TimesheetViewSet(viewsets.ViewSet):
+    """
+    Hours per day, week or month read from the work log rollups.
+    
+    ``?period=day|week|month`` (default ``month``), ``?start=`` and ``?end=``
+    dates (default: the current year), ``?group_by=user|project|task``
+    (default ``user``) and optional ``?user=``, ``?project=``, ``?task=``.
+    """
+    permission_classes = [IsAuthenticated]
+    
+    # Grouping columns and the labels returned with them.
+    GROUPS = {
+        'user': (['user_id'], {
+            'username': F('user__username'),
+            'first_name': F('user__first_name'),
+            'last_name': F('user__last_name'),
+        }),
+        'project': (['project_id'], {
+            'project_name': F('project__name'),
+            'project_code': F('project__code'),
+        }),
+        'task': (['task_id', 'project_id'], {
+            'task_title': F('task__title'),
+        }),
+    }
+    
+    def parse_date(self, name, default):
+        value = self.request.query_params.get(name)
+        if not value:
+            return default
+        try:
+            return datetime.date.fromisoformat(value)
+        except ValueError:
+            raise ValidationError({name: 'Expected a date in YYYY-MM-DD format.'})
+    
+    def parse_id(self, name):
+        value = self.request.query_params.get(name)
+        if not value:
+            return None
+        try:
+            return int(value)
+        except ValueError:
+            raise ValidationError({name: 'Expected an integer id.'})
+    
+    def list(self, request):
+        params = request.query_params
+        period = params.get('period', 'month')
+        group_by = params.get('group_by', 'user')
+        if period not in rollups.PERIODS:
+            raise ValidationError({'period': f'Expected one of: {", ".join(rollups.PERIODS)}.'})
+        if group_by not in self.GROUPS:
+            raise ValidationError({'group_by': f'Expected one of: {", ".join(self.GROUPS)}.'})
+        today = timezone.localdate()
+        start = self.parse_date('start', today.replace(month=1, day=1))
+        end = self.parse_date('end', today.replace(month=12, day=31))
+        
+        queryset = WorkLogRollup.objects.filter(
+            period=period,
+            period_start__gte=rollups.period_start(period, start),
+            period_start__lte=end,
+        )
+        if not (request.user.is_staff or request.user.is_superuser):
+            queryset = queryset.filter(
+                Q(user=request.user) | Q(project__in=Project.objects.visible_to(request.user))
+            )
+        for name in ('user', 'project', 'task'):
+            value = self.parse_id(name)
+            if value is not None:
+                queryset = queryset.filter(**{f'{name}_id': value})
+        
+        columns, labels = self.GROUPS[group_by]
+        rows = (
+            queryset.values('period_start', *columns, **labels)
+            .annotate(hours=Sum('total_hours'), entries=Sum('entries'))
+            .order_by('period_start', *columns)
+        )
+        return Response({
+            'period': period,
+            'start': start,
+            'end': end,
+            'group_by': group_by,
+            'results': [
+                dict(row, hours=str(Decimal(row['hours']).quantize(Decimal('0.01'))))
+                for row in rows
+            ],
+        })
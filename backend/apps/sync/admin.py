@@ -0,0 +1,20 @@
+from django.contrib import admin
+from .models import DeletionLog, SyncMutation
+
+
+@admin.register(DeletionLog)
+class DeletionLogAdmin(admin.ModelAdmin):
+    list_display = ['type', 'object_id', 'project_id', 'deleted_at']
+    list_filter = ['type', 'deleted_at']
+    search_fields = ['object_id']
+    ordering = ['-deleted_at']
+    readonly_fields = ['type', 'object_id', 'project_id', 'deleted_at']
+
+
+@admin.register(SyncMutation)
+class SyncMutationAdmin(admin.ModelAdmin):
+    list_display = ['client_id', 'user', 'created_at']
+    list_filter = ['created_at']
+    search_fields = ['client_id', 'user__username']
+    ordering = ['-created_at']
+    readonly_fields = ['user', 'client_id', 'result', 'created_at']
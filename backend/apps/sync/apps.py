@@ -0,0 +1,10 @@
+from django.apps import AppConfig
+
+
+class SyncConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'apps.sync'
+    verbose_name = 'Offline Sync'
+    
+    def ready(self):
+        import apps.sync.signals  # noqa
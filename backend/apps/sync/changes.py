@@ -0,0 +1,368 @@
+"""
+Delta sync for offline clients.
+
+``pull`` returns the rows of the ``SYNCED`` types created or changed in the
+user's projects since a cursor, plus the ids deleted since then (from the
+``DeletionLog`` tombstones written by the signal handlers). The cursor
+holds one ``(updated_at, id)`` keyset position per type, so each type
+costs one query range-scanning the ``(project, updated_at, id)`` or
+``(updated_at, id)`` index, and the projects the client already has as id
+ranges. Projects that become visible are sent from the beginning by a
+second, catch-up position per type and join the others once it reaches
+the end. Rows are sent column-wise (``fields`` once, then value lists) in
+batches of ``limit`` per type; clients pull again while ``has_more`` is
+set.
+
+Only changes older than ``SYNC_SETTLE_SECONDS`` are sent: ``updated_at``
+is set when a row is saved, not when its transaction commits, and the
+margin keeps a slow commit from landing behind a cursor that has already
+moved past it.
+"""
+import base64
+import binascii
+import datetime
+import json
+
+from django.conf import settings
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from rest_framework import status
+from rest_framework.exceptions import APIException, ValidationError
+
+from apps.core.pagination import encode_value, keyset_filter
+from apps.devices.models import Device
+from apps.devices.serializers import DeviceSerializer
+from apps.documents.models import Photo
+from apps.documents.serializers import PhotoSerializer
+from apps.installation.models import Checklist, ChecklistItem
+from apps.installation.serializers import ChecklistItemSerializer, ChecklistSerializer
+from apps.projects.models import Project
+from apps.statistics.models import WorkLog
+from apps.statistics.serializers import WorkLogSerializer
+from apps.tasks.models import Task
+from apps.tasks.serializers import TaskSerializer
+
+from .models import DeletionLog
+
+DEFAULT_LIMIT = 500
+MAX_LIMIT = 2000
+KEYS = [('updated_at', False), ('id', False)]
+DELETION_KEYS = [('deleted_at', False), ('id', False)]
+
+
+def item_completion(serializer, user):
+    """Completion fields set the way ``toggle_complete`` sets them."""
+    completed = serializer.validated_data.get('is_completed')
+    instance = serializer.instance
+    if completed is None or (instance is not None and instance.is_completed == completed):
+        return {}
+    if completed:
+        return {
+            'completed_by': user,
+            'completed_at': serializer.validated_data.get('completed_at') or timezone.now(),
+        }
+    return {'completed_by': None, 'completed_at': None}
+
+
+# Sync type -> model, columns sent to clients, project lookup, serializer
+# validating mutations, field set to the user on create, stored file columns
+# sent as URLs, an optional hook returning extra ``save()`` arguments and
+# whether clients may create rows of the type.
+SYNCED = {
+    'task': {
+        'model': Task,
+        'fields': [
+            'id', 'project_id', 'parent_id', 'title', 'description', 'task_type', 'status',
+            'priority', 'assigned_to_id', 'due_date', 'estimated_hours', 'actual_hours',
+            'tags', 'completed_at', 'created_at', 'updated_at',
+        ],
+        'project': 'project_id',
+        'serializer': TaskSerializer,
+        'owner': 'created_by',
+        'files': [],
+        'save_kwargs': None,
+        'create': True,
+    },
+    'checklist': {
+        'model': Checklist,
+        'fields': [
+            'id', 'task_id', 'name', 'description', 'status', 'assigned_to_id', 'due_date',
+            'completed_at', 'created_at', 'updated_at',
+        ],
+        'project': 'task__project_id',
+        'serializer': ChecklistSerializer,
+        'owner': 'created_by',
+        'files': [],
+        'save_kwargs': None,
+        'create': True,
+    },
+    'checklist_item': {
+        'model': ChecklistItem,
+        'fields': [
+            'id', 'checklist_id', 'title', 'description', 'order', 'is_completed', 'is_required',
+            'completed_by_id', 'completed_at', 'notes', 'created_at', 'updated_at',
+        ],
+        'project': 'checklist__task__project_id',
+        'serializer': ChecklistItemSerializer,
+        'owner': None,
+        'files': [],
+        'save_kwargs': item_completion,
+        'create': True,
+    },
+    'photo': {
+        'model': Photo,
+        'fields': [
+            'id', 'project_id', 'task_id', 'title', 'description', 'image', 'thumbnail', 'medium',
+            'derivatives_status', 'location', 'gps_coordinates', 'taken_at', 'tags',
+            'created_at', 'updated_at',
+        ],
+        'project': 'project_id',
+        'serializer': PhotoSerializer,
+        # Photos are created by uploads (see apps.documents.uploads).
+        'owner': None,
+        'files': ['image', 'thumbnail', 'medium'],
+        'save_kwargs': None,
+        'create': False,
+    },
+    'device': {
+        'model': Device,
+        'fields': [
+            'id', 'project_id', 'name', 'device_type', 'manufacturer', 'model', 'serial_number',
+            'status', 'location', 'mac_address', 'firmware_version', 'configuration',
+            'installation_date', 'notes', 'created_at', 'updated_at',
+        ],
+        'project': 'project_id',
+        'serializer': DeviceSerializer,
+        'owner': 'created_by',
+        'files': [],
+        'save_kwargs': None,
+        'create': True,
+    },
+    'work_log': {
+        'model': WorkLog,
+        'fields': [
+            'id', 'task_id', 'user_id', 'description', 'start_time', 'end_time', 'duration_hours',
+            'created_at', 'updated_at',
+        ],
+        'project': 'task__project_id',
+        'serializer': WorkLogSerializer,
+        'owner': 'user',
+        'files': [],
+        'save_kwargs': None,
+        'create': True,
+    },
+}
+
+
+class CursorExpired(APIException):
+    status_code = status.HTTP_410_GONE
+    default_detail = 'Cursor is older than the deletion log; discard local data and sync from scratch.'
+    default_code = 'cursor_expired'
+
+
+def spec_for(model):
+    for kind, spec in SYNCED.items():
+        if spec['model'] is model:
+            return kind, spec
+    return None, None
+
+
+def scope(spec, user):
+    """Rows of ``spec`` in the projects ``user`` may see."""
+    visible = Project.objects.visible_to(user).values('pk')
+    return spec['model'].objects.filter(**{f"{spec['project']}__in": visible})
+
+
+def encode_row(spec, values, request):
+    row = [encode_value(value) for value in values]
+    for field in spec['files']:
+        index = spec['fields'].index(field)
+        if row[index]:
+            url = spec['model']._meta.get_field(field).storage.url(row[index])
+            row[index] = request.build_absolute_uri(url) if request is not None else url
+        else:
+            row[index] = None
+    return row
+
+
+def current_row(spec, pk, request):
+    """The synced columns of one row as a dict, or ``None`` if it is gone."""
+    values = spec['model'].objects.filter(pk=pk).values_list(*spec['fields']).first()
+    if values is None:
+        return None
+    return dict(zip(spec['fields'], encode_row(spec, values, request)))
+
+
+def encode_ids(ids):
+    """
+    Sorted project ids as ranges, e.g. ``"1-40,42"``. A range may span the
+    ids of deleted projects, which are never reused, so all the projects of
+    a staff user stay a short string.
+    """
+    if not ids:
+        return ''
+    included = set(ids)
+    existing = Project.objects.filter(pk__range=(ids[0], ids[-1])).order_by('pk').values_list('pk', flat=True)
+    ranges = []
+    extends = False
+    for pk in existing:
+        if pk in included:
+            if extends:
+                ranges[-1][1] = pk
+            else:
+                ranges.append([pk, pk])
+        extends = pk in included
+    return ','.join(str(low) if low == high else f'{low}-{high}' for low, high in ranges)
+
+
+def decode_ids(text):
+    ranges = []
+    for part in filter(None, text.split(',')):
+        low, _, high = part.partition('-')
+        ranges.append((int(low), int(high or low)))
+    return ranges
+
+
+def in_ranges(pk, ranges):
+    return any(low <= pk <= high for low, high in ranges)
+
+
+def encode_cursor(horizon, positions, known, catching, catch_positions):
+    payload = {
+        't': encode_value(horizon),
+        'p': positions,
+        'k': encode_ids(known),
+        'c': encode_ids(catching),
+        'f': catch_positions,
+    }
+    return base64.urlsafe_b64encode(json.dumps(payload, separators=(',', ':')).encode()).decode()
+
+
+def decode_positions(positions):
+    if not isinstance(positions, dict):
+        raise ValueError
+    decoded = {}
+    for kind, position in positions.items():
+        # Checked here: a bad value reaching the query is a server error.
+        timestamp, pk = position
+        parsed = parse_datetime(timestamp)
+        if parsed is None:
+            raise ValueError
+        decoded[kind] = [encode_value(parsed), int(pk)]
+    return decoded
+
+
+def decode_cursor(token):
+    """
+    ``(issued, positions, known, catching, catch_positions)`` of a cursor,
+    with the project ids as ranges; ``None`` for a first sync.
+    """
+    if not token:
+        return None
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(token.encode()))
+        issued = parse_datetime(payload['t'])
+        if issued is None:
+            raise ValueError
+        return (
+            issued,
+            decode_positions(payload['p']),
+            decode_ids(payload['k']),
+            decode_ids(payload['c']),
+            decode_positions(payload['f']),
+        )
+    except (binascii.Error, TypeError, KeyError, ValueError, AttributeError):
+        raise ValidationError({'cursor': 'Invalid cursor.'})
+
+
+def key_of(spec, row):
+    """Keyset position of a ``values_list`` row of ``spec``."""
+    return [encode_value(row[spec['fields'].index('updated_at')]), row[spec['fields'].index('id')]]
+
+
+def changed_rows(rows, fields, keys, position, horizon, limit):
+    """
+    Up to ``limit`` ``values_list`` rows of ``rows`` after the keyset
+    ``position`` and before ``horizon``, and whether more follow.
+    """
+    (timestamp, _), _ = keys
+    rows = rows.filter(**{f'{timestamp}__lt': horizon})
+    if position is not None:
+        rows = rows.filter(keyset_filter(keys, position))
+    rows = list(rows.order_by(*(name for name, _ in keys)).values_list(*fields)[:limit + 1])
+    return rows[:limit], len(rows) > limit
+
+
+def pull(request, token=None, limit=DEFAULT_LIMIT):
+    """
+    Changes in the projects visible to the requesting user since the
+    cursor ``token``, as ``{cursor, has_more, projects, changes, deleted}``.
+    """
+    now = timezone.now()
+    cursor = decode_cursor(token)
+    if cursor is not None and cursor[0] < now - datetime.timedelta(days=settings.SYNC_TOMBSTONE_DAYS):
+        raise CursorExpired()
+    horizon = now - datetime.timedelta(seconds=settings.SYNC_SETTLE_SECONDS)
+    end = [encode_value(horizon), 0]
+    _, positions, known, catching, catch_positions = cursor or (None, {}, [], [], {})
+
+    projects = list(Project.objects.visible_to(request.user).order_by('pk').values_list('pk', flat=True))
+    known = [pk for pk in projects if in_ranges(pk, known)]
+    catching = [pk for pk in projects if in_ranges(pk, catching)]
+    unknown = sorted(set(projects) - set(known))
+    if not catching:
+        # Projects visible since the last pull; ones turning up while others
+        # catch up wait for the next round.
+        catching, catch_positions = unknown, {}
+
+    has_more = behind = False
+    changes = {}
+    for kind, spec in SYNCED.items():
+        fields = spec['fields']
+        rows = scope(spec, request.user)
+        if unknown:
+            rows = rows.exclude(**{f"{spec['project']}__in": unknown})
+        sent, more = changed_rows(rows, fields, KEYS, positions.get(kind), horizon, limit) if known else ([], False)
+        # Every row before the horizon was sent unless the batch filled up.
+        positions[kind] = key_of(spec, sent[-1]) if more else end
+        has_more |= more
+
+        if catching:
+            budget = limit - len(sent)
+            rows = spec['model'].objects.filter(**{f"{spec['project']}__in": catching})
+            caught, more = changed_rows(rows, fields, KEYS, catch_positions.get(kind), horizon, budget) \
+                if budget else ([], True)
+            if caught:
+                catch_positions[kind] = key_of(spec, caught[-1])
+            sent += caught
+            has_more |= more
+            behind |= more
+        if sent:
+            changes[kind] = {
+                'fields': spec['fields'],
+                'rows': [encode_row(spec, row, request) for row in sent],
+            }
+    if catching and not behind:
+        # The catch-up reached the horizon the other projects are at.
+        known, catching, catch_positions = sorted(known + catching), [], {}
+    # Projects waiting for the next catch-up.
+    has_more |= len(known) + len(catching) < len(projects)
+
+    tombstones, more = changed_rows(
+        DeletionLog.objects.filter(project_id__in=Project.objects.visible_to(request.user).values('pk')),
+        ['type', 'object_id', 'deleted_at', 'id'], DELETION_KEYS,
+        positions.get('deleted', end), horizon, limit,
+    )
+    positions['deleted'] = [encode_value(tombstones[-1][2]), tombstones[-1][3]] if more else end
+    has_more |= more
+    deleted = {}
+    for kind, object_id, *_ in tombstones:
+        deleted.setdefault(kind, []).append(object_id)
+
+    return {
+        'cursor': encode_cursor(horizon, positions, known, catching, catch_positions),
+        'has_more': has_more,
+        'projects': projects,
+        'changes': changes,
+        'deleted': deleted,
+    }
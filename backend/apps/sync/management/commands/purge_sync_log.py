@@ -0,0 +1,29 @@
+import datetime
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from apps.sync.models import DeletionLog, SyncMutation
+
+
+class Command(BaseCommand):
+    help = 'Delete sync tombstones and recorded mutations after the retention period'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days', type=int, default=settings.SYNC_TOMBSTONE_DAYS,
+            help='Keep entries from the last N days (default: SYNC_TOMBSTONE_DAYS)',
+        )
+
+    def handle(self, *args, **options):
+        if options['days'] < 0:
+            raise CommandError('--days must not be negative.')
+        cutoff = timezone.now() - datetime.timedelta(days=options['days'])
+
+        # Clients with older cursors get 410 and sync from scratch.
+        tombstones, _ = DeletionLog.objects.filter(deleted_at__lt=cutoff).delete()
+        mutations, _ = SyncMutation.objects.filter(created_at__lt=cutoff).delete()
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Deleted {tombstones} tombstone(s) and {mutations} recorded mutation(s).'
+        ))
@@ -0,0 +1,55 @@
+from django.db import models
+from django.conf import settings
+
+
+class DeletionLog(models.Model):
+    """Tombstone of a deleted row, telling offline clients to drop their copy."""
+    
+    type = models.CharField(max_length=20)  # sync type, e.g. 'task'
+    object_id = models.BigIntegerField()
+    # Plain column: tombstones must outlive the project when it cascades.
+    project_id = models.BigIntegerField(null=True, blank=True)
+    deleted_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        ordering = ['-deleted_at']
+        verbose_name = 'Deletion Log Entry'
+        verbose_name_plural = 'Deletion Log'
+        indexes = [
+            models.Index(fields=['project_id', 'deleted_at', 'id']),
+            models.Index(fields=['deleted_at']),
+        ]
+    
+    def __str__(self):
+        return f"{self.type} #{self.object_id} deleted {self.deleted_at:%Y-%m-%d %H:%M}"
+
+
+class SyncMutation(models.Model):
+    """
+    Result of an applied offline mutation, keyed by its client id so a
+    batch resent after a lost response is not applied twice.
+    """
+    
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='sync_mutations'
+    )
+    client_id = models.CharField(max_length=64)
+    result = models.JSONField(default=dict)
+    
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        ordering = ['-created_at']
+        verbose_name = 'Sync Mutation'
+        verbose_name_plural = 'Sync Mutations'
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'client_id'], name='sync_syncmutation_unique_client_id'),
+        ]
+        indexes = [
+            models.Index(fields=['created_at']),
+        ]
+    
+    def __str__(self):
+        return f"{self.client_id} ({self.result.get('status')})"
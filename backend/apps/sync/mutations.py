@@ -0,0 +1,120 @@
+"""
+Batched offline mutations.
+
+Each mutation of a ``push`` batch is validated by the serializer of its
+type and applied in its own transaction, so one rejected change does not
+hold back the rest; results come back in batch order. Updates and deletes
+carrying ``base_updated_at`` (the ``updated_at`` the client last saw) are
+refused as conflicts when the row has changed since, with the current row
+in the result for the client to merge. Data values ``"@<ref>"`` resolve to
+the id of a row created earlier in the batch under that ``ref``, so an
+offline task and its work logs go up together. Applied mutations are
+recorded by client ``id``; a batch resent after a lost response gets the
+recorded results instead of being applied again.
+"""
+from django.db import IntegrityError, transaction
+
+from .changes import SYNCED, current_row, scope
+from .models import SyncMutation
+
+
+class Rejected(Exception):
+    """A mutation that cannot be applied; ``result`` is its outcome."""
+
+    def __init__(self, status, **result):
+        super().__init__(status)
+        self.result = {'status': status, **result}
+
+
+def resolve(value, refs):
+    if isinstance(value, str) and value.startswith('@'):
+        if value[1:] not in refs:
+            raise Rejected('invalid', errors={'detail': [f'Unknown reference "{value}".']})
+        return refs[value[1:]]
+    return value
+
+
+def apply(request, mutation, refs):
+    """Apply one validated mutation and return its result fields."""
+    spec = SYNCED[mutation['type']]
+    user = request.user
+    data = {key: resolve(value, refs) for key, value in mutation['data'].items()}
+    context = {'request': request}
+    rows = scope(spec, user)
+
+    if mutation['op'] == 'create':
+        if spec['owner']:
+            # Satisfies serializers requiring the field; save() sets it anyway.
+            data.setdefault(spec['owner'], user.pk)
+        serializer = spec['serializer'](data=data, context=context)
+        if not serializer.is_valid():
+            raise Rejected('invalid', errors=serializer.errors)
+        kwargs = {spec['owner']: user} if spec['owner'] else {}
+        if spec['save_kwargs']:
+            kwargs.update(spec['save_kwargs'](serializer, user))
+        instance = serializer.save(**kwargs)
+        if not rows.filter(pk=instance.pk).exists():
+            raise Rejected('forbidden')
+        return {'pk': instance.pk, 'row': current_row(spec, instance.pk, request)}
+
+    pk = resolve(mutation['pk'], refs)
+    instance = rows.select_for_update(of=('self',)).filter(pk=pk).first()
+    if instance is None:
+        if mutation['op'] == 'delete' and not spec['model'].objects.filter(pk=pk).exists():
+            # Already gone: the outcome the client asked for.
+            return {'pk': pk}
+        raise Rejected('not_found', pk=pk)
+    base = mutation.get('base_updated_at')
+    if base is not None and instance.updated_at != base:
+        raise Rejected('conflict', pk=pk, current=current_row(spec, pk, request))
+
+    if mutation['op'] == 'delete':
+        instance.delete()
+        return {'pk': pk}
+    serializer = spec['serializer'](instance, data=data, partial=True, context=context)
+    if not serializer.is_valid():
+        raise Rejected('invalid', pk=pk, errors=serializer.errors)
+    kwargs = spec['save_kwargs'](serializer, user) if spec['save_kwargs'] else {}
+    serializer.save(**kwargs)
+    if not rows.filter(pk=pk).exists():
+        # Moved into a project the user cannot see.
+        raise Rejected('forbidden', pk=pk)
+    return {'pk': pk, 'row': current_row(spec, pk, request)}
+
+
+def recorded_result(user, client_id):
+    return SyncMutation.objects.filter(user=user, client_id=client_id).values_list('result', flat=True).first()
+
+
+def push(request, mutations):
+    """Apply a batch of validated mutations in order; returns one result each."""
+    user = request.user
+    recorded = dict(
+        SyncMutation.objects.filter(
+            user=user, client_id__in=[mutation['id'] for mutation in mutations]
+        ).values_list('client_id', 'result')
+    )
+    refs = {}
+    results = []
+    for mutation in mutations:
+        result = recorded.get(mutation['id'])
+        if result is None:
+            try:
+                with transaction.atomic():
+                    result = {'id': mutation['id'], 'status': 'applied', **apply(request, mutation, refs)}
+                    SyncMutation.objects.create(user=user, client_id=mutation['id'], result=result)
+            except Rejected as rejected:
+                result = {'id': mutation['id'], **rejected.result}
+            except IntegrityError:
+                # A concurrent resend of the batch recorded it first, or the
+                # row collides with one saved since validation.
+                result = recorded_result(user, mutation['id']) or {
+                    'id': mutation['id'],
+                    'status': 'invalid',
+                    'errors': {'detail': ['The change conflicts with existing data.']},
+                }
+            recorded[mutation['id']] = result
+        if mutation['op'] == 'create' and mutation.get('ref') and result['status'] == 'applied':
+            refs[mutation['ref']] = result['pk']
+        results.append(result)
+    return results
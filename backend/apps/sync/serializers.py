@@ -0,0 +1,43 @@
+import re
+
+from rest_framework import serializers
+
+from .changes import DEFAULT_LIMIT, MAX_LIMIT, SYNCED
+
+MAX_MUTATIONS = 200
+REFERENCE = re.compile(r'^@\w{1,64}$')
+
+
+class ChangesQuerySerializer(serializers.Serializer):
+    cursor = serializers.CharField(required=False, allow_blank=True)
+    limit = serializers.IntegerField(required=False, min_value=1, max_value=MAX_LIMIT, default=DEFAULT_LIMIT)
+
+
+class MutationSerializer(serializers.Serializer):
+    id = serializers.CharField(max_length=64)
+    type = serializers.ChoiceField(choices=list(SYNCED))
+    op = serializers.ChoiceField(choices=['create', 'update', 'delete'])
+    # Row id, or "@<ref>" of a row created earlier in the batch.
+    pk = serializers.CharField(required=False)
+    ref = serializers.RegexField(r'^\w{1,64}$', required=False)
+    base_updated_at = serializers.DateTimeField(required=False, allow_null=True)
+    data = serializers.DictField(required=False, default=dict)
+    
+    def validate_pk(self, value):
+        if value.isdigit():
+            return int(value)
+        if REFERENCE.match(value):
+            return value
+        raise serializers.ValidationError('Expected a row id or "@<ref>".')
+    
+    def validate(self, attrs):
+        if attrs['op'] == 'create':
+            if not SYNCED[attrs['type']]['create']:
+                raise serializers.ValidationError({'op': f'{attrs["type"]} rows cannot be created through sync.'})
+        elif 'pk' not in attrs:
+            raise serializers.ValidationError({'pk': f'Required for {attrs["op"]}.'})
+        return attrs
+
+
+class MutationBatchSerializer(serializers.Serializer):
+    mutations = MutationSerializer(many=True, allow_empty=False, max_length=MAX_MUTATIONS)
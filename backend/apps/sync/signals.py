@@ -0,0 +1,38 @@
+"""
+Signal handlers writing a ``DeletionLog`` tombstone for every deleted row
+offline clients sync. Cascades delete children before their parents, so
+the project of a child is still reachable when its handler runs.
+"""
+from django.db.models.signals import post_delete
+from django.dispatch import receiver
+
+from apps.devices.models import Device
+from apps.documents.models import Photo
+from apps.installation.models import Checklist, ChecklistItem
+from apps.statistics.models import WorkLog
+from apps.statistics.signals import related_project_id
+from apps.tasks.models import Task
+from .changes import spec_for
+from .models import DeletionLog
+
+
+def deleted_project_id(instance):
+    if isinstance(instance, (Task, Photo, Device)):
+        return instance.project_id
+    if isinstance(instance, (Checklist, WorkLog)):
+        return related_project_id(instance, 'task', Task)
+    return (
+        Checklist.objects.filter(pk=instance.checklist_id)
+        .values_list('task__project_id', flat=True).first()
+    )
+
+
+@receiver(post_delete, sender=Task)
+@receiver(post_delete, sender=Checklist)
+@receiver(post_delete, sender=ChecklistItem)
+@receiver(post_delete, sender=Photo)
+@receiver(post_delete, sender=Device)
+@receiver(post_delete, sender=WorkLog)
+def record_deletion(sender, instance, **kwargs):
+    kind, _ = spec_for(sender)
+    DeletionLog.objects.create(type=kind, object_id=instance.pk, project_id=deleted_project_id(instance))
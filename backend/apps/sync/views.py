@@ -0,0 +1,27 @@
+from rest_framework import viewsets
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+
+from . import changes, mutations
+from .serializers import ChangesQuerySerializer, MutationBatchSerializer
+
+
+class SyncViewSet(viewsets.ViewSet):
+    """
+    Delta sync for offline clients: ``GET`` returns what changed in the
+    user's projects since a cursor (see ``apps.sync.changes``), ``POST``
+    applies a batch of offline mutations (see ``apps.sync.mutations``).
+    """
+    permission_classes = [IsAuthenticated]
+    
+    def list(self, request):
+        params = ChangesQuerySerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        return Response(changes.pull(
+            request, params.validated_data.get('cursor'), params.validated_data['limit']
+        ))
+    
+    def create(self, request):
+        batch = MutationBatchSerializer(data=request.data)
+        batch.is_valid(raise_exception=True)
+        return Response({'results': mutations.push(request, batch.validated_data['mutations'])})
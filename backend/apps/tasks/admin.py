@@ -19,6 +19,9 @@ class TaskAdmin(admin.ModelAdmin):
         ('Time Tracking', {
             'fields': ('due_date', 'estimated_hours', 'actual_hours', 'completed_at')
         }),
+        ('Subtree Hours', {
+            'fields': ('subtree_estimated_hours', 'subtree_actual_hours')
+        }),
         ('Additional', {
             'fields': ('tags', 'attachments')
         }),
@@ -27,4 +30,7 @@ class TaskAdmin(admin.ModelAdmin):
         }),
     )
     
-    readonly_fields = ['created_at', 'updated_at']
+    readonly_fields = [
+        'actual_hours', 'subtree_estimated_hours', 'subtree_actual_hours',
+        'created_at', 'updated_at'
+    ]
@@ -1,7 +1,22 @@
 from django.apps import AppConfig
+from django.db.models.signals import post_migrate
+
+
+def build_task_paths(**kwargs):
+    """Place tasks saved before the tree paths existed (path ``''``)."""
+    from django.db import transaction
+    from .models import Task
+    from .tree import rebuild_paths
+    if Task.objects.filter(path='').exists():
+        with transaction.atomic():
+            rebuild_paths()
 
 
 class TasksConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.tasks'
     verbose_name = 'Tasks'
+    
+    def ready(self):
+        import apps.tasks.signals  # noqa
+        post_migrate.connect(build_task_paths, sender=self, dispatch_uid='tasks_build_task_paths')
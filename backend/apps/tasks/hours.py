@@ -0,0 +1,196 @@
+"""
+Task hour rollups.
+
+``actual_hours`` is the sum of the task's work logs; ``subtree_actual_hours``
+and ``subtree_estimated_hours`` add up the task and all its descendants.
+Work log writes, estimate changes and re-parenting apply their difference
+to the task and every ancestor with ``F()`` updates, so totals stay
+consistent without walking subtrees. Ancestors are read from the task's
+materialized ``path``. ``reconcile`` rebuilds the totals.
+"""
+from decimal import Decimal
+
+from django.db.models import F, Sum, Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from .models import Task
+
+ZERO = Decimal('0')
+
+
+def path_ids(task_id):
+    """Ids on the path of ``task_id``: its ancestors, root first, then itself."""
+    path = Task.objects.filter(pk=task_id).values_list('path', flat=True).first() or ''
+    return [int(pk) for pk in path.split('/')[:-1]]
+
+
+def subtree_rows(task, fields, max_depth=None):
+    """
+    ``values()`` rows of the descendants of ``task`` in breadth-first
+    order, each with its ``depth`` below the task.
+    """
+    rows = Task.objects.descendants_of(task)
+    if max_depth is not None:
+        rows = rows.filter(depth__lte=task.depth + max_depth)
+    rows = list(rows.order_by('depth', 'parent_id', 'id').values(*fields, 'depth'))
+    for row in rows:
+        row['depth'] -= task.depth
+    return rows
+
+
+def add_to_tasks(task_ids, actual=ZERO, estimated=ZERO):
+    if task_ids and (actual or estimated):
+        Task.objects.filter(pk__in=task_ids).update(
+            subtree_actual_hours=F('subtree_actual_hours') + actual,
+            subtree_estimated_hours=F('subtree_estimated_hours') + estimated,
+            updated_at=timezone.now(),
+        )
+
+
+def add_to_chain(parent_id, actual=ZERO, estimated=ZERO):
+    """Add subtree deltas to ``parent_id`` and all its ancestors."""
+    if parent_id is not None and (actual or estimated):
+        add_to_tasks(path_ids(parent_id), actual, estimated)
+
+
+def add_actual(task_id, hours):
+    """Add logged ``hours`` to a task and its ancestors."""
+    if task_id is None or not hours:
+        return
+    *ancestors, _ = path_ids(task_id) or [task_id]
+    Task.objects.filter(pk=task_id).update(
+        actual_hours=Coalesce(F('actual_hours'), Value(ZERO)) + hours,
+        subtree_actual_hours=F('subtree_actual_hours') + hours,
+        updated_at=timezone.now(),
+    )
+    add_to_tasks(ancestors, actual=hours)
+
+
+def log_changed(old, new):
+    """
+    Apply a work log change given its ``(task_id, hours)`` before and after
+    the write; either side may be ``None``.
+    """
+    old_task_id, old_hours = old or (None, ZERO)
+    new_task_id, new_hours = new or (None, ZERO)
+    if old_task_id == new_task_id:
+        add_actual(new_task_id, new_hours - old_hours)
+        return
+    add_actual(old_task_id, -old_hours)
+    add_actual(new_task_id, new_hours)
+
+
+def ensure_snapshot(task):
+    """Load the persisted values of an existing task without a snapshot."""
+    if task._state.adding or hasattr(task, '_saved_hours'):
+        return
+    saved = Task.objects.filter(pk=task.pk).first()
+    if saved is not None:
+        task._saved_hours = saved._saved_hours
+
+
+def task_saved(task, created):
+    """Propagate a new task, an estimate change or a move to the ancestors."""
+    new_parent_id, new_estimate = task.hours_values()
+    if created:
+        add_to_chain(new_parent_id, estimated=new_estimate)
+        task._saved_hours = task.hours_values()
+        return
+
+    old_parent_id, old_estimate = getattr(task, '_saved_hours', task.hours_values())
+    estimate_delta = new_estimate - old_estimate
+    if estimate_delta:
+        Task.objects.filter(pk=task.pk).update(
+            subtree_estimated_hours=F('subtree_estimated_hours') + estimate_delta,
+            updated_at=timezone.now(),
+        )
+    if old_parent_id == new_parent_id:
+        add_to_chain(new_parent_id, estimated=estimate_delta)
+    else:
+        totals = Task.objects.values('subtree_actual_hours', 'subtree_estimated_hours').get(pk=task.pk)
+        add_to_chain(
+            old_parent_id,
+            actual=-totals['subtree_actual_hours'],
+            estimated=-(totals['subtree_estimated_hours'] - estimate_delta),
+        )
+        add_to_chain(
+            new_parent_id,
+            actual=totals['subtree_actual_hours'],
+            estimated=totals['subtree_estimated_hours'],
+        )
+    if estimate_delta or old_parent_id != new_parent_id:
+        task.refresh_from_db(fields=['subtree_actual_hours', 'subtree_estimated_hours'])
+    task._saved_hours = task.hours_values()
+
+
+def task_deleting(task):
+    """
+    Remove a task's own estimate from its ancestors before it is deleted.
+
+    Cascade deletes send this for every task of a deleted subtree (and
+    remove the work logs first), so each task only accounts for itself.
+    """
+    add_to_chain(task.parent_id, estimated=-(task.estimated_hours or ZERO))
+
+
+def reconcile(queryset=None):
+    """
+    Recompute ``actual_hours`` from the work logs and the subtree totals of
+    every task in ``queryset`` (all tasks by default). Trees must lie
+    entirely within the queryset. Returns the number of tasks changed.
+    """
+    if queryset is None:
+        queryset = Task.objects.all()
+    tasks = {
+        row['id']: row for row in queryset.order_by().values(
+            'id', 'parent_id', 'estimated_hours', 'actual_hours',
+            'subtree_estimated_hours', 'subtree_actual_hours',
+        )
+    }
+    logged = dict(
+        Task.objects.filter(pk__in=tasks).order_by()
+        .annotate(hours=Sum('work_logs__duration_hours'))
+        .values_list('id', 'hours')
+    )
+
+    children = {}
+    for row in tasks.values():
+        children.setdefault(row['parent_id'], []).append(row['id'])
+    totals = {}
+
+    def visit(task_id):
+        # Iterative post-order walk; trees can be deeper than the recursion limit.
+        stack = [(task_id, False)]
+        while stack:
+            current, expanded = stack.pop()
+            if not expanded:
+                stack.append((current, True))
+                stack.extend((child, False) for child in children.get(current, []))
+                continue
+            actual = logged.get(current) or ZERO
+            estimated = tasks[current]['estimated_hours'] or ZERO
+            subtree_actual, subtree_estimated = actual, estimated
+            for child in children.get(current, []):
+                subtree_actual += totals[child][1]
+                subtree_estimated += totals[child][2]
+            totals[current] = (actual, subtree_actual, subtree_estimated)
+
+    for task_id, row in tasks.items():
+        if row['parent_id'] not in tasks:
+            visit(task_id)
+
+    changed = []
+    for task_id, (actual, subtree_actual, subtree_estimated) in totals.items():
+        row = tasks[task_id]
+        if (row['actual_hours'], row['subtree_actual_hours'], row['subtree_estimated_hours']) != (
+            actual, subtree_actual, subtree_estimated
+        ):
+            changed.append(Task(
+                pk=task_id, actual_hours=actual,
+                subtree_actual_hours=subtree_actual, subtree_estimated_hours=subtree_estimated,
+            ))
+    Task.objects.bulk_update(
+        changed, ['actual_hours', 'subtree_actual_hours', 'subtree_estimated_hours'], batch_size=500
+    )
+    return len(changed)
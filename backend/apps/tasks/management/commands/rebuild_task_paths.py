@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from apps.tasks.tree import rebuild_paths
+
+
+class Command(BaseCommand):
+    help = 'Recompute the materialized tree path and depth of every task'
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            changed = rebuild_paths()
+
+        self.stdout.write(self.style.SUCCESS(f'Updated the path of {changed} task(s).'))
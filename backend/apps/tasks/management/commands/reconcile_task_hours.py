@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from apps.tasks import hours
+from apps.tasks.models import Task
+
+
+class Command(BaseCommand):
+    help = 'Recompute task actual hours from work logs and the subtree hour totals'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--project', type=int, help='Only reconcile the tasks of this project')
+
+    def handle(self, *args, **options):
+        tasks = Task.objects.all()
+        if options['project']:
+            tasks = tasks.filter(project_id=options['project'])
+
+        with transaction.atomic():
+            changed = hours.reconcile(tasks)
+
+        self.stdout.write(self.style.SUCCESS(f'Reconciled {changed} task(s).'))
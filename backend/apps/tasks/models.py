@@ -1,8 +1,32 @@
+from decimal import Decimal
+
 from django.db import models
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
+from django.db.models import F, Value
+from django.db.models.functions import Concat, Substr
+from django.utils import timezone
 from django.conf import settings
 from apps.projects.models import Project
 
 
+class TaskQuerySet(models.QuerySet):
+    def descendants_of(self, task, include_self=False):
+        """Tasks below ``task`` (one index range scan on ``path``)."""
+        if not task.path:
+            # Not placed in the tree yet (see rebuild_paths); an empty
+            # prefix would match every task.
+            return self.filter(pk=task.pk) if include_self else self.none()
+        queryset = self.filter(path__startswith=task.path)
+        if not include_self:
+            queryset = queryset.exclude(pk=task.pk)
+        return queryset
+    
+    def ancestors_of(self, task):
+        """Tasks above ``task``, root first."""
+        return self.filter(pk__in=task.ancestor_ids).order_by('depth')
+
+
 class Task(models.Model):
     """Task model with support for various telecommunications task types."""
     
@@ -34,6 +58,13 @@ class Task(models.Model):
         ('critical', 'Critical'),
     ]
     
+    # Fields the subtree hour totals depend on.
+    HOURS_DEPENDENCIES = {'parent_id', 'estimated_hours'}
+    # Hour rollups written only by apps.tasks.hours, with F() deltas.
+    HOURS_ROLLUP_FIELDS = {'actual_hours', 'subtree_estimated_hours', 'subtree_actual_hours'}
+    # Tree position, written only when the task or an ancestor moves.
+    TREE_FIELDS = {'path', 'depth'}
+    
     project = models.ForeignKey(
         Project,
         on_delete=models.CASCADE,
@@ -71,11 +102,22 @@ class Task(models.Model):
     
     due_date = models.DateTimeField(null=True, blank=True)
     estimated_hours = models.DecimalField(max_digits=6, decimal_places=2, null=True, blank=True)
-    actual_hours = models.DecimalField(max_digits=6, decimal_places=2, null=True, blank=True)
+    # Maintained from the work logs of the task (see apps.tasks.hours).
+    actual_hours = models.DecimalField(max_digits=10, decimal_places=2, default=0, null=True, blank=True)
+    subtree_estimated_hours = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    subtree_actual_hours = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    
+    # Materialized path of primary keys from the root, e.g. "12/40/41/",
+    # maintained in save() so subtrees and ancestors take one query.
+    path = models.CharField(max_length=1000, default='', editable=False)
+    depth = models.PositiveIntegerField(default=0, editable=False)
     
     tags = models.JSONField(default=list, blank=True)
     attachments = models.JSONField(default=list, blank=True)
     
+    # Weighted full-text vector, maintained by apps.search.
+    search_vector = SearchVectorField(null=True, editable=False)
+    
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     completed_at = models.DateTimeField(null=True, blank=True)
@@ -88,7 +130,86 @@ class Task(models.Model):
             models.Index(fields=['project', 'status']),
             models.Index(fields=['task_type']),
             models.Index(fields=['assigned_to']),
+            models.Index(fields=['created_at', 'id']),
+            models.Index(fields=['project', 'created_at']),
+            models.Index(fields=['project', 'updated_at', 'id']),
+            models.Index(fields=['path'], name='tasks_task_path_idx', opclasses=['varchar_pattern_ops']),
+            GinIndex(fields=['search_vector'], name='tasks_task_search_idx'),
         ]
     
+    objects = TaskQuerySet.as_manager()
+    
     def __str__(self):
         return f"{self.get_task_type_display()} - {self.title}"
+    
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        task = super().from_db(db, field_names, values)
+        # Snapshot the persisted values so subtree totals can be updated by delta.
+        deferred = task.get_deferred_fields()
+        if not deferred & task.HOURS_DEPENDENCIES:
+            task._saved_hours = task.hours_values()
+        if 'parent_id' not in deferred:
+            task._saved_parent_id = task.parent_id
+        return task
+    
+    @property
+    def ancestor_ids(self):
+        """Primary keys of the ancestors, root first."""
+        return [int(pk) for pk in self.path.split('/')[:-2]]
+    
+    def hours_values(self):
+        return (self.parent_id, self.estimated_hours or Decimal('0'))
+    
+    def tree_position(self):
+        """``(path, depth)`` of the task under its current parent."""
+        if self.parent_id is None:
+            return f'{self.pk}/', 0
+        parent_path, parent_depth = Task.objects.values_list('path', 'depth').get(pk=self.parent_id)
+        return f'{parent_path}{self.pk}/', parent_depth + 1
+    
+    def save(self, *args, **kwargs):
+        if self._state.adding:
+            self.subtree_estimated_hours = self.estimated_hours or 0
+            self.subtree_actual_hours = self.actual_hours or 0
+            super().save(*args, **kwargs)
+            # The path ends with the primary key, known only after the insert.
+            self.path, self.depth = self.tree_position()
+            Task.objects.filter(pk=self.pk).update(path=self.path, depth=self.depth)
+            self._saved_parent_id = self.parent_id
+            return
+        
+        update_fields = kwargs.get('update_fields')
+        moved_from = None
+        if update_fields is None or {'parent', 'parent_id'} & set(update_fields):
+            if hasattr(self, '_saved_parent_id'):
+                saved_parent_id = self._saved_parent_id
+            else:
+                saved_parent_id = Task.objects.values_list('parent_id', flat=True).get(pk=self.pk)
+            if saved_parent_id != self.parent_id:
+                moved_from = Task.objects.values_list('path', 'depth').get(pk=self.pk)
+                self.path, self.depth = self.tree_position()
+        if update_fields is None and not kwargs.get('force_insert'):
+            # An update must not write the rollups or the tree position loaded
+            # with the row back over the deltas applied or an ancestor moved since.
+            deferred = self.get_deferred_fields()
+            update_fields = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key
+                and field.attname not in deferred
+                and field.name not in self.HOURS_ROLLUP_FIELDS | self.TREE_FIELDS
+            ]
+        if moved_from is not None and update_fields is not None:
+            update_fields = {*update_fields, *self.TREE_FIELDS}
+        kwargs['update_fields'] = update_fields
+        super().save(*args, **kwargs)
+        
+        if moved_from is not None and moved_from[0]:
+            old_path, old_depth = moved_from
+            # Re-root the paths of the whole subtree in one statement.
+            Task.objects.filter(path__startswith=old_path).update(
+                path=Concat(Value(self.path), Substr('path', len(old_path) + 1)),
+                depth=F('depth') + (self.depth - old_depth),
+                updated_at=timezone.now(),
+            )
+        self._saved_parent_id = self.parent_id
@@ -1,10 +1,11 @@
 from rest_framework import serializers
+from apps.core.serializers import SparseFieldsetMixin
 from .models import Task
 from apps.authentication.serializers import UserSerializer
 from apps.projects.serializers import ProjectListSerializer
 
 
-class TaskSerializer(serializers.ModelSerializer):
+class TaskSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     project_details = ProjectListSerializer(source='project', read_only=True)
     assigned_to_details = UserSerializer(source='assigned_to', read_only=True)
     created_by_details = UserSerializer(source='created_by', read_only=True)
@@ -17,10 +18,20 @@ class TaskSerializer(serializers.ModelSerializer):
             'id', 'project', 'project_details', 'parent', 'parent_details',
             'title', 'description', 'task_type', 'status', 'priority',
             'assigned_to', 'assigned_to_details', 'created_by', 'created_by_details',
-            'due_date', 'estimated_hours', 'actual_hours', 'tags', 'attachments',
+            'due_date', 'estimated_hours', 'actual_hours',
+            'subtree_estimated_hours', 'subtree_actual_hours', 'tags', 'attachments',
             'subtasks_count', 'created_at', 'updated_at', 'completed_at'
         ]
-        read_only_fields = ['created_at', 'updated_at']
+        read_only_fields = [
+            'actual_hours', 'subtree_estimated_hours', 'subtree_actual_hours',
+            'created_at', 'updated_at'
+        ]
+    
+    def validate_parent(self, value):
+        if value is not None and self.instance is not None:
+            if self.instance.pk in (value.pk, *value.ancestor_ids):
+                raise serializers.ValidationError('A task cannot be moved below itself.')
+        return value
     
     def get_parent_details(self, obj):
         if obj.parent:
@@ -32,10 +43,13 @@ class TaskSerializer(serializers.ModelSerializer):
         return None
     
     def get_subtasks_count(self, obj):
+        # Annotated by the viewset fetch plan; fall back for fresh instances.
+        if hasattr(obj, 'subtasks_count'):
+            return obj.subtasks_count
         return obj.subtasks.count()
 
 
-class TaskListSerializer(serializers.ModelSerializer):
+class TaskListSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     project_name = serializers.CharField(source='project.name', read_only=True)
     assigned_to_name = serializers.CharField(source='assigned_to.full_name', read_only=True)
     
@@ -46,3 +60,8 @@ class TaskListSerializer(serializers.ModelSerializer):
             'project', 'project_name', 'assigned_to', 'assigned_to_name',
             'due_date', 'created_at'
         ]
+
+
+class TaskTreeSerializer(TaskListSerializer):
+    class Meta(TaskListSerializer.Meta):
+        fields = TaskListSerializer.Meta.fields + ['parent', 'depth']
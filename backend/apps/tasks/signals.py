@@ -0,0 +1,25 @@
+"""
+Signal handlers keeping task subtree hour totals in sync with task writes.
+"""
+from django.db.models.signals import post_save, pre_delete, pre_save
+from django.dispatch import receiver
+
+from . import hours
+from .models import Task
+
+
+@receiver(pre_save, sender=Task)
+def task_saving(sender, instance, raw=False, **kwargs):
+    if not raw:
+        hours.ensure_snapshot(instance)
+
+
+@receiver(post_save, sender=Task)
+def task_saved(sender, instance, created=False, raw=False, **kwargs):
+    if not raw:
+        hours.task_saved(instance, created)
+
+
+@receiver(pre_delete, sender=Task)
+def task_deleting(sender, instance, **kwargs):
+    hours.task_deleting(instance)
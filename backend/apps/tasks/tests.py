@@ -0,0 +1,82 @@
+"""
+Query counts of the task endpoints: related rows are loaded by the fetch
+plans, so a page or a task with many rows costs as many queries as one
+with a few.
+"""
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from apps.authentication.models import User
+from apps.projects.models import Project
+from .models import Task
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def user():
+    return User.objects.create_user('manager', password='secret', is_staff=True)
+
+
+@pytest.fixture
+def client(user):
+    client = APIClient()
+    client.force_authenticate(user)
+    return client
+
+
+@pytest.fixture
+def project(user):
+    return Project.objects.create(name='Network', code='NET-1', manager=user)
+
+
+def create_tasks(project, count, parent=None):
+    # A separate assignee per task: a per-row lookup shows up in the counts.
+    tasks = []
+    for number in range(count):
+        assignee = User.objects.create_user(f'fitter-{parent and parent.pk}-{number}', password='secret')
+        tasks.append(Task.objects.create(
+            project=project, parent=parent, title=f'Task {number}', task_type='installation',
+            assigned_to=assignee, created_by=project.manager,
+        ))
+    return tasks
+
+
+def count_queries(client, url):
+    with CaptureQueriesContext(connection) as context:
+        response = client.get(url)
+    assert response.status_code == 200, response.content
+    return len(context.captured_queries)
+
+
+def test_list_queries_do_not_grow_with_page_size(client, project, django_assert_num_queries):
+    create_tasks(project, 12)
+    expected = count_queries(client, '/api/tasks/?page_size=2')
+    
+    with django_assert_num_queries(expected):
+        response = client.get('/api/tasks/?page_size=10')
+    assert len(response.data['results']) == 10
+
+
+def test_retrieve_queries_do_not_grow_with_subtasks(client, project, django_assert_num_queries):
+    few, many = create_tasks(project, 2)
+    create_tasks(project, 1, parent=few)
+    create_tasks(project, 8, parent=many)
+    expected = count_queries(client, f'/api/tasks/{few.pk}/')
+    
+    with django_assert_num_queries(expected):
+        response = client.get(f'/api/tasks/{many.pk}/')
+    assert response.data['subtasks_count'] == 8
+
+
+def test_subtasks_queries_do_not_grow_with_subtasks(client, project, django_assert_num_queries):
+    few, many = create_tasks(project, 2)
+    create_tasks(project, 1, parent=few)
+    create_tasks(project, 8, parent=many)
+    expected = count_queries(client, f'/api/tasks/{few.pk}/subtasks/')
+    
+    with django_assert_num_queries(expected):
+        response = client.get(f'/api/tasks/{many.pk}/subtasks/')
+    assert len(response.data) == 8
@@ -0,0 +1,69 @@
+"""
+Task tree helpers.
+
+Every task stores the materialized ``path`` of primary keys from its root
+("12/40/41/") and its ``depth``; ``Task.save`` keeps both current when a
+task is created or moved. A whole subtree is then a single ``path LIKE
+'12/40/%'`` index range scan and the ancestors are read off the path.
+"""
+from .models import Task
+
+BATCH_SIZE = 1000
+
+
+def nest(tasks, rows):
+    """
+    Nest the serialized ``rows`` of ``tasks`` under a ``children`` key.
+
+    Each row goes below its nearest ancestor present in ``tasks``, so
+    filtered trees keep their shape; rows without one are returned as
+    roots. Sibling order follows ``tasks``.
+    """
+    by_id = {}
+    for task, row in zip(tasks, rows):
+        row['children'] = []
+        by_id[task.pk] = row
+    roots = []
+    for task, row in zip(tasks, rows):
+        parent = next(
+            (by_id[pk] for pk in reversed(task.ancestor_ids) if pk in by_id), None
+        )
+        (parent['children'] if parent is not None else roots).append(row)
+    return roots
+
+
+def flatten(roots):
+    """Rows of nested ``roots`` in depth-first order, without ``children``."""
+    rows = []
+    stack = list(reversed(roots))
+    while stack:
+        row = stack.pop()
+        stack.extend(reversed(row.pop('children')))
+        rows.append(row)
+    return rows
+
+
+def rebuild_paths():
+    """
+    Recompute ``path`` and ``depth`` of every task from the ``parent``
+    links. Returns the number of tasks changed.
+    """
+    tasks = {
+        row['id']: row
+        for row in Task.objects.order_by().values('id', 'parent_id', 'path', 'depth')
+    }
+    children = {}
+    for row in tasks.values():
+        children.setdefault(row['parent_id'], []).append(row['id'])
+
+    changed = []
+    stack = [(task_id, '', 0) for task_id in children.get(None, [])]
+    while stack:
+        task_id, parent_path, depth = stack.pop()
+        path = f'{parent_path}{task_id}/'
+        row = tasks[task_id]
+        if (row['path'], row['depth']) != (path, depth):
+            changed.append(Task(pk=task_id, path=path, depth=depth))
+        stack.extend((child, path, depth + 1) for child in children.get(task_id, []))
+    Task.objects.bulk_update(changed, ['path', 'depth'], batch_size=BATCH_SIZE)
+    return len(changed)
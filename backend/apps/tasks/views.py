@@ -1,25 +1,82 @@
-from rest_framework import viewsets, filters
+from rest_framework import viewsets, filters, status
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.decorators import action
 from rest_framework.response import Response
+from django.db.models import Count
+from django.shortcuts import get_object_or_404
 from django.utils import timezone
+from apps.core.mixins import CachedResponseMixin, ConditionalGetMixin, FetchPlanMixin
+from apps.search.filters import SearchVectorFilter
+from .hours import subtree_rows
 from .models import Task
-from .serializers import TaskSerializer, TaskListSerializer
+from .serializers import TaskSerializer, TaskListSerializer, TaskTreeSerializer
+from .tree import flatten, nest
 
 
-class TaskViewSet(viewsets.ModelViewSet):
+TASK_LIST_PLAN = {
+    'fields': {
+        'project_name': {'select_related': ['project']},
+        'assigned_to_name': {'select_related': ['assigned_to']},
+    },
+}
+
+# Nesting reads the tree columns even when they are not serialized.
+TASK_TREE_PLAN = {**TASK_LIST_PLAN, 'load': ['path', 'depth']}
+
+VARIANCE_FIELDS = [
+    'id', 'parent_id', 'title', 'status', 'estimated_hours', 'actual_hours',
+    'subtree_estimated_hours', 'subtree_actual_hours',
+]
+
+
+def variance_row(row):
+    """Estimated-vs-actual figures of one task subtree."""
+    estimated = row['subtree_estimated_hours']
+    variance = row['subtree_actual_hours'] - estimated
+    return dict(
+        row,
+        variance_hours=variance,
+        variance_percent=round(variance * 100 / estimated, 2) if estimated else None,
+    )
+
+
+TASK_DETAIL_PLAN = {
+    'fields': {
+        'project_details': {'select_related': ['project__manager']},
+        'parent_details': {'select_related': ['parent']},
+        'assigned_to_details': {'select_related': ['assigned_to__role']},
+        'created_by_details': {'select_related': ['created_by__role']},
+        'subtasks_count': {'annotate': {'subtasks_count': Count('subtasks')}},
+    },
+}
+
+
+class TaskViewSet(ConditionalGetMixin, CachedResponseMixin, FetchPlanMixin, viewsets.ModelViewSet):
     """
     ViewSet for task management.
     """
     queryset = Task.objects.all()
     permission_classes = [IsAuthenticated]
-    filter_backends = [filters.SearchFilter, filters.OrderingFilter]
+    validator_related = ['subtasks']
+    filter_backends = [SearchVectorFilter, filters.OrderingFilter]
     search_fields = ['title', 'description']
     ordering_fields = ['title', 'status', 'priority', 'due_date', 'created_at']
+    fetch_plans = {
+        'list': TASK_LIST_PLAN,
+        'subtasks': TASK_LIST_PLAN,
+        'tree': TASK_TREE_PLAN,
+        'ancestors': TASK_TREE_PLAN,
+        'variance': {'load': ['path', 'depth']},
+        'default': TASK_DETAIL_PLAN,
+    }
+    # The choices are code constants; only the form options are cached.
+    cache_actions = ['choices']
     
     def get_serializer_class(self):
-        if self.action == 'list':
+        if self.action in ('list', 'subtasks'):
             return TaskListSerializer
+        if self.action in ('tree', 'ancestors'):
+            return TaskTreeSerializer
         return TaskSerializer
     
     def get_queryset(self):
@@ -30,6 +87,7 @@ class TaskViewSet(viewsets.ModelViewSet):
         task_type = self.request.query_params.get('task_type', None)
         assigned_to = self.request.query_params.get('assigned_to', None)
         parent = self.request.query_params.get('parent', None)
+        descendant_of = self.request.query_params.get('descendant_of', None)
         
         if project:
             queryset = queryset.filter(project_id=project)
@@ -46,6 +104,9 @@ class TaskViewSet(viewsets.ModelViewSet):
                 queryset = queryset.filter(parent__isnull=True)
             else:
                 queryset = queryset.filter(parent_id=parent)
+        if descendant_of:
+            root = Task.objects.only('path').filter(pk=descendant_of).first()
+            queryset = queryset.descendants_of(root) if root else queryset.none()
         
         return queryset
     
@@ -62,10 +123,87 @@ class TaskViewSet(viewsets.ModelViewSet):
         serializer = self.get_serializer(task)
         return Response(serializer.data)
     
+    @action(detail=False, methods=['get'])
+    def choices(self, request):
+        """Task type, status and priority options for forms and filters."""
+        return self.cached_response(self.build_choices, request)
+    
+    def build_choices(self, request):
+        return Response({
+            name: [{'value': value, 'label': label} for value, label in options]
+            for name, options in [
+                ('task_type', Task.TASK_TYPE_CHOICES),
+                ('status', Task.STATUS_CHOICES),
+                ('priority', Task.PRIORITY_CHOICES),
+            ]
+        })
+    
     @action(detail=True, methods=['get'])
     def subtasks(self, request, pk=None):
         """Get subtasks of a task."""
         task = self.get_object()
-        subtasks = task.subtasks.all()
-        serializer = TaskListSerializer(subtasks, many=True)
+        subtasks = self.apply_fetch_plan(task.subtasks.all())
+        serializer = self.get_serializer(subtasks, many=True)
+        return Response(serializer.data)
+    
+    def get_tree_root(self):
+        # Unlike get_object() the query parameters filter the returned
+        # tasks, not the task the tree starts from.
+        task = get_object_or_404(Task.objects.only('id', 'path', 'depth'), pk=self.kwargs['pk'])
+        self.check_object_permissions(self.request, task)
+        return task
+    
+    @action(detail=True, methods=['get'])
+    def tree(self, request, pk=None):
+        """
+        The task and all its descendants in one query.
+        
+        ``?layout=nested`` (default) nests tasks under ``children``;
+        ``?layout=flat`` lists them depth-first with their ``depth``.
+        ``?depth=<n>`` stops n levels below the task. The list filters apply
+        to the tree, e.g. ``?status=blocked`` for the blocked tasks below;
+        matches keep their nearest matching ancestor as parent.
+        """
+        task = self.get_tree_root()
+        queryset = self.filter_queryset(self.get_queryset()).descendants_of(task, include_self=True)
+        if 'depth' in request.query_params:
+            try:
+                max_depth = int(request.query_params['depth'])
+            except ValueError:
+                return Response({'depth': 'Expected an integer.'}, status=status.HTTP_400_BAD_REQUEST)
+            queryset = queryset.filter(depth__lte=task.depth + max_depth)
+        
+        tasks = list(queryset)
+        roots = nest(tasks, self.get_serializer(tasks, many=True).data)
+        if request.query_params.get('layout') == 'flat':
+            return Response(flatten(roots))
+        return Response(roots)
+    
+    @action(detail=True, methods=['get'])
+    def ancestors(self, request, pk=None):
+        """Ancestors of the task, root first."""
+        task = self.get_tree_root()
+        ancestors = self.apply_fetch_plan(Task.objects.ancestors_of(task))
+        serializer = self.get_serializer(ancestors, many=True)
         return Response(serializer.data)
+    
+    @action(detail=True, methods=['get'])
+    def variance(self, request, pk=None):
+        """
+        Estimated vs. actual hours of the task subtree, with a row for
+        every descendant. Limit the depth with ``?depth=<n>``.
+        """
+        task = self.get_object()
+        try:
+            max_depth = int(request.query_params['depth']) if 'depth' in request.query_params else None
+        except ValueError:
+            return Response({'depth': 'Expected an integer.'}, status=status.HTTP_400_BAD_REQUEST)
+        
+        root = {field: getattr(task, field) for field in VARIANCE_FIELDS}
+        root['depth'] = 0
+        return Response({
+            'task': variance_row(root),
+            'descendants': [
+                variance_row(row) for row in subtree_rows(task, VARIANCE_FIELDS, max_depth)
+            ],
+        })
@@ -25,6 +25,7 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
     
     # Third party apps
     'rest_framework',
@@ -42,6 +43,9 @@ INSTALLED_APPS = [
     'apps.documents',
     'apps.statistics',
     'apps.installation',
+    'apps.reports',
+    'apps.search',
+    'apps.sync',
 ]
 
 MIDDLEWARE = [
@@ -140,7 +144,7 @@ REST_FRAMEWORK = {
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',
     ],
-    'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
+    'DEFAULT_PAGINATION_CLASS': 'apps.core.pagination.HybridPagination',
     'PAGE_SIZE': 20,
     'DEFAULT_FILTER_BACKENDS': [
         'rest_framework.filters.SearchFilter',
@@ -172,6 +176,16 @@ CORS_ALLOWED_ORIGINS = config(
 )
 CORS_ALLOW_CREDENTIALS = True
 
+# Cache shared by all workers (Redis database 1; Celery uses database 0)
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': config('CACHE_URL', default='redis://localhost:6379/1'),
+        'KEY_PREFIX': config('CACHE_KEY_PREFIX', default='pm'),
+        'TIMEOUT': 300,
+    }
+}
+
 # Celery Configuration
 CELERY_BROKER_URL = config('CELERY_BROKER_URL', default='redis://localhost:6379/0')
 CELERY_RESULT_BACKEND = config('CELERY_RESULT_BACKEND', default='redis://localhost:6379/0')
@@ -180,6 +194,48 @@ CELERY_TASK_SERIALIZER = 'json'
 CELERY_RESULT_SERIALIZER = 'json'
 CELERY_TIMEZONE = TIME_ZONE
 
+# Raw metric points older than this are compacted into hourly rollups
+# (python manage.py compact_metrics)
+METRIC_RAW_RETENTION_DAYS = config('METRIC_RAW_RETENTION_DAYS', default=90, cast=int)
+
+# Report jobs: unfinished jobs without progress for this long are failed,
+# finished ones are deleted after the retention (python manage.py purge_reports)
+REPORT_JOB_TIMEOUT_MINUTES = config('REPORT_JOB_TIMEOUT_MINUTES', default=60, cast=int)
+REPORT_RETENTION_DAYS = config('REPORT_RETENTION_DAYS', default=30, cast=int)
+
+# Chunked uploads: partial files are staged locally until finalized; sessions
+# idle for longer than the expiry are removed (python manage.py purge_upload_sessions)
+UPLOAD_SESSION_DIR = config('UPLOAD_SESSION_DIR', default=str(BASE_DIR / 'upload_sessions'))
+UPLOAD_SESSION_EXPIRE_HOURS = config('UPLOAD_SESSION_EXPIRE_HOURS', default=48, cast=int)
+UPLOAD_MAX_BYTES = config('UPLOAD_MAX_BYTES', default=5 * 1024 ** 3, cast=int)
+UPLOAD_CHUNK_MAX_BYTES = config('UPLOAD_CHUNK_MAX_BYTES', default=16 * 1024 ** 2, cast=int)
+
+# Document and photo files are stored once per content; blobs unreferenced for
+# longer than this are deleted (python manage.py gc_blobs)
+BLOB_GC_GRACE_HOURS = config('BLOB_GC_GRACE_HOURS', default=24, cast=int)
+
+# File downloads: '' streams from Django, 'x-accel-redirect' (nginx) or
+# 'x-sendfile' hands the transfer to the front proxy (see apps/core/downloads.py)
+DOWNLOAD_OFFLOAD = config('DOWNLOAD_OFFLOAD', default='')
+DOWNLOAD_ACCEL_PREFIX = config('DOWNLOAD_ACCEL_PREFIX', default='/protected-media/')
+
+# Full-text search: text search configurations every vector and query is
+# built with; 'simple' keeps Polish words, codes and serial numbers unstemmed.
+# A server with a Polish dictionary configured can use e.g. 'polish,english'
+# (run python manage.py rebuild_search_index after changing this)
+SEARCH_CONFIGS = config(
+    'SEARCH_CONFIGS',
+    default='simple,english',
+    cast=lambda v: [s.strip() for s in v.split(',') if s.strip()]
+)
+
+# Offline sync: changes younger than the settle time wait for the next pull so
+# slow transactions are not skipped; tombstones and recorded mutations are
+# deleted after the retention (python manage.py purge_sync_log), and older
+# cursors must sync from scratch
+SYNC_SETTLE_SECONDS = config('SYNC_SETTLE_SECONDS', default=5, cast=int)
+SYNC_TOMBSTONE_DAYS = config('SYNC_TOMBSTONE_DAYS', default=90, cast=int)
+
 # DRF Spectacular Settings
 SPECTACULAR_SETTINGS = {
     'TITLE': 'Project Management Platform API',
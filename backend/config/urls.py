@@ -40,6 +40,9 @@ urlpatterns = [
     path('api/documents/', include('apps.documents.urls')),
     path('api/statistics/', include('apps.statistics.urls')),
     path('api/installation/', include('apps.installation.urls')),
+    path('api/reports/', include('apps.reports.urls')),
+    path('api/search/', include('apps.search.urls')),
+    path('api/sync/', include('apps.sync.urls')),
 ]
 
 # Serve media files in development
@@ -45,7 +45,8 @@ def main():
     # Check apps
     apps = [
         'authentication', 'projects', 'tasks', 'bom',
-        'devices', 'ipam', 'documents', 'statistics', 'installation'
+        'devices', 'ipam', 'documents', 'statistics', 'installation',
+        'reports', 'search', 'sync'
     ]
     
     print("\nDjango Apps:")
@@ -1,8 +1,17 @@
 import { Workbox } from 'workbox-window';
+import api from './api';
+import { SyncChanges, SyncMutation, SyncMutationResult } from '@/types/sync';
+import { STORAGE_KEYS } from '@/utils/constants';
+
+type ChangesListener = (changes: SyncChanges) => void;
+type ResultsListener = (results: SyncMutationResult[]) => void;
 
 class OfflineService {
   private wb: Workbox | null = null;
   private isOnline = navigator.onLine;
+  private syncing: Promise<void> | null = null;
+  private changesListeners: ChangesListener[] = [];
+  private resultsListeners: ResultsListener[] = [];
 
   constructor() {
     this.init();
@@ -43,9 +52,119 @@ class OfflineService {
     });
   }
 
-  private async syncOfflineData() {
-    // Implement offline data synchronization logic here
-    console.log('Syncing offline data...');
+  private readQueue(): SyncMutation[] {
+    return JSON.parse(localStorage.getItem(STORAGE_KEYS.SYNC_QUEUE) || '[]');
+  }
+
+  private writeQueue(queue: SyncMutation[]) {
+    localStorage.setItem(STORAGE_KEYS.SYNC_QUEUE, JSON.stringify(queue));
+  }
+
+  /** Queue a change made offline; it is sent on the next sync. */
+  public enqueue(mutation: Omit<SyncMutation, 'id'> & { id?: string }) {
+    const id = mutation.id || `${Date.now()}-${Math.random().toString(36).slice(2)}`;
+    this.writeQueue([...this.readQueue(), { ...mutation, id }]);
+    if (this.isOnline) {
+      this.syncOfflineData();
+    }
+  }
+
+  /** Called with every batch of server changes (rows and deleted ids). */
+  public onChanges(listener: ChangesListener) {
+    this.changesListeners.push(listener);
+    return () => {
+      this.changesListeners = this.changesListeners.filter((l) => l !== listener);
+    };
+  }
+
+  /** Called with the results of pushed mutations, e.g. to resolve conflicts. */
+  public onMutationResults(listener: ResultsListener) {
+    this.resultsListeners.push(listener);
+    return () => {
+      this.resultsListeners = this.resultsListeners.filter((l) => l !== listener);
+    };
+  }
+
+  public syncOfflineData(): Promise<void> {
+    // One sync at a time; callers share the running one.
+    if (!this.syncing) {
+      this.syncing = this.runSync().finally(() => {
+        this.syncing = null;
+      });
+    }
+    return this.syncing;
+  }
+
+  private async runSync() {
+    try {
+      await this.pushMutations();
+      await this.pullChanges();
+    } catch (error) {
+      console.error('Offline sync failed:', error);
+    }
+  }
+
+  private async pushMutations() {
+    const queue = this.readQueue();
+    if (!queue.length) {
+      return;
+    }
+    // Mutation ids make resending a batch safe if the response is lost.
+    const batch = queue.slice(0, 200);
+    const response = await api.post<{ results: SyncMutationResult[] }>('/sync/', { mutations: batch });
+    const { results } = response.data;
+    // The server resolves "@ref" values within a batch only: give mutations
+    // left for later batches the ids of the rows created in this one.
+    const refs = new Map<string, number>();
+    batch.forEach((mutation, index) => {
+      const result = results[index];
+      if (mutation.op === 'create' && mutation.ref && result?.status === 'applied' && result.pk !== undefined) {
+        refs.set(`@${mutation.ref}`, result.pk);
+      }
+    });
+    const sent = new Set(batch.map((m) => m.id));
+    this.writeQueue(
+      this.readQueue()
+        .filter((m) => !sent.has(m.id))
+        .map((m) => (refs.size ? this.resolveRefs(m, refs) : m))
+    );
+    this.resultsListeners.forEach((listener) => listener(results));
+    if (queue.length > batch.length) {
+      await this.pushMutations();
+    }
+  }
+
+  private resolveRefs(mutation: SyncMutation, refs: Map<string, number>): SyncMutation {
+    const resolve = <T>(value: T) => (typeof value === 'string' && refs.has(value) ? refs.get(value)! : value);
+    const resolved = { ...mutation };
+    if (resolved.pk !== undefined) {
+      resolved.pk = resolve(resolved.pk);
+    }
+    if (resolved.data) {
+      resolved.data = Object.fromEntries(Object.entries(resolved.data).map(([key, value]) => [key, resolve(value)]));
+    }
+    return resolved;
+  }
+
+  private async pullChanges() {
+    let hasMore = true;
+    while (hasMore) {
+      const cursor = localStorage.getItem(STORAGE_KEYS.SYNC_CURSOR);
+      let response;
+      try {
+        response = await api.get<SyncChanges>('/sync/', { params: cursor ? { cursor } : {} });
+      } catch (error) {
+        if ((error as { response?: { status?: number } }).response?.status === 410) {
+          // Cursor expired: start over with a full sync.
+          localStorage.removeItem(STORAGE_KEYS.SYNC_CURSOR);
+          continue;
+        }
+        throw error;
+      }
+      this.changesListeners.forEach((listener) => listener(response.data));
+      localStorage.setItem(STORAGE_KEYS.SYNC_CURSOR, response.data.cursor);
+      hasMore = response.data.has_more;
+    }
   }
 
   public getOnlineStatus(): boolean {
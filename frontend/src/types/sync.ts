@@ -0,0 +1,28 @@
+export type SyncType = 'task' | 'checklist' | 'checklist_item' | 'photo' | 'device' | 'work_log';
+
+export interface SyncMutation {
+  id: string;
+  type: SyncType;
+  op: 'create' | 'update' | 'delete';
+  pk?: number | string;
+  ref?: string;
+  base_updated_at?: string | null;
+  data?: Record<string, unknown>;
+}
+
+export interface SyncMutationResult {
+  id: string;
+  status: 'applied' | 'conflict' | 'invalid' | 'not_found' | 'forbidden';
+  pk?: number;
+  row?: Record<string, unknown> | null;
+  current?: Record<string, unknown> | null;
+  errors?: Record<string, string[]>;
+}
+
+export interface SyncChanges {
+  cursor: string;
+  has_more: boolean;
+  projects: number[];
+  changes: Partial<Record<SyncType, { fields: string[]; rows: unknown[][] }>>;
+  deleted: Partial<Record<SyncType, number[]>>;
+}
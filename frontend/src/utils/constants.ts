@@ -13,6 +13,8 @@ export const STORAGE_KEYS = {
   AUTH_TOKEN: 'auth_token',
   USER_DATA: 'user_data',
   THEME: 'theme',
+  SYNC_CURSOR: 'sync_cursor',
+  SYNC_QUEUE: 'sync_queue',
 } as const;
 
 export const TASK_STATUS = {